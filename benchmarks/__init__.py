@@ -0,0 +1,4 @@
+"""Offline benchmarks for the NSE F&O scanner.
+
+Run ``python -m benchmarks --help`` for the command line interface.
+"""
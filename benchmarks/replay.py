@@ -0,0 +1,109 @@
+"""Record and replay ``yf.download`` responses.
+
+:class:`Recorder` wraps a download function and stores each response under
+a directory keyed by the request; :class:`Replayer` serves those responses
+back without touching the network, so benchmarks can run on real market
+data offline and repeatably.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+import yfinance as yf
+
+from nse_fno_scanner import cache, executor, sources
+
+Download = Callable[..., pd.DataFrame]
+
+# Arguments that change which bars a request returns.
+KEY_ARGS = ("interval", "period", "start", "end")
+
+
+def request_key(tickers, kwargs: dict) -> str:
+    """Return a stable key for a ``yf.download`` call."""
+    names = [tickers] if isinstance(tickers, str) else list(tickers)
+    spec = {"tickers": names, **{k: kwargs.get(k) for k in KEY_ARGS}}
+    return hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Recorder:
+    """Call ``download`` and save each response under ``root``."""
+
+    def __init__(self, download: Download, root: str | Path) -> None:
+        self.download = download
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, tickers, *args, **kwargs) -> pd.DataFrame:
+        df = self.download(tickers, *args, **kwargs)
+        key = request_key(tickers, kwargs)
+        df.to_pickle(self.root / f"{key}.pkl")
+        entry = {"key": key, "tickers": tickers, **{k: kwargs.get(k) for k in KEY_ARGS}}
+        with open(self.root / "index.jsonl", "a") as fh:
+            fh.write(json.dumps(entry, default=str) + "\n")
+        return df
+
+
+class Replayer:
+    """Serve responses saved by :class:`Recorder`.
+
+    Parameters
+    ----------
+    root : str or Path
+        Directory written by a :class:`Recorder`.
+    fallback : callable, optional
+        Download function used for requests that were not recorded. Without
+        one such requests raise ``KeyError``.
+    """
+
+    def __init__(self, root: str | Path, fallback: Optional[Download] = None) -> None:
+        self.root = Path(root)
+        self.fallback = fallback
+
+    def __call__(self, tickers, *args, **kwargs) -> pd.DataFrame:
+        path = self.root / f"{request_key(tickers, kwargs)}.pkl"
+        if path.exists():
+            return pd.read_pickle(path)
+        if self.fallback is not None:
+            return self.fallback(tickers, *args, **kwargs)
+        raise KeyError(f"No recorded response for {tickers!r} {kwargs}")
+
+
+@contextlib.contextmanager
+def patched(download: Download, *, workers: int = 8) -> Iterator[None]:
+    """Route ``yf.download`` to ``download`` for the duration of the block.
+
+    The on-disk cache and any local data source are disabled and the shared
+    executor runs without rate limiting or retry delays, so timings measure
+    the scanner rather than the politeness towards Yahoo.
+    """
+    original = yf.download
+    previous_cache, previous_executor = cache._cache, executor._executor
+    previous_source = sources._source
+    cache_dir = os.environ.pop(cache.CACHE_DIR_ENV, None)
+    source_dir = os.environ.pop(sources.SOURCE_DIR_ENV, None)
+    yf.download = download
+    cache.set_cache(None)
+    sources.set_source(None)
+    executor.set_executor(executor.FetchExecutor(workers, rate=0, retries=1))
+    try:
+        yield
+    finally:
+        yf.download = original
+        cache._cache = previous_cache
+        executor._executor = previous_executor
+        sources._source = previous_source
+        if cache_dir is not None:
+            os.environ[cache.CACHE_DIR_ENV] = cache_dir
+        if source_dir is not None:
+            os.environ[sources.SOURCE_DIR_ENV] = source_dir
+
+
+__all__ = ["Recorder", "Replayer", "patched", "request_key"]
@@ -0,0 +1,291 @@
+"""Scan throughput benchmarks and baseline comparison.
+
+Each benchmark runs one public entry point over ``n`` symbols with
+``yf.download`` served from a :class:`~benchmarks.synthetic.SyntheticMarket`
+or from recorded responses. Results are written as JSON so a later run can
+be compared against them with ``--baseline``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .replay import Recorder, Replayer, patched
+from .synthetic import SyntheticMarket, symbol_names
+
+SIZES = (200, 2_000, 20_000)
+REPORT_VERSION = 1
+
+
+def _filter_by_dma(symbols: List[str]) -> None:
+    from nse_fno_scanner import filter_by_dma
+
+    filter_by_dma(symbols)
+
+
+def _intraday_scan(symbols: List[str]) -> None:
+    from nse_fno_scanner import intraday_scan
+
+    intraday_scan(symbols)
+
+
+def _backtest_strategy(symbols: List[str]) -> None:
+    from nse_fno_scanner import backtest_strategy
+
+    for sym in symbols:
+        backtest_strategy(sym, mode="both")
+
+
+def _simulate_market(symbols: List[str]) -> None:
+    from nse_fno_scanner import simulate_market
+
+    simulate_market(symbols, period="30d")
+
+
+def _run_scan(symbols: List[str]) -> None:
+    import run_scan
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_scan.run(Path(tmp) / "shortlist.txt", symbols=symbols)
+
+
+# Statements timed in a fresh interpreter by the "imports" benchmark.
+IMPORTS = {
+    "import:nse_fno_scanner": "import nse_fno_scanner",
+    "import:printf": "from nse_fno_scanner import printf",
+    "import:filter_by_dma": "from nse_fno_scanner import filter_by_dma",
+    "import:run_scan": "import run_scan",
+}
+
+BENCHMARKS: Dict[str, Callable[[List[str]], None]] = {
+    "filter_by_dma": _filter_by_dma,
+    "intraday_scan": _intraday_scan,
+    "backtest_strategy": _backtest_strategy,
+    "simulate_market": _simulate_market,
+    "run_scan.run": _run_scan,
+}
+
+
+def time_call(func: Callable[[], None], repeat: int) -> List[float]:
+    """Return the wall-clock seconds of ``repeat`` calls to ``func``."""
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def time_import(statement: str, repeat: int) -> List[float]:
+    """Return the seconds ``statement`` takes in ``repeat`` fresh interpreters."""
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - started)"
+    )
+    root = Path(__file__).resolve().parents[1]
+    timings = []
+    for _ in range(max(1, repeat)):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, check=True, capture_output=True, text=True
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def _result(name: str, symbols: int, timings: List[float]) -> dict:
+    best = min(timings)
+    print(f"{name:>24} n={symbols:<6} best={best:.3f}s", file=sys.stderr)
+    return {
+        "name": name,
+        "symbols": symbols,
+        "repeat": len(timings),
+        "best": best,
+        "median": statistics.median(timings),
+        "per_symbol_us": best / max(symbols, 1) * 1e6,
+    }
+
+
+def run_suite(
+    names: Optional[Sequence[str]] = None,
+    sizes: Sequence[int] = SIZES,
+    *,
+    repeat: int = 3,
+    seed: int = 0,
+    download: Optional[Callable[..., pd.DataFrame]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    source: str = "synthetic",
+) -> dict:
+    """Run the selected benchmarks and return the report.
+
+    Parameters
+    ----------
+    names : Sequence[str], optional
+        Benchmarks to run. Defaults to all of :data:`BENCHMARKS` plus
+        ``"imports"``, which times the statements in :data:`IMPORTS` once
+        rather than per size.
+    sizes : Sequence[int], optional
+        Universe sizes to time each benchmark at.
+    repeat : int, optional
+        Timed runs per benchmark and size; the best is compared.
+    seed : int, optional
+        Seed of the synthetic market.
+    download : callable, optional
+        Replacement for ``yf.download``. Defaults to a synthetic market.
+    symbols : Sequence[str], optional
+        Universe to draw from instead of generated names, e.g. the symbols
+        of a recording. Sizes larger than the universe are capped.
+    source : str, optional
+        Label of the data source stored in the report.
+
+    Returns
+    -------
+    dict
+        Report with environment metadata and one result per benchmark and
+        size.
+    """
+    names = list(names or [*BENCHMARKS, "imports"])
+    unknown = sorted(set(names) - set(BENCHMARKS) - {"imports"})
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+    market = SyntheticMarket(seed)
+    download = download or market.download
+    results = []
+    if "imports" in names:
+        for name, statement in IMPORTS.items():
+            results.append(_result(name, 0, time_import(statement, repeat)))
+    with patched(download):
+        for size in sizes:
+            universe = list(symbols[:size]) if symbols is not None else symbol_names(size)
+            for name in names:
+                if name in BENCHMARKS:
+                    timings = time_call(lambda: BENCHMARKS[name](universe), repeat)
+                    results.append(_result(name, len(universe), timings))
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source,
+        "seed": seed,
+        "market_end": str(market.end.date()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.2) -> List[dict]:
+    """Return the results of ``report`` that regressed against ``baseline``.
+
+    A result regresses when its best time exceeds the baseline's best for
+    the same benchmark and size by more than ``tolerance`` (a fraction).
+    Each entry carries both timings and their ratio.
+    """
+    base = {(r["name"], r["symbols"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = base.get((result["name"], result["symbols"]))
+        if old is None or old["best"] <= 0:
+            continue
+        ratio = result["best"] / old["best"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                {
+                    "name": result["name"],
+                    "symbols": result["symbols"],
+                    "baseline": old["best"],
+                    "current": result["best"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def _list(text: str) -> List[str]:
+    return [v.strip() for v in text.split(",") if v.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line interface; returns ``1`` when a regression is found."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmark the scanner offline"
+    )
+    parser.add_argument(
+        "--bench", type=_list, help=f"Benchmarks to run ({', '.join(BENCHMARKS)}, imports)"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda t: [int(v) for v in _list(t)],
+        default=list(SIZES),
+        help="Universe sizes, e.g. 200,2000",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic market seed")
+    parser.add_argument("--record", type=Path, help="Record live Yahoo responses to this directory")
+    parser.add_argument("--replay", type=Path, help="Serve responses recorded in this directory")
+    parser.add_argument("--symbols", type=_list, help="Symbols to use with --record or --replay")
+    parser.add_argument(
+        "--output", type=Path, default=Path("bench_report.json"), help="JSON report file"
+    )
+    parser.add_argument("--baseline", type=Path, help="Report to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown before failing"
+    )
+    args = parser.parse_args(argv)
+
+    import yfinance as yf
+
+    download, source, symbols = None, "synthetic", None
+    if args.record or args.replay:
+        from nse_fno_scanner.fetch_fno_list import fetch_fno_list
+
+        symbols = args.symbols or fetch_fno_list()
+    if args.record:
+        download, source = Recorder(yf.download, args.record), f"record:{args.record}"
+    elif args.replay:
+        download, source = Replayer(args.replay), f"replay:{args.replay}"
+
+    report = run_suite(
+        args.bench,
+        args.sizes,
+        repeat=args.repeat,
+        seed=args.seed,
+        download=download,
+        symbols=symbols,
+        source=source,
+    )
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['name']} n={r['symbols']}: "
+                f"{r['baseline']:.3f}s -> {r['current']:.3f}s ({r['ratio']:.2f}x)"
+            )
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+__all__ = ["BENCHMARKS", "IMPORTS", "SIZES", "compare", "main", "run_suite", "time_call", "time_import"]
@@ -0,0 +1,183 @@
+"""Deterministic synthetic OHLC bars shaped like Yahoo Finance downloads.
+
+Every ticker gets its own random walk, seeded from the market seed and the
+ticker name, over an NSE-like calendar: weekdays minus a seeded set of
+holidays, with intraday sessions running from 09:15 to 15:30 IST. The same
+seed, end date and request always produce the same frame.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from nse_fno_scanner.cache import _PERIOD_RE, is_intraday, period_start
+
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+SESSION_MINUTES = 375
+TIMEZONE = "Asia/Kolkata"
+COLUMNS = ["Adj Close", "Close", "High", "Low", "Open", "Volume"]
+
+
+def interval_minutes(interval: str) -> int:
+    """Return the length of an intraday ``interval`` such as ``"15m"`` in minutes."""
+    if interval.endswith("h"):
+        return int(interval[:-1]) * 60
+    return int(interval[:-1])
+
+
+def symbol_names(count: int, prefix: str = "SYN") -> List[str]:
+    """Return ``count`` distinct synthetic symbols."""
+    width = len(str(max(count - 1, 0)))
+    return [f"{prefix}{i:0{width}d}" for i in range(count)]
+
+
+class SyntheticMarket:
+    """Random-walk market that answers ``yf.download``-style requests.
+
+    Parameters
+    ----------
+    seed : int, optional
+        Seed shared by all tickers.
+    end : str, optional
+        Last trading day of the calendar.
+    years : int, optional
+        Length of the daily history.
+    holiday_rate : float, optional
+        Fraction of weekdays that are exchange holidays.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        *,
+        end: str = "2024-06-28",
+        years: int = 2,
+        holiday_rate: float = 0.04,
+    ) -> None:
+        self.seed = seed
+        self.end = pd.Timestamp(end)
+        weekdays = pd.bdate_range(self.end - pd.DateOffset(years=years), self.end)
+        rng = np.random.default_rng([seed, 0])
+        holidays = rng.random(len(weekdays)) < holiday_rate
+        holidays[-1] = False
+        self.calendar = weekdays[~holidays]
+
+    def _key(self, ticker: str, interval: str) -> int:
+        return zlib.crc32(f"{ticker}|{interval}".encode())
+
+    def _daily(self, ticker: str) -> pd.DataFrame:
+        """Return the daily random walk of ``ticker`` over the whole calendar."""
+        bars = len(self.calendar)
+        rng = np.random.default_rng([self.seed, self._key(ticker, "1d")])
+        drift = rng.normal(0.0, 0.0015)
+        vol = rng.uniform(0.01, 0.03)
+        start = rng.uniform(50, 5000)
+        close = start * np.exp(np.cumsum(rng.normal(drift, vol, bars)))
+        open_ = np.empty(bars)
+        open_[0] = start
+        open_[1:] = close[:-1] * np.exp(rng.normal(0.0, vol / 4, bars - 1))
+        spread = np.abs(rng.normal(0.0, vol / 2, (2, bars)))
+        return pd.DataFrame(
+            {
+                "Adj Close": close,
+                "Close": close,
+                "High": np.maximum(open_, close) * (1 + spread[0]),
+                "Low": np.minimum(open_, close) * (1 - spread[1]),
+                "Open": open_,
+                "Volume": rng.integers(10_000, 5_000_000, bars),
+            },
+            index=pd.DatetimeIndex(self.calendar, name="Date"),
+            columns=COLUMNS,
+        )
+
+    def _intraday(self, ticker: str, interval: str, days: pd.DatetimeIndex) -> pd.DataFrame:
+        """Return intraday bars of ``ticker`` for the trading ``days``.
+
+        Each session is drawn from its own seed and starts at that day's daily
+        open, so only the requested sessions are generated.
+        """
+        step = interval_minutes(interval)
+        per_day = -(-SESSION_MINUTES // step)
+        vol = 0.02 * np.sqrt(step / SESSION_MINUTES)
+        positions = self.calendar.get_indexer(days)
+        key = self._key(ticker, interval)
+        draws = np.empty((4, len(positions), per_day))
+        for i, pos in enumerate(positions):
+            draws[:, i] = np.random.default_rng([self.seed, key, pos]).standard_normal((4, per_day))
+        day_open = self._daily(ticker)["Open"].to_numpy()[positions][:, None]
+        close = day_open * np.exp(np.cumsum(draws[0] * vol, axis=1))
+        open_ = np.concatenate([day_open, close[:, :-1]], axis=1)
+        offsets = SESSION_OPEN + pd.to_timedelta(np.arange(per_day) * step, unit="min")
+        stamps = (days.values[:, None] + offsets.values[None, :]).ravel()
+        close, open_ = close.ravel(), open_.ravel()
+        return pd.DataFrame(
+            {
+                "Adj Close": close,
+                "Close": close,
+                "High": np.maximum(open_, close) * (1 + np.abs(draws[1].ravel()) * vol / 2),
+                "Low": np.minimum(open_, close) * (1 - np.abs(draws[2].ravel()) * vol / 2),
+                "Open": open_,
+                "Volume": (np.abs(draws[3].ravel()) * 50_000).astype("int64") + 100,
+            },
+            index=pd.DatetimeIndex(stamps, name="Datetime").tz_localize(TIMEZONE),
+            columns=COLUMNS,
+        )
+
+    def _sessions(self, interval: str, period: Optional[str], start: Optional[str]) -> pd.DatetimeIndex:
+        """Return the trading days covered by a request."""
+        days = self.calendar
+        if start is not None:
+            return days[days >= pd.Timestamp(start).normalize()]
+        if period is None or period == "max":
+            return days
+        match = _PERIOD_RE.match(period)
+        if is_intraday(interval) and match is not None and match.group(2) == "d":
+            return days[-int(match.group(1)) :]
+        first = period_start(period, self.end + pd.Timedelta(days=1))
+        return days if first is None else days[days >= first]
+
+    def bars(
+        self,
+        ticker: str,
+        *,
+        interval: str = "1d",
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Return the bars Yahoo would send for one ``ticker``.
+
+        Bars do not depend on the request, so the bars of a narrow request
+        are exactly the tail of a wider one.
+        """
+        days = self._sessions(interval, period, start)
+        if is_intraday(interval):
+            return self._intraday(ticker, interval, days)
+        return self._daily(ticker).loc[days]
+
+    def download(
+        self,
+        tickers: str | Iterable[str],
+        *,
+        interval: str = "1d",
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Drop-in replacement for ``yf.download`` serving synthetic bars.
+
+        A single ticker string returns flat columns; a list returns columns
+        grouped as ``(field, ticker)`` like ``group_by="column"``.
+        """
+        if isinstance(tickers, str):
+            return self.bars(tickers, interval=interval, period=period, start=start)
+        frames = {t: self.bars(t, interval=interval, period=period, start=start) for t in tickers}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1, level=0)
+
+
+__all__ = ["SyntheticMarket", "symbol_names", "interval_minutes"]
@@ -1,11 +1,16 @@
-"""Example custom strategy for NiftyStocks.
+"""Example custom strategies for NiftyStocks.
 
-The function below accepts an iterable of stock symbols and returns a
-filtered list.
+``only_n_symbols`` accepts an iterable of stock symbols and returns a
+filtered list. ``golden_cross_on_volume`` is a vectorized strategy that
+receives preloaded price panels and returns a mask over all symbols.
 """
 
 from typing import Iterable, List
 
+import pandas as pd
+
+from nse_fno_scanner.strategy_loader import Panel, vectorized
+
 
 def only_n_symbols(symbols: Iterable[str]) -> List[str]:
     """Return symbols starting with 'N'.
@@ -22,3 +27,15 @@ def only_n_symbols(symbols: Iterable[str]) -> List[str]:
     """
     return [s for s in symbols if s.startswith("N")]
 
+
+@vectorized(columns=("Close", "Volume"), lookback="250d", indicators=("sma20", "sma50"))
+def golden_cross_on_volume(panel: Panel) -> pd.Series:
+    """Keep symbols above both DMAs on above-average volume.
+
+    Runs on the daily bars the scan already downloaded, for every symbol at
+    once, instead of fetching prices again.
+    """
+    close = panel["Close"].iloc[-1]
+    volume = panel["Volume"]
+    trend = (close > panel["sma20"].iloc[-1]) & (panel["sma20"].iloc[-1] > panel["sma50"].iloc[-1])
+    return trend & (volume.iloc[-1] > volume.iloc[-20:].mean())
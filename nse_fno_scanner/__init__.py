@@ -1,19 +1,62 @@
-"""Utilities for scanning NSE F&O stocks for bullish setups."""
-
-from .fetch_fno_list import fetch_fno_list
-from .dma_filter import filter_by_dma
-from .intraday_scanner import intraday_scan
-from .backtester import backtest_strategy
-from .simulator import simulate_market, plot_pnl
-from .ohlc import fetch_ohlc
-from .market_predictor import (
-    predict_index_movement,
-    compare_with_indices,
-    send_telegram_message,
-)
-from .utils import printf
-from .strategy_loader import load_strategy
-from run_scan import schedule_scan_with_prediction
+"""Utilities for scanning NSE F&O stocks for bullish setups.
+
+Public names are loaded on first access, so importing the package (or only
+:func:`printf`) does not pull in pandas, yfinance or matplotlib.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> module that defines it. Relative names live in this package.
+_EXPORTS = {
+    "fetch_fno_list": ".fetch_fno_list",
+    "filter_by_dma": ".dma_filter",
+    "intraday_scan": ".intraday_scanner",
+    "backtest_strategy": ".backtester",
+    "simulate_market": ".simulator",
+    "plot_pnl": ".simulator",
+    "fetch_ohlc": ".ohlc",
+    "predict_index_movement": ".market_predictor",
+    "compare_with_indices": ".market_predictor",
+    "send_telegram_message": ".market_predictor",
+    "schedule_scan_with_prediction": "run_scan",
+    "load_strategy": ".strategy_loader",
+    "printf": ".utils",
+}
+
+if TYPE_CHECKING:
+    from .fetch_fno_list import fetch_fno_list
+    from .dma_filter import filter_by_dma
+    from .intraday_scanner import intraday_scan
+    from .backtester import backtest_strategy
+    from .simulator import simulate_market, plot_pnl
+    from .ohlc import fetch_ohlc
+    from .market_predictor import (
+        predict_index_movement,
+        compare_with_indices,
+        send_telegram_message,
+    )
+    from .utils import printf
+    from .strategy_loader import load_strategy
+    from run_scan import schedule_scan_with_prediction
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "fetch_fno_list",
@@ -2,41 +2,130 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, Tuple
 
 import logging
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 
-from .intraday_scanner import compute_emas, pattern_confirmed
-from .dma_filter import compute_dmas
+from .barstore import BarStore
+from .ohlc import load_ohlc
+from .session import MarketDataSession
+from .indicators import session_ema
+from .tradelog import Trade, TradeLog
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class Trade:
-    date: pd.Timestamp
-    entry: float
-    exit: float
-    pct_return: float
+def summarize_returns(returns: np.ndarray) -> Tuple[int, float, float]:
+    """Return the trade count, win rate and average of ``returns``."""
+    if len(returns) == 0:
+        return 0, 0.0, 0.0
+    return len(returns), float(np.mean(returns > 0)), float(np.mean(returns))
 
 
-def _download(symbol: str, period: str, interval: str) -> pd.DataFrame:
+def _download(
+    symbol: str,
+    period: str,
+    interval: str,
+    session: MarketDataSession | None = None,
+    store: BarStore | None = None,
+) -> pd.DataFrame:
+    if store is not None:
+        df = store.read(symbol, interval, period=period)
+        if not df.empty:
+            return df
+    if session is not None:
+        return session.get(symbol, period=period, interval=interval)
     logger.debug("Downloading backtest data for %s", symbol)
-    df = yf.download(
-        f"{symbol}.NS",
-        period=period,
-        interval=interval,
-        progress=False,
-        auto_adjust=False,
-        multi_level_index=False,
+    return load_ohlc(symbol, period=period, interval=interval)
+
+
+def _sessions(
+    df: pd.DataFrame, start_hour: int | None
+) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Lay out the bars of ``df`` from ``start_hour`` on as daily sessions.
+
+    Returns the session day of every bar, the opens and closes grouped by day
+    and the start and end offset of each session.
+    """
+    index = pd.DatetimeIndex(df.index)
+    opens = df["Open"].to_numpy(dtype="float64")
+    closes = df["Close"].to_numpy(dtype="float64")
+    if start_hour is not None:
+        keep = index.hour >= start_hour
+        index, opens, closes = index[keep], opens[keep], closes[keep]
+    if len(closes) == 0:
+        empty = np.empty(0, dtype="int64")
+        return pd.DatetimeIndex([]), opens, closes, empty, empty
+
+    days = index.normalize()
+    order = np.argsort(days.asi8, kind="stable")
+    days, opens, closes = days[order], opens[order], closes[order]
+    day_codes = days.asi8
+    starts = np.flatnonzero(np.r_[True, day_codes[1:] != day_codes[:-1]])
+    ends = np.append(starts[1:], len(closes))
+    return days, opens, closes, starts, ends
+
+
+def _session_emas(closes: np.ndarray, starts: np.ndarray, ends: np.ndarray, span: int) -> np.ndarray:
+    if np.isnan(closes).any():
+        session = pd.Series(closes).groupby(np.repeat(np.arange(len(starts)), ends - starts))
+        return session.transform(lambda s: s.ewm(span=span, adjust=False).mean()).to_numpy()
+    return session_ema(closes, starts, span)
+
+
+def _intraday_signals(
+    df: pd.DataFrame,
+    *,
+    start_hour: int | None,
+    fast: int,
+    slow: int,
+    cache: Dict[tuple, object] | None = None,
+) -> Tuple[pd.Index, np.ndarray, np.ndarray, np.ndarray]:
+    """Return per-session trades for the intraday EMA strategy as arrays.
+
+    Every calendar day is a session that restarts the EMAs. Sessions with at
+    least ``max(fast, slow, 5)`` bars from ``start_hour`` on trade from their
+    first open to their last close when the final fast EMA is at or above the
+    slow EMA and the last three closes each rose. Passing the same ``cache``
+    dict for several calls on one frame reuses session layouts and EMAs.
+
+    Returns
+    -------
+    tuple
+        Session dates, entry prices, exit prices and fractional returns.
+    """
+    cache = {} if cache is None else cache
+    if ("sessions", start_hour) not in cache:
+        cache[("sessions", start_hour)] = _sessions(df, start_hour)
+    days, opens, closes, starts, ends = cache[("sessions", start_hour)]
+    if len(closes) == 0:
+        empty = np.empty(0)
+        return pd.DatetimeIndex([]), empty, empty, empty
+
+    for span in (fast, slow):
+        if ("ema", start_hour, span) not in cache:
+            cache[("ema", start_hour, span)] = _session_emas(closes, starts, ends, span)
+    ema_fast = cache[("ema", start_hour, fast)]
+    ema_slow = cache[("ema", start_hour, slow)]
+
+    long_enough = ends - starts >= max(fast, slow, 5)
+    first, last = starts[long_enough], ends[long_enough] - 1
+    pattern = (
+        (closes[last] > closes[last - 1])
+        & (closes[last - 1] > closes[last - 2])
+        & (closes[last - 2] > closes[last - 3])
     )
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    return df
+    signal = (ema_fast[last] >= ema_slow[last]) & pattern
+
+    dates = days[first[signal]]
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    entry = opens[first[signal]]
+    exit_price = closes[last[signal]]
+    return dates, entry, exit_price, (exit_price - entry) / entry
 
 
 def _backtest_intraday(
@@ -47,33 +136,59 @@ def _backtest_intraday(
     start_hour: int | None,
     fast: int,
     slow: int,
-) -> List[Trade]:
-    df = _download(symbol, period, interval)
+    session: MarketDataSession | None = None,
+    store: BarStore | None = None,
+) -> TradeLog:
+    df = _download(symbol, period, interval, session, store)
     if df.empty:
-        return []
-
-    df.index = pd.DatetimeIndex(df.index)
-    trades: List[Trade] = []
-
-    for day, day_df in df.groupby(df.index.date):
-        if start_hour is not None:
-            day_df = day_df[day_df.index.hour >= start_hour]
-        if len(day_df) < max(fast, slow, 5):
-            continue
-        day_df = compute_emas(day_df, fast=fast, slow=slow)
-        if day_df.iloc[-1][f"EMA{fast}"] >= day_df.iloc[-1][f"EMA{slow}"] and pattern_confirmed(day_df):
-            entry = day_df["Open"].iloc[0]
-            exit_price = day_df["Close"].iloc[-1]
-            ret = (exit_price - entry) / entry
-            trades.append(Trade(pd.Timestamp(day), entry, exit_price, ret))
+        return TradeLog()
+
+    dates, entries, exits, returns = _intraday_signals(
+        df, start_hour=start_hour, fast=fast, slow=slow
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        for date, entry, exit_price, ret in zip(dates, entries, exits, returns):
             logger.debug(
                 "Trade %s: entry %.2f exit %.2f return %.2f%%",
-                day,
+                date.date(),
                 entry,
                 exit_price,
                 ret * 100,
             )
-    return trades
+    return TradeLog.from_arrays(symbol, dates, entries, exits, returns)
+
+
+def _daily_signals(
+    df: pd.DataFrame,
+    *,
+    fast: int,
+    slow: int,
+    cache: Dict[tuple, object] | None = None,
+) -> Tuple[pd.Index, np.ndarray, np.ndarray, np.ndarray]:
+    """Return next-day trades for the daily DMA strategy as arrays.
+
+    A signal on day ``i`` (fast DMA not at or below the slow DMA once ``slow``
+    bars exist) buys the open of day ``i + 1`` and sells its close. Passing
+    the same ``cache`` dict for several calls on one frame reuses the
+    moving averages.
+
+    Returns
+    -------
+    tuple
+        Trade dates, entry prices, exit prices and fractional returns.
+    """
+    cache = {} if cache is None else cache
+    close = df["Close"]
+    for period in (fast, slow):
+        if ("sma", period) not in cache:
+            cache[("sma", period)] = close.rolling(period).mean().to_numpy()
+    signal = ~(cache[("sma", fast)] <= cache[("sma", slow)])
+    signal[: max(slow - 1, 0)] = False
+    signal[-1:] = False
+    idx = np.flatnonzero(signal) + 1
+    entry = df["Open"].to_numpy(dtype="float64")[idx]
+    exit_price = close.to_numpy(dtype="float64")[idx]
+    return df.index[idx], entry, exit_price, (exit_price - entry) / entry
 
 
 def _backtest_daily(
@@ -82,31 +197,24 @@ def _backtest_daily(
     period: str,
     fast: int,
     slow: int,
-) -> List[Trade]:
-    df = _download(symbol, period, "1d")
+    session: MarketDataSession | None = None,
+    store: BarStore | None = None,
+) -> TradeLog:
+    df = _download(symbol, period, "1d", session, store)
     if df.empty:
-        return []
-
-    df = compute_dmas(df, fast=fast, slow=slow)
-    trades: List[Trade] = []
-    for i in range(len(df) - 1):
-        row = df.iloc[i]
-        if i < slow - 1:
-            continue
-        if row[f"DMA{fast}"] <= row[f"DMA{slow}"]:
-            continue
-        entry = df.iloc[i + 1]["Open"]
-        exit_price = df.iloc[i + 1]["Close"]
-        ret = (exit_price - entry) / entry
-        trades.append(Trade(df.index[i + 1], entry, exit_price, ret))
-        logger.debug(
-            "Daily trade %s: entry %.2f exit %.2f return %.2f%%",
-            df.index[i + 1].date(),
-            entry,
-            exit_price,
-            ret * 100,
-        )
-    return trades
+        return TradeLog()
+
+    dates, entries, exits, returns = _daily_signals(df, fast=fast, slow=slow)
+    if logger.isEnabledFor(logging.DEBUG):
+        for date, entry, exit_price, ret in zip(dates, entries, exits, returns):
+            logger.debug(
+                "Daily trade %s: entry %.2f exit %.2f return %.2f%%",
+                pd.Timestamp(date).date(),
+                entry,
+                exit_price,
+                ret * 100,
+            )
+    return TradeLog.from_arrays(symbol, dates, entries, exits, returns)
 
 
 def backtest_strategy(
@@ -119,7 +227,9 @@ def backtest_strategy(
     fast: int = 20,
     slow: int = 50,
     return_trades: bool = False,
-) -> Tuple[int, float, float] | Tuple[int, float, float, List[Trade]]:
+    session: MarketDataSession | None = None,
+    store: BarStore | None = None,
+) -> Tuple[int, float, float] | Tuple[int, float, float, TradeLog]:
     """Backtest a strategy for ``symbol``.
 
     Parameters
@@ -130,11 +240,20 @@ def backtest_strategy(
         Data period for Yahoo Finance downloads (e.g. "30d", "6mo").
     interval : str
         Candle interval for the intraday strategy.
+    session : MarketDataSession, optional
+        Session that serves and remembers the downloaded bars.
+    store : BarStore, optional
+        Bar store read before downloading. ``period`` then counts back from
+        the last stored bar, so histories longer than Yahoo's intraday
+        lookback can be backtested.
+    return_trades : bool, optional
+        Also return the trades as a :class:`TradeLog`. Iterating the log
+        yields :class:`Trade` objects.
     """
 
-    trades: List[Trade] = []
+    logs = []
     if mode in {"intraday", "both"}:
-        trades.extend(
+        logs.append(
             _backtest_intraday(
                 symbol,
                 period=period,
@@ -142,24 +261,24 @@ def backtest_strategy(
                 start_hour=start_hour,
                 fast=fast,
                 slow=slow,
+                session=session,
+                store=store,
             )
         )
     if mode in {"daily", "both"}:
-        trades.extend(
+        logs.append(
             _backtest_daily(
                 symbol,
                 period=period,
                 fast=fast,
                 slow=slow,
+                session=session,
+                store=store,
             )
         )
 
-    if not trades:
-        return 0, 0.0, 0.0
-
-    returns = [t.pct_return for t in trades]
-    win_rate = sum(r > 0 for r in returns) / len(returns)
-    avg_return = sum(returns) / len(returns)
+    trades = TradeLog.concat(logs)
+    count, win_rate, avg_return = summarize_returns(trades.ret)
     if return_trades:
-        return len(trades), win_rate, avg_return, trades
-    return len(trades), win_rate, avg_return
+        return count, win_rate, avg_return, trades
+    return count, win_rate, avg_return
@@ -0,0 +1,265 @@
+"""Memory-mapped columnar store for long bar histories.
+
+Each ``(symbol, interval)`` series lives in its own directory with one raw
+little-endian file per column (``ts.i8`` holding UTC nanoseconds, then
+``open.f8``, ``high.f8``, ``low.f8``, ``close.f8`` and ``volume.f8``) and a
+``meta.json`` recording the row count and time zone. Series are opened with
+:class:`numpy.memmap`, so slicing a date range touches only the pages it
+needs and processes reading the same files share them through the OS page
+cache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import is_intraday, period_start
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+_FILES = {"ts": "ts.i8", **{col: f"{col.lower()}.f8" for col in COLUMNS}}
+_DAY_PERIOD = re.compile(r"^(\d+)d$")
+# Upper bound on bars per session for minute intervals, used to limit how
+# much of a series is scanned when counting sessions from the end.
+_MAX_BARS_PER_DAY = 1440
+
+
+@dataclass
+class BarSeries:
+    """Read-only view of a stored series.
+
+    ``ts`` holds UTC nanoseconds and ``columns`` maps each OHLCV name to its
+    values; both are memory-mapped or slices of memory maps.
+    """
+
+    ts: np.ndarray
+    columns: Dict[str, np.ndarray]
+    tz: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def slice(self, lo: int, hi: int | None = None) -> "BarSeries":
+        """Return rows ``lo:hi`` without copying."""
+        return BarSeries(
+            self.ts[lo:hi], {k: v[lo:hi] for k, v in self.columns.items()}, self.tz
+        )
+
+    def between(self, start=None, end=None) -> "BarSeries":
+        """Return the bars with ``start <= timestamp < end``."""
+        lo = 0 if start is None else int(np.searchsorted(self.ts, _to_ns(start, self.tz)))
+        hi = None if end is None else int(np.searchsorted(self.ts, _to_ns(end, self.tz)))
+        return self.slice(lo, hi)
+
+    def index(self) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(np.asarray(self.ts).view("M8[ns]"))
+        if self.tz:
+            idx = idx.tz_localize("UTC").tz_convert(self.tz)
+        return idx
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the bars as a DataFrame whose columns share the mapped memory."""
+        return pd.DataFrame(self.columns, index=self.index(), copy=False)
+
+
+def _to_ns(value, tz: Optional[str]) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None and tz:
+        ts = ts.tz_localize(tz)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.as_unit("ns").value
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class BarStore:
+    """Directory of memory-mapped OHLCV series.
+
+    Parameters
+    ----------
+    root : str or Path
+        Directory holding one sub-directory per interval.
+    """
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / symbol.replace(os.sep, "_")
+
+    def symbols(self, interval: str) -> List[str]:
+        """Return the symbols stored for ``interval``."""
+        base = self.root / interval
+        if not base.is_dir():
+            return []
+        return sorted(p.name for p in base.iterdir() if (p / "meta.json").exists())
+
+    def _meta(self, symbol: str, interval: str) -> Optional[dict]:
+        try:
+            return json.loads((self.path(symbol, interval) / "meta.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _arrays(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        arrays = {"ts": index.as_unit("ns").asi8.astype("<i8")}
+        for col in COLUMNS:
+            values = df[col] if col in df else np.full(len(df), np.nan)
+            arrays[col] = np.asarray(values, dtype="<f8")
+        return arrays
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> None:
+        """Replace the stored series with ``df``.
+
+        Files are swapped in atomically, so readers that already mapped the
+        old files keep a consistent view.
+        """
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        path = self.path(symbol, interval)
+        path.mkdir(parents=True, exist_ok=True)
+        tz = pd.DatetimeIndex(df.index).tz
+        for name, values in self._arrays(df).items():
+            _write_file(path / _FILES[name], values.tobytes())
+        meta = {"rows": len(df), "tz": str(tz) if tz is not None else None}
+        _write_file(path / "meta.json", json.dumps(meta).encode())
+
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """Append the bars of ``df`` newer than the last stored one.
+
+        Bars at or before the last stored timestamp are ignored, so only
+        completed sessions should be stored. The row count in ``meta.json`` is
+        updated last; readers never see partially appended rows.
+
+        Returns
+        -------
+        int
+            Number of rows appended.
+        """
+        meta = self._meta(symbol, interval)
+        if meta is None or meta["rows"] == 0:
+            self.write(symbol, interval, df)
+            return len(df)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        arrays = self._arrays(df)
+        series = self.open(symbol, interval)
+        keep = arrays["ts"] > series.ts[-1]
+        if not keep.any():
+            return 0
+        path = self.path(symbol, interval)
+        rows = meta["rows"]
+        for name, values in arrays.items():
+            with open(path / _FILES[name], "r+b") as fh:
+                # Drop bytes past ``rows`` left by an interrupted append.
+                fh.truncate(rows * 8)
+                fh.seek(0, os.SEEK_END)
+                fh.write(values[keep].tobytes())
+        meta["rows"] = rows + int(keep.sum())
+        _write_file(path / "meta.json", json.dumps(meta).encode())
+        return int(keep.sum())
+
+    def open(self, symbol: str, interval: str) -> Optional[BarSeries]:
+        """Map the stored series, or return ``None`` when there is none."""
+        meta = self._meta(symbol, interval)
+        if meta is None:
+            return None
+        path = self.path(symbol, interval)
+        rows = meta["rows"]
+
+        def mapped(name: str, dtype: str) -> np.ndarray:
+            if rows == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(path / _FILES[name], dtype=dtype, mode="r", shape=(rows,))
+
+        columns = {col: mapped(col, "<f8") for col in COLUMNS}
+        return BarSeries(mapped("ts", "<i8"), columns, meta.get("tz"))
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        *,
+        period: str | None = None,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Return stored bars as a DataFrame backed by the memory maps.
+
+        ``period`` is measured back from the last stored bar rather than from
+        today, so ``"2y"`` selects the latest two years of history. Intraday
+        periods in days select that many sessions, as Yahoo does. ``start``
+        and ``end`` bound the range explicitly instead. An empty frame is
+        returned for symbols that are not stored.
+        """
+        series = self.open(symbol, interval)
+        if series is None or len(series) == 0:
+            return pd.DataFrame(columns=list(COLUMNS))
+        if period is not None:
+            series = series.slice(self._period_offset(series, period, interval))
+        series = series.between(start, end)
+        return series.to_frame()
+
+    def _period_offset(self, series: BarSeries, period: str, interval: str) -> int:
+        match = _DAY_PERIOD.match(period)
+        if is_intraday(interval) and match is not None:
+            sessions = int(match.group(1))
+            lo = max(0, len(series) - sessions * _MAX_BARS_PER_DAY)
+            days = series.slice(lo).index().normalize()
+            keep = days.unique()[-sessions:]
+            return lo + int(np.searchsorted(days, keep[0]))
+        last = series.slice(len(series) - 1).index()[0]
+        start = period_start(period, last)
+        if start is None:
+            return 0
+        return int(np.searchsorted(series.ts, _to_ns(start, series.tz)))
+
+    def update(
+        self,
+        symbols: Iterable[str],
+        *,
+        interval: str,
+        period: str = "7d",
+        batch_size: int = 50,
+    ) -> Dict[str, int]:
+        """Download the latest ``period`` of bars and append them.
+
+        Run after the close (e.g. from cron) to grow the history beyond
+        Yahoo's intraday lookback.
+
+        Returns
+        -------
+        Dict[str, int]
+            Rows appended per symbol.
+        """
+        from .ohlc import download_many
+
+        frames = download_many(symbols, period=period, interval=interval, batch_size=batch_size)
+        added = {sym: self.append(sym, interval, df) for sym, df in frames.items()}
+        logger.debug("Appended %d %s bars for %d symbols", sum(added.values()), interval, len(added))
+        return added
+
+
+__all__ = ["BarStore", "BarSeries", "COLUMNS"]
@@ -0,0 +1,173 @@
+"""Daily market breadth series.
+
+Breadth is computed in one vectorized pass over a time-aligned (date x
+symbol) close panel of the whole universe, so years of history cost about
+as much as a single day. The table gives, for every date, the number of
+advancing and declining symbols, the share of symbols above their moving
+averages, how many pass the daily DMA filter and the equal-weighted return
+of the universe against the indices.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .indicators import price_panel, sma
+from .session import MarketDataSession
+
+logger = logging.getLogger(__name__)
+
+INDICES = {"nifty": "^NSEI", "banknifty": "^NSEBANK"}
+
+
+def shortlist_counts(
+    close: pd.DataFrame,
+    offset: int = 1,
+    *,
+    fast_period: int = 20,
+    slow_period: int = 50,
+) -> pd.Series:
+    """Return the number of symbols the daily DMA filter passes on each date.
+
+    Every row of the time-aligned ``close`` panel is treated as the latest
+    candle of a scan run on that date, so the result matches calling
+    :func:`~nse_fno_scanner.dma_filter.shortlist_by_dma` on the history up
+    to each date, for all dates at once.
+    """
+    fast = sma(close, fast_period).shift(offset)
+    slow = sma(close, slow_period).shift(offset)
+    enough = close.notna().cumsum() >= slow_period + offset
+    passed = (fast > slow) & enough
+    return passed.sum(axis=1).rename("shortlisted")
+
+
+def compute_breadth(
+    close: pd.DataFrame,
+    indices: Mapping[str, pd.Series] | None = None,
+    *,
+    dma_periods: Sequence[int] = (20, 50),
+    fast: int = 20,
+    slow: int = 50,
+    offset: int = 1,
+) -> pd.DataFrame:
+    """Return breadth statistics for every row of a close panel.
+
+    Parameters
+    ----------
+    close : pd.DataFrame
+        Daily closes indexed by date with one column per symbol, as built by
+        :func:`~nse_fno_scanner.indicators.price_panel` with
+        ``align="time"``. Missing bars are ``NaN``.
+    indices : Mapping[str, pd.Series], optional
+        Index closes keyed by the name used for their columns.
+    dma_periods : Sequence[int], optional
+        Moving averages for the ``above_dma<N>`` columns.
+    fast, slow, offset : int, optional
+        Settings of the daily DMA filter counted by ``trending``, as for
+        :func:`~nse_fno_scanner.dma_filter.filter_by_dma`.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed like ``close`` with the columns
+
+        ``symbols``
+            Symbols with a close on the date.
+        ``advances``, ``declines``
+            Symbols closing above and below their previous close.
+        ``ad_line``
+            Cumulative advances minus declines.
+        ``above_dma<N>``
+            Share of symbols with a defined ``N``-day average closing above
+            it.
+        ``trending``
+            Symbols the daily DMA filter passes when the row is the latest
+            candle, see :func:`shortlist_counts`.
+        ``avg_return``
+            Equal-weighted mean daily return of the symbols.
+        ``<index>``, ``<index>_excess``
+            Daily return of each index and ``avg_return`` minus it.
+    """
+    values = close.to_numpy(dtype="float64")
+    present = ~np.isnan(values)
+    returns = np.full_like(values, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = values[1:] / values[:-1] - 1
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=1)
+    advances = (returns > 0).sum(axis=1)
+    declines = (returns < 0).sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        avg_return = np.where(valid, returns, 0.0).sum(axis=1) / counts
+
+    out = pd.DataFrame(
+        {
+            "symbols": present.sum(axis=1),
+            "advances": advances,
+            "declines": declines,
+            "ad_line": np.cumsum(advances - declines),
+        },
+        index=close.index,
+    )
+    for period in dma_periods:
+        avg = sma(close, period).to_numpy()
+        defined = ~np.isnan(avg)
+        with np.errstate(invalid="ignore"):
+            above = (values > avg).sum(axis=1)
+            out[f"above_dma{period}"] = above / defined.sum(axis=1)
+    out["trending"] = shortlist_counts(close, offset, fast_period=fast, slow_period=slow).to_numpy()
+    out["avg_return"] = avg_return
+    for name, series in (indices or {}).items():
+        index_return = series.reindex(close.index).pct_change(fill_method=None)
+        out[name] = index_return.to_numpy()
+        out[f"{name}_excess"] = avg_return - out[name].to_numpy()
+    return out
+
+
+def market_breadth(
+    symbols: Iterable[str],
+    *,
+    period: str = "250d",
+    session: MarketDataSession | None = None,
+    indices: Mapping[str, str] = INDICES,
+    **kwargs,
+) -> pd.DataFrame:
+    """Load daily bars for ``symbols`` and the indices and compute breadth.
+
+    The bars come from ``session`` (a new one when omitted), so within a
+    scan the frames already downloaded by the DMA filter are reused. Pass a
+    longer ``period`` such as ``"5y"`` for calibration history. Remaining
+    keyword arguments go to :func:`compute_breadth`.
+    """
+    session = MarketDataSession() if session is None else session
+    symbols = list(symbols)
+    frames = session.get_many(
+        symbols + list(indices.values()), period=period, interval="1d", desc="Breadth"
+    )
+    close = price_panel({s: frames[s] for s in symbols if s in frames}, "Close")
+    if close.empty:
+        return pd.DataFrame()
+    index_closes = {
+        name: frames[ticker]["Close"].set_axis(_naive(frames[ticker].index))
+        for name, ticker in indices.items()
+        if ticker in frames
+    }
+    close.index = _naive(close.index)
+    logger.debug("Breadth over %d symbols and %d dates", close.shape[1], close.shape[0])
+    return compute_breadth(close, index_closes, **kwargs)
+
+
+def _naive(index: pd.Index) -> pd.Index:
+    """Return session dates without time zone so stocks and indices align."""
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return index.normalize()
+    return index
+
+
+__all__ = ["INDICES", "compute_breadth", "market_breadth", "shortlist_counts"]
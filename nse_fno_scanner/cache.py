@@ -0,0 +1,307 @@
+"""Persistent on-disk cache for OHLC downloads.
+
+Each ``(symbol, interval)`` pair is stored in its own ``.npz`` file with one
+array per column, so a cached history can be extended by fetching only the
+bars that appeared since the last cached timestamp.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "NSE_FNO_CACHE_DIR"
+CACHE_MAX_AGE_ENV = "NSE_FNO_CACHE_MAX_AGE"
+
+# Cached history may start this much later than the requested window and
+# still be considered complete (weekends and exchange holidays).
+COVERAGE_SLACK = pd.Timedelta(days=7)
+
+Fetcher = Callable[..., pd.DataFrame]
+BatchFetcher = Callable[..., Dict[str, pd.DataFrame]]
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def is_intraday(interval: str) -> bool:
+    """Return ``True`` for minute and hourly intervals such as ``"15m"``."""
+    return interval[-1:] in {"m", "h"}
+
+
+def period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Return the first timestamp covered by a Yahoo ``period`` string.
+
+    ``None`` is returned for open ended periods such as ``"max"``.
+    """
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    match = _PERIOD_RE.match(period)
+    if match is None:
+        return None
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return now - pd.Timedelta(days=n)
+    if unit == "wk":
+        return now - pd.Timedelta(weeks=n)
+    if unit == "mo":
+        return now - pd.DateOffset(months=n)
+    return now - pd.DateOffset(years=n)
+
+
+def window(df: pd.DataFrame, period: str, interval: str) -> pd.DataFrame:
+    """Slice ``df`` to the bars Yahoo would return for ``period``.
+
+    Intraday requests measured in days keep the last ``n`` sessions, which is
+    how Yahoo interprets e.g. ``period="2d"`` for 15 minute candles.
+    """
+    if df.empty:
+        return df
+    match = _PERIOD_RE.match(period)
+    if is_intraday(interval) and match is not None and match.group(2) == "d":
+        days = pd.Index(df.index.date).unique()
+        keep = days[-int(match.group(1)):]
+        return df[np.isin(df.index.date, keep)]
+    start = period_start(period, pd.Timestamp.now(tz=df.index.tz))
+    if start is None:
+        return df
+    return df[df.index >= start]
+
+
+class OHLCCache:
+    """Columnar per-symbol cache of OHLC bars.
+
+    Parameters
+    ----------
+    root : str or Path
+        Directory holding one sub-directory per interval.
+    max_age : float, optional
+        Seconds for which cached bars are served without contacting the
+        network. ``0`` (the default) always fetches the missing bars.
+    """
+
+    def __init__(self, root: str | os.PathLike, max_age: float = 0.0) -> None:
+        self.root = Path(root)
+        self.max_age = max_age
+
+    def path(self, symbol: str, interval: str) -> Path:
+        safe = symbol.replace(os.sep, "_")
+        return self.root / interval / f"{safe}.npz"
+
+    def load(self, symbol: str, interval: str) -> Optional[Tuple[pd.DataFrame, float]]:
+        """Return the cached frame and its fetch time, or ``None``."""
+        path = self.path(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = [str(c) for c in data["columns"]]
+                tz = str(data["tz"]) or None
+                fetched_at = float(data["fetched_at"])
+                index = pd.DatetimeIndex(data["index"].view("datetime64[ns]"))
+                index = index.as_unit(str(data["unit"]))
+                if tz is not None:
+                    index = index.tz_localize("UTC").tz_convert(tz)
+                frame = pd.DataFrame(
+                    {col: data[f"col_{i}"] for i, col in enumerate(columns)},
+                    index=index,
+                )
+        except Exception as exc:
+            logger.debug("Ignoring unreadable cache file %s: %s", path, exc)
+            return None
+        return frame, fetched_at
+
+    def store(self, symbol: str, interval: str, df: pd.DataFrame) -> None:
+        """Write ``df`` for ``symbol`` atomically."""
+        path = self.path(symbol, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else ""
+        unit = index.unit
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        arrays = {f"col_{i}": _column(df[col]) for i, col in enumerate(df.columns)}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(
+                    fh,
+                    index=index.as_unit("ns").asi8,
+                    unit=np.array(unit),
+                    columns=np.array([str(c) for c in df.columns]),
+                    tz=np.array(tz),
+                    fetched_at=np.array(time.time()),
+                    **arrays,
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def get(
+        self,
+        symbol: str,
+        *,
+        period: str,
+        interval: str,
+        fetch: Fetcher,
+        max_age: float | None = None,
+    ) -> pd.DataFrame:
+        """Return bars for ``symbol`` updating the cache as needed.
+
+        ``fetch`` is called as ``fetch(symbol, interval=..., period=...)`` for
+        a full download or ``fetch(symbol, interval=..., start=...)`` to
+        retrieve only the bars after the last cached timestamp.
+        """
+
+        def fetch_many(symbols: List[str], **kwargs) -> Dict[str, pd.DataFrame]:
+            return {sym: fetch(sym, **kwargs) for sym in symbols}
+
+        frames = self.get_many(
+            [symbol],
+            period=period,
+            interval=interval,
+            fetch_many=fetch_many,
+            max_age=max_age,
+            strict=True,
+        )
+        return frames[symbol]
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        *,
+        period: str,
+        interval: str,
+        fetch_many: BatchFetcher,
+        max_age: float | None = None,
+        strict: bool = False,
+    ) -> Dict[str, pd.DataFrame]:
+        """Return bars for several ``symbols`` with as few fetches as possible.
+
+        ``fetch_many`` receives a list of symbols plus either ``period`` or
+        ``start`` and returns a mapping of symbol to frame. Symbols missing
+        from the mapping are left out of the result. Cache misses are fetched
+        together in one call and stale entries are grouped by the date their
+        update starts from. With ``strict`` fetch errors propagate for cache
+        misses instead of being logged.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        out: Dict[str, pd.DataFrame] = {}
+        misses: List[str] = []
+        stale: Dict[str, Dict[str, pd.DataFrame]] = {}
+        for symbol in symbols:
+            cached = self.load(symbol, interval)
+            if cached is None or cached[0].empty:
+                misses.append(symbol)
+                continue
+            df, fetched_at = cached
+            start = period_start(period, pd.Timestamp.now(tz=df.index.tz))
+            if start is None or df.index[0] > start + COVERAGE_SLACK:
+                misses.append(symbol)
+            elif time.time() - fetched_at <= max_age:
+                logger.debug("Cache hit for %s %s", symbol, interval)
+                out[symbol] = window(df, period, interval)
+            else:
+                stale.setdefault(df.index[-1].strftime("%Y-%m-%d"), {})[symbol] = df
+
+        metrics = get_metrics()
+        metrics.inc("cache_hits_total", len(out), interval=interval)
+        metrics.inc("cache_misses_total", len(misses), interval=interval)
+        metrics.inc("cache_stale_total", sum(map(len, stale.values())), interval=interval)
+        for start, frames in stale.items():
+            logger.debug("Updating %d cached %s series from %s", len(frames), interval, start)
+            try:
+                fetched = fetch_many(list(frames), interval=interval, start=start)
+            except Exception as exc:
+                logger.warning("Serving stale cache for %s: %s", ", ".join(frames), exc)
+                fetched = {}
+            for symbol, df in frames.items():
+                new = fetched.get(symbol)
+                if new is not None and not new.empty and isinstance(new.index, pd.DatetimeIndex):
+                    new = _align_tz(new, df.index.tz)
+                    df = pd.concat([df[df.index < new.index[0]], new])
+                    df = df[~df.index.duplicated(keep="last")]
+                    self.store(symbol, interval, df)
+                elif symbol in fetched:
+                    self.store(symbol, interval, df)
+                out[symbol] = window(df, period, interval)
+
+        if misses:
+            logger.debug("Cache miss for %d %s series", len(misses), interval)
+            try:
+                fetched = fetch_many(misses, interval=interval, period=period)
+            except Exception:
+                if strict:
+                    raise
+                logger.debug("Failed to download %s", ", ".join(misses), exc_info=True)
+                fetched = {}
+            for symbol in misses:
+                df = fetched.get(symbol)
+                if df is None:
+                    continue
+                if not df.empty and isinstance(df.index, pd.DatetimeIndex):
+                    self.store(symbol, interval, df)
+                out[symbol] = df
+        return out
+
+
+def _column(series: pd.Series) -> np.ndarray:
+    """Return ``series`` as a plain array in its own dtype, e.g. int64 volumes.
+
+    Columns without a NumPy dtype of their own (nullable or object) are
+    stored as float64, since cache files are read without pickle.
+    """
+    values = series.to_numpy()
+    if values.dtype == object:
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    return values
+
+
+def _align_tz(df: pd.DataFrame, tz) -> pd.DataFrame:
+    index = df.index
+    if tz is None and index.tz is not None:
+        index = index.tz_localize(None)
+    elif tz is not None and index.tz is None:
+        index = index.tz_localize(tz)
+    elif tz is not None:
+        index = index.tz_convert(tz)
+    return df.set_axis(index)
+
+
+_cache: Optional[OHLCCache] = None
+
+
+def set_cache(root: str | os.PathLike | OHLCCache | None, max_age: float = 0.0) -> None:
+    """Enable the shared cache at ``root`` or disable it with ``None``."""
+    global _cache
+    if root is None or isinstance(root, OHLCCache):
+        _cache = root
+    else:
+        _cache = OHLCCache(root, max_age=max_age)
+
+
+def get_cache() -> Optional[OHLCCache]:
+    """Return the shared cache, configuring it from the environment if unset.
+
+    ``NSE_FNO_CACHE_DIR`` enables caching and ``NSE_FNO_CACHE_MAX_AGE`` sets
+    the allowed staleness in seconds.
+    """
+    if _cache is None and os.getenv(CACHE_DIR_ENV):
+        set_cache(os.environ[CACHE_DIR_ENV], float(os.getenv(CACHE_MAX_AGE_ENV, "0")))
+    return _cache
+
+
+__all__ = ["OHLCCache", "set_cache", "get_cache"]
@@ -0,0 +1,338 @@
+"""Fit the index prediction to historical scans.
+
+:func:`~nse_fno_scanner.market_predictor.predict_index_movement` maps the
+number of shortlisted stocks to the probability of an index up move through
+a logistic curve with a ``threshold`` and a ``scale``. :func:`calibrate`
+fits those two parameters on years of daily bars. The daily DMA filter is
+replayed for every date at once on a time-aligned close panel, which gives
+the shortlist count of each day, and the counts are paired with the index
+return of the following day. The fit itself is a Newton iteration run for
+all indices together, so calibrating five years of the F&O universe takes
+about as long as the download.
+
+The fitted parameters are written as JSON by :func:`save_calibration`;
+``run_scan.py`` installs them at startup with :func:`set_calibration`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .breadth import INDICES, _naive, shortlist_counts
+from .indicators import price_panel
+from .session import MarketDataSession
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_ENV = "NSE_FNO_CALIBRATION"
+DEFAULT_PATH = Path("calibration.json")
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """Parameters of the logistic index prediction.
+
+    Attributes
+    ----------
+    threshold : float
+        Shortlist count at which an up move is as likely as not.
+    scale : float
+        Count change that moves the log-odds by one.
+    samples : int
+        Number of days the parameters were fitted on. ``0`` for the
+        uncalibrated defaults.
+    log_loss : float
+        Mean log loss of the fit; ``nan`` for the defaults.
+    start, end : str
+        First and last date of the fitted days.
+    """
+
+    threshold: float = 10.0
+    scale: float = 5.0
+    samples: int = 0
+    log_loss: float = float("nan")
+    start: str = ""
+    end: str = ""
+
+
+DEFAULT = Calibration()
+
+# Smallest standardized slope fit_logistic reports; flatter fits carry no
+# information about the outcome.
+MIN_SLOPE = 1e-6
+
+
+def fit_logistic(
+    x: np.ndarray,
+    y: np.ndarray,
+    *,
+    l2: float = 1e-3,
+    max_iter: int = 50,
+    tol: float = 1e-10,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit ``P(y) = 1 / (1 + exp(-(x - threshold) / scale))`` by Newton's method.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Predictor of shape ``(n,)``.
+    y : np.ndarray
+        Binary outcomes of shape ``(n,)`` or ``(n, k)``; the ``k`` columns
+        are fitted together as a batch. ``NaN`` marks missing outcomes.
+    l2 : float, optional
+        Ridge penalty on the standardized slope, which keeps the fit finite
+        when the outcomes are perfectly separated.
+    max_iter : int, optional
+        Maximum number of Newton steps.
+    tol : float, optional
+        Stop once no coefficient moves by more than this.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        ``threshold`` and ``scale`` with one entry per column of ``y``;
+        both are ``NaN`` for columns whose standardized slope is below
+        :data:`MIN_SLOPE`, e.g. when every outcome is the same.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    y = y[:, None] if y.ndim == 1 else y
+    weight = (~np.isnan(y)).astype("float64")
+    y = np.nan_to_num(y)
+    mean, std = x.mean(), x.std()
+    if not std > 0:
+        raise ValueError("shortlist counts are constant; nothing to fit")
+    design = np.stack([np.ones_like(x), (x - mean) / std], axis=1)  # (n, 2)
+    coef = np.zeros((y.shape[1], 2))  # (k, 2)
+    penalty = np.diag([0.0, l2]) * weight.sum(axis=0)[:, None, None]
+    for _ in range(max_iter):
+        p = 1.0 / (1.0 + np.exp(-(design @ coef.T)))  # (n, k)
+        grad = design.T @ (weight * (p - y))  # (2, k)
+        grad = grad.T + (penalty @ coef[:, :, None])[:, :, 0]
+        w = weight * p * (1.0 - p)
+        hess = np.einsum("ni,nk,nj->kij", design, w, design) + penalty
+        step = np.linalg.solve(hess + 1e-12 * np.eye(2), grad[:, :, None])[:, :, 0]
+        coef -= step
+        if np.abs(step).max() < tol:
+            break
+    intercept, slope = coef[:, 0], coef[:, 1]
+    # Without a slope the threshold runs off to infinity; report no fit.
+    slope = np.where(np.abs(slope) > MIN_SLOPE, slope, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return mean - intercept * std / slope, std / slope
+
+
+def _log_loss(x: np.ndarray, y: np.ndarray, threshold: float, scale: float) -> float:
+    p = 1.0 / (1.0 + np.exp(-(x - threshold) / scale))
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def calibrate(
+    symbols: Iterable[str],
+    *,
+    period: str = "5y",
+    offset: int = 1,
+    fast_period: int = 20,
+    slow_period: int = 50,
+    indices: Mapping[str, str] = INDICES,
+    session: MarketDataSession | None = None,
+) -> Dict[str, Calibration]:
+    """Fit the prediction parameters for every index on ``period`` of history.
+
+    Parameters
+    ----------
+    symbols : Iterable[str]
+        Universe the daily scan runs on.
+    period : str, optional
+        History to download. Defaults to ``"5y"``.
+    offset, fast_period, slow_period : int, optional
+        Daily DMA filter settings, as for
+        :func:`~nse_fno_scanner.dma_filter.filter_by_dma`.
+    indices : Mapping[str, str], optional
+        Index tickers keyed by name.
+    session : MarketDataSession, optional
+        Session serving the daily bars; a new one when omitted.
+
+    Returns
+    -------
+    Dict[str, Calibration]
+        Fitted parameters keyed by index name. Indices without bars, or
+        whose fit has no finite parameters, are left out.
+    """
+    session = MarketDataSession() if session is None else session
+    symbols = list(symbols)
+    frames = session.get_many(
+        symbols + list(indices.values()), period=period, interval="1d", desc="Calibration"
+    )
+    close = price_panel({s: frames[s] for s in symbols if s in frames}, "Close")
+    names = [name for name, ticker in indices.items() if ticker in frames]
+    if close.empty or not names:
+        return {}
+    close.index = _naive(close.index)
+    close = close[~close.index.duplicated(keep="last")]
+    counts = shortlist_counts(close, offset, fast_period=fast_period, slow_period=slow_period)
+
+    # The scan on day t predicts the close-to-close move from t to t + 1.
+    outcomes = {}
+    for name in names:
+        index_close = frames[indices[name]]["Close"]
+        index_close = index_close.set_axis(_naive(index_close.index))
+        index_close = index_close[~index_close.index.duplicated(keep="last")]
+        nxt = index_close.reindex(close.index).pct_change(fill_method=None).shift(-1)
+        outcomes[name] = np.where(nxt.isna(), np.nan, (nxt > 0).astype("float64"))
+    y = np.column_stack([outcomes[name] for name in names])
+    warm = close.notna().cumsum().max(axis=1) >= slow_period + offset
+    rows = warm.to_numpy() & ~np.isnan(y).all(axis=1)
+    x = counts.to_numpy(dtype="float64")[rows]
+    y = y[rows]
+    if len(x) == 0:
+        return {}
+    threshold, scale = fit_logistic(x, y)
+    dates = close.index[rows]
+    out = {}
+    for i, name in enumerate(names):
+        if not _usable(threshold[i], scale[i]):
+            # A slope of about zero: the counts say nothing about this index.
+            logger.warning("Calibration of %s did not converge; keeping the defaults", name)
+            continue
+        valid = ~np.isnan(y[:, i])
+        out[name] = Calibration(
+            threshold=float(threshold[i]),
+            scale=float(scale[i]),
+            samples=int(valid.sum()),
+            log_loss=_log_loss(x[valid], y[valid, i], threshold[i], scale[i]),
+            start=str(dates[0].date()),
+            end=str(dates[-1].date()),
+        )
+        logger.debug("Calibrated %s on %d days: %s", name, out[name].samples, out[name])
+    return out
+
+
+def _usable(threshold: float, scale: float) -> bool:
+    """Return whether the parameters give finite probabilities."""
+    return bool(np.isfinite(threshold) and np.isfinite(scale) and scale != 0)
+
+
+def _check(name: str, cal: Calibration) -> Calibration:
+    if not _usable(cal.threshold, cal.scale):
+        raise ValueError(
+            f"calibration for {name!r} has unusable threshold={cal.threshold} scale={cal.scale}"
+        )
+    return cal
+
+
+def save_calibration(path: str | os.PathLike, calibrations: Mapping[str, Calibration]) -> None:
+    """Write ``calibrations`` keyed by index name as JSON.
+
+    Raises
+    ------
+    ValueError
+        If a threshold or scale is not finite or the scale is zero.
+    """
+    for name, cal in calibrations.items():
+        _check(name, cal)
+    data = {name: asdict(cal) for name, cal in calibrations.items()}
+    Path(path).write_text(json.dumps(data, indent=2))
+
+
+def load_calibration(path: str | os.PathLike, index: str = "nifty") -> Calibration:
+    """Read the parameters of ``index`` from a file written by :func:`save_calibration`.
+
+    Raises
+    ------
+    KeyError
+        If the file has no entry for ``index``.
+    ValueError
+        If the stored threshold or scale is unusable, see
+        :func:`save_calibration`.
+    """
+    data = json.loads(Path(path).read_text())
+    if index not in data:
+        raise KeyError(f"{path} has no calibration for {index!r}")
+    return _check(index, Calibration(**data[index]))
+
+
+_calibration: Optional[Calibration] = None
+
+
+def set_calibration(calibration: Calibration | None) -> None:
+    """Install ``calibration`` for the predictions. ``None`` restores the defaults."""
+    global _calibration
+    _calibration = calibration
+
+
+def get_calibration() -> Calibration:
+    """Return the installed calibration, loading it from the environment if unset.
+
+    ``NSE_FNO_CALIBRATION`` names a file written by :func:`save_calibration`.
+    Without either the uncalibrated :data:`DEFAULT` is returned.
+    """
+    if _calibration is None and os.getenv(CALIBRATION_ENV):
+        set_calibration(load_calibration(os.environ[CALIBRATION_ENV]))
+    return DEFAULT if _calibration is None else _calibration
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Calibration]:
+    """Command line interface for :func:`calibrate`."""
+    parser = argparse.ArgumentParser(
+        prog="run_scan.py calibrate",
+        description="Fit the market prediction to historical daily scans",
+    )
+    parser.add_argument("--symbols", help="Comma separated list of ticker symbols")
+    parser.add_argument("--fno-url", help="Custom URL to download F&O stock list")
+    parser.add_argument("--period", default="5y", help="History to fit on")
+    parser.add_argument("--fast", type=int, default=20, help="Fast DMA period")
+    parser.add_argument("--slow", type=int, default=50, help="Slow DMA period")
+    parser.add_argument("--offset", type=int, default=1, help="Higher timeframe offset in candles")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_PATH,
+        help="JSON file for the fitted parameters",
+    )
+    args = parser.parse_args(argv)
+
+    from .fetch_fno_list import fetch_fno_list
+
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    else:
+        symbols = fetch_fno_list(url=args.fno_url) if args.fno_url else fetch_fno_list()
+    fitted = calibrate(
+        symbols,
+        period=args.period,
+        offset=args.offset,
+        fast_period=args.fast,
+        slow_period=args.slow,
+    )
+    if not fitted:
+        parser.exit(1, "No history to calibrate on, or no fit converged\n")
+    save_calibration(args.output, fitted)
+    for name, cal in fitted.items():
+        print(
+            f"{name}: threshold={cal.threshold:.2f}, scale={cal.scale:.2f}, "
+            f"days={cal.samples} ({cal.start} to {cal.end}), log_loss={cal.log_loss:.4f}"
+        )
+    return fitted
+
+
+__all__ = [
+    "Calibration",
+    "calibrate",
+    "fit_logistic",
+    "get_calibration",
+    "load_calibration",
+    "save_calibration",
+    "set_calibration",
+    "shortlist_counts",
+]
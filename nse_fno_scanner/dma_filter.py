@@ -1,12 +1,14 @@
 """Utilities for filtering stocks using simple daily moving averages."""
 
-from typing import Iterable, List
+from typing import Iterable, List, Mapping
 
 import logging
 
 import pandas as pd
-import yfinance as yf
-from tqdm import tqdm
+
+from .indicators import dma_signal, price_panel
+from .ohlc import download_many
+from .session import MarketDataSession
 
 
 logger = logging.getLogger(__name__)
@@ -21,6 +23,23 @@ def compute_dmas(data: pd.DataFrame, fast: int = 20, slow: int = 50) -> pd.DataF
     return df
 
 
+def shortlist_by_dma(
+    frames: Mapping[str, pd.DataFrame],
+    offset: int = 1,
+    *,
+    fast_period: int = 20,
+    slow_period: int = 50,
+) -> List[str]:
+    """Return the symbols in ``frames`` whose fast DMA is above the slow DMA.
+
+    All symbols are evaluated together on a bar-aligned Close panel, with the
+    comparison made ``offset`` candles before each symbol's latest one.
+    """
+    close = price_panel(frames, align="bars")
+    passed = dma_signal(close, offset, fast_period=fast_period, slow_period=slow_period)
+    return [sym for sym in frames if passed.get(sym, False)]
+
+
 def filter_by_dma(
     symbols: Iterable[str],
     offset: int = 1,
@@ -28,6 +47,8 @@ def filter_by_dma(
     fast_period: int = 20,
     slow_period: int = 50,
     period_days: int = 250,
+    batch_size: int = 50,
+    session: MarketDataSession | None = None,
 ) -> List[str]:
     """Filter symbols using daily moving averages.
 
@@ -44,34 +65,32 @@ def filter_by_dma(
         Period for the slow DMA. Defaults to ``50``.
     period_days : int, optional
         Number of days of history to download. Defaults to ``250``.
+    batch_size : int, optional
+        Number of symbols requested per download. Defaults to ``50``.
+    session : MarketDataSession, optional
+        Session that serves and remembers the downloaded bars.
 
     Returns
     -------
     List[str]
         Symbols where the fast DMA is above the slow DMA.
     """
-    shortlisted = []
-    for symbol in tqdm(list(symbols), desc="DMA filter"):
-        try:
-            logger.debug("Downloading daily data for %s", symbol)
-            df = yf.download(
-                f"{symbol}.NS",
-                period=f"{period_days}d",
-                interval="1d",
-                progress=False,
-                auto_adjust=False,
-                multi_level_index=False,
-            )
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-        except Exception as exc:
-            logger.debug("Failed to download %s: %s", symbol, exc)
-            continue
-        if df.empty or len(df) < slow_period + offset:
-            continue
-        df = compute_dmas(df, fast=fast_period, slow=slow_period)
-        row = df.iloc[-(offset + 1)]
-        if row[f"DMA{fast_period}"] > row[f"DMA{slow_period}"]:
-            shortlisted.append(symbol)
-            logger.debug("%s passed DMA filter", symbol)
+    symbols = list(symbols)
+    if session is not None:
+        frames = session.get_many(
+            symbols, period=f"{period_days}d", interval="1d", desc="DMA filter"
+        )
+    else:
+        frames = download_many(
+            symbols,
+            period=f"{period_days}d",
+            interval="1d",
+            batch_size=batch_size,
+            desc="DMA filter",
+        )
+    frames = {sym: frames[sym] for sym in symbols if sym in frames}
+    shortlisted = shortlist_by_dma(
+        frames, offset, fast_period=fast_period, slow_period=slow_period
+    )
+    logger.debug("%d of %d symbols passed DMA filter", len(shortlisted), len(symbols))
     return shortlisted
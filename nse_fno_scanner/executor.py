@@ -0,0 +1,358 @@
+"""Bounded-concurrency executor for network fetches.
+
+All downloads share one :class:`FetchExecutor` so the number of parallel
+requests and the request rate stay within what Yahoo Finance tolerates,
+while transient failures are retried with exponential backoff instead of
+silently dropping symbols.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class FetchError(RuntimeError):
+    """Raised when a fetch keeps failing after all retries."""
+
+
+class EmptyResult(RuntimeError):
+    """Raised by fetch functions to request a retry of an empty response."""
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` acquisitions per second.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second. ``0`` disables limiting.
+    burst : int, optional
+        Bucket capacity, i.e. the number of requests that may start at once.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available and consume it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+@dataclass
+class FetchOutcome:
+    """Result of fetching a single key."""
+
+    key: Hashable
+    value: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class FetchReport:
+    """Per-key success and failure record of one or more fetch runs."""
+
+    outcomes: Dict[Hashable, FetchOutcome] = field(default_factory=dict)
+
+    def add(self, outcome: FetchOutcome) -> None:
+        self.outcomes[outcome.key] = outcome
+
+    @property
+    def succeeded(self) -> List[Hashable]:
+        return [k for k, o in self.outcomes.items() if o.ok]
+
+    @property
+    def failed(self) -> Dict[Hashable, BaseException]:
+        return {k: o.error for k, o in self.outcomes.items() if not o.ok}
+
+    @property
+    def values(self) -> Dict[Hashable, Any]:
+        return {k: o.value for k, o in self.outcomes.items() if o.ok}
+
+    def summary(self) -> str:
+        retried = sum(o.attempts > 1 for o in self.outcomes.values())
+        return (
+            f"{len(self.succeeded)} ok, {len(self.failed)} failed, "
+            f"{retried} retried"
+        )
+
+
+class _Attempt:
+    """One call of a fetch function, run on its own daemon thread.
+
+    The attempt holds one of the executor's worker slots until it finishes
+    or is abandoned, whichever comes first.
+    """
+
+    def __init__(self, index: int, slots: threading.Semaphore) -> None:
+        self.index = index
+        self.started: Optional[float] = None
+        self.abandoned = False
+        self._slots = slots
+        self._held = True
+        self._lock = threading.Lock()
+
+    def release(self, abandon: bool = False) -> None:
+        """Give the worker slot back; a no-op if it was already returned."""
+        with self._lock:
+            self.abandoned = self.abandoned or abandon
+            if self._held:
+                self._held = False
+                self._slots.release()
+
+
+class FetchExecutor:
+    """Run fetch functions on worker threads with rate limiting and retries.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Maximum number of concurrent fetches across all :meth:`map` calls on
+        this executor, including concurrent ones from pipeline stages.
+        Defaults to ``8``.
+    rate : float, optional
+        Maximum requests started per second. Defaults to ``4``.
+    burst : int, optional
+        Requests that may start back to back before ``rate`` applies.
+    timeout : float, optional
+        Seconds a single attempt may run before it counts as failed.
+    retries : int, optional
+        Attempts made for each key before giving up. Defaults to ``3``.
+    backoff : float, optional
+        Base delay in seconds, doubled after every failed attempt.
+    max_backoff : float, optional
+        Upper bound for the delay between attempts.
+
+    Notes
+    -----
+    Every attempt runs on a fresh daemon thread once a worker slot is free.
+    Python cannot interrupt a thread, so an attempt exceeding ``timeout`` is
+    abandoned: its slot is given back, its retry starts on a new thread and
+    the old thread keeps running until the blocked call returns, when its
+    result is discarded. Abandoned threads never delay interpreter exit.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        *,
+        rate: float = 4.0,
+        burst: int = 8,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate, burst)
+        self.timeout = timeout
+        self.retries = max(1, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    def _delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (0.5 + random.random() / 2)
+
+    def map(
+        self,
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        *,
+        key: Callable[[Any], Hashable] = lambda item: item,
+        report: Optional[FetchReport] = None,
+        callback: Optional[Callable[[FetchOutcome], None]] = None,
+    ) -> FetchReport:
+        """Call ``func`` for each of ``items`` and return a :class:`FetchReport`.
+
+        Failed attempts, including ones exceeding ``timeout``, are retried
+        after an exponentially growing delay. Exceptions never propagate;
+        they are recorded in the report instead. ``callback`` is invoked in
+        the calling thread with each final outcome as soon as it is known.
+        """
+        report = FetchReport() if report is None else report
+        metrics = get_metrics()
+        items = list(items)
+        if not items:
+            return report
+
+        first_start: Dict[Hashable, float] = {}
+        attempts: Dict[Hashable, int] = {}
+        retry_at: List[tuple] = []
+        ready = deque(range(len(items)))
+        running: set = set()
+        completed: "queue.Queue[tuple]" = queue.Queue()
+
+        def run(attempt: _Attempt, item: Any) -> None:
+            self.limiter.acquire()
+            if attempt.abandoned:
+                return
+            attempt.started = time.monotonic()
+            try:
+                value, error = func(item), None
+            except Exception as exc:
+                value, error = None, exc
+            finally:
+                attempt.release()
+            completed.put((attempt, value, error))
+
+        def start(index: int) -> None:
+            k = key(items[index])
+            attempts[k] = attempts.get(k, 0) + 1
+            first_start.setdefault(k, time.monotonic())
+            attempt = _Attempt(index, self._slots)
+            running.add(attempt)
+            threading.Thread(target=run, args=(attempt, items[index]), daemon=True).start()
+
+        def failed(index: int, exc: BaseException) -> None:
+            k = key(items[index])
+            if attempts[k] < self.retries:
+                delay = self._delay(attempts[k])
+                logger.debug("Retrying %s in %.2fs after %s", k, delay, exc)
+                heapq.heappush(retry_at, (time.monotonic() + delay, index))
+                return
+            logger.debug("Giving up on %s after %d attempts: %s", k, attempts[k], exc)
+            finish(
+                FetchOutcome(
+                    k,
+                    error=exc,
+                    attempts=attempts[k],
+                    elapsed=time.monotonic() - first_start[k],
+                )
+            )
+
+        def finish(outcome: FetchOutcome) -> None:
+            metrics.inc("fetch_attempts_total", outcome.attempts)
+            if outcome.attempts > 1:
+                metrics.inc("fetch_retries_total", outcome.attempts - 1)
+            if not outcome.ok:
+                metrics.inc("fetch_failures_total")
+            report.add(outcome)
+            if callback is not None:
+                callback(outcome)
+
+        try:
+            while ready or running or retry_at:
+                now = time.monotonic()
+                while retry_at and retry_at[0][0] <= now:
+                    ready.append(heapq.heappop(retry_at)[1])
+                while ready and self._slots.acquire(blocking=False):
+                    start(ready.popleft())
+                waits = [a.started + self.timeout - now for a in running if a.started is not None]
+                if retry_at:
+                    waits.append(retry_at[0][0] - now)
+                # Attempts waiting for a worker slot or the rate limiter have
+                # no deadline yet, so poll periodically to start their clocks.
+                budget = max(0.0, min(waits, default=self.timeout))
+                if ready or any(a.started is None for a in running):
+                    budget = min(budget, 0.05)
+                results = []
+                try:
+                    results.append(completed.get(timeout=budget))
+                    while True:
+                        results.append(completed.get_nowait())
+                except queue.Empty:
+                    pass
+                for attempt, value, error in results:
+                    if attempt not in running:
+                        continue  # abandoned after a timeout
+                    running.discard(attempt)
+                    if error is not None:
+                        failed(attempt.index, error)
+                        continue
+                    k = key(items[attempt.index])
+                    finish(
+                        FetchOutcome(
+                            k,
+                            value=value,
+                            attempts=attempts[k],
+                            elapsed=time.monotonic() - first_start[k],
+                        )
+                    )
+                now = time.monotonic()
+                for attempt in list(running):
+                    if attempt.started is not None and now - attempt.started > self.timeout:
+                        running.discard(attempt)
+                        attempt.release(abandon=True)
+                        metrics.inc("fetch_timeouts_total")
+                        failed(attempt.index, TimeoutError(f"fetch exceeded {self.timeout}s"))
+        finally:
+            for attempt in running:
+                attempt.release(abandon=True)
+        return report
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call ``func`` with retries and return its value.
+
+        Raises
+        ------
+        FetchError
+            If every attempt failed. The last error is chained.
+        """
+        report = self.map(lambda _: func(*args, **kwargs), [None])
+        outcome = report.outcomes[None]
+        if not outcome.ok:
+            raise FetchError(f"Fetch failed after {outcome.attempts} attempts") from outcome.error
+        return outcome.value
+
+
+_executor: Optional[FetchExecutor] = None
+
+
+def set_executor(executor: Optional[FetchExecutor]) -> None:
+    """Replace the shared executor. ``None`` restores the defaults."""
+    global _executor
+    _executor = executor
+
+
+def get_executor() -> FetchExecutor:
+    """Return the shared executor, creating a default one on first use."""
+    global _executor
+    if _executor is None:
+        _executor = FetchExecutor()
+    return _executor
+
+
+__all__ = [
+    "FetchExecutor",
+    "FetchReport",
+    "FetchOutcome",
+    "FetchError",
+    "EmptyResult",
+    "RateLimiter",
+    "get_executor",
+    "set_executor",
+]
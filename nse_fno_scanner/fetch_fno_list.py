@@ -9,8 +9,6 @@ import pandas as pd
 import tempfile
 import os
 
-import gdown
-
 FNO_LIST_URL = "https://archives.nseindia.com/content/fo/fo_mktlots.csv"
 FNO_LOCAL_PATH = Path(__file__).resolve().parents[1] / "fno_list.csv"
 
@@ -22,6 +20,8 @@ def _maybe_download_google_drive(url: str) -> str:
     if "drive.google.com" not in url:
         return url
 
+    import gdown
+
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
     tmp.close()
     try:
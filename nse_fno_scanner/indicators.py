@@ -0,0 +1,177 @@
+"""Cross-sectional indicators over a (time x symbol) price panel.
+
+Instead of copying one frame per symbol and reading rows with ``iloc``, the
+functions here work on a wide panel with one column per symbol so moving
+averages and conditions are evaluated for the whole universe at once.
+"""
+
+from __future__ import annotations
+
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+def price_panel(
+    frames: Mapping[str, pd.DataFrame],
+    column: str = "Close",
+    *,
+    align: str = "time",
+) -> pd.DataFrame:
+    """Combine ``column`` of each frame into a wide panel.
+
+    Parameters
+    ----------
+    frames : Mapping[str, pd.DataFrame]
+        OHLC frames keyed by symbol.
+    column : str, optional
+        Column to extract. Defaults to ``"Close"``.
+    align : {"time", "bars"}, optional
+        ``"time"`` joins the frames on their timestamps. ``"bars"`` aligns
+        every symbol on its latest bar, so row ``-1`` is each symbol's last
+        candle regardless of gaps in other symbols. Shorter histories are
+        padded with leading ``NaN``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Panel with one column per symbol.
+    """
+    frames = {sym: df for sym, df in frames.items() if df is not None and not df.empty}
+    if align == "time":
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat({sym: df[column] for sym, df in frames.items()}, axis=1).sort_index()
+    if align != "bars":
+        raise ValueError("align must be 'time' or 'bars'")
+    rows = max((len(df) for df in frames.values()), default=0)
+    values = np.full((rows, len(frames)), np.nan)
+    for j, df in enumerate(frames.values()):
+        values[rows - len(df) :, j] = df[column].to_numpy(dtype="float64")
+    return pd.DataFrame(values, columns=list(frames), index=pd.RangeIndex(-rows + 1, 1))
+
+
+def sma(panel: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Return the simple moving average of every column."""
+    return panel.rolling(period).mean()
+
+
+def ema(panel: pd.DataFrame, span: int) -> pd.DataFrame:
+    """Return the exponential moving average of every column.
+
+    Matches :func:`~nse_fno_scanner.intraday_scanner.compute_emas`; leading
+    ``NaN`` padding does not affect the result.
+    """
+    return panel.ewm(span=span, adjust=False).mean()
+
+
+def session_ema(values: np.ndarray, starts: np.ndarray, span: int) -> np.ndarray:
+    """Return an EMA of ``values`` that restarts at every session start.
+
+    Equivalent to ``ewm(span=span, adjust=False).mean()`` applied to each
+    session separately, but computed for all sessions at once. Sessions are
+    laid out as rows of a matrix and the recursion is solved in closed form
+    over blocks of bars short enough to keep the scaling factors finite.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Prices of consecutive sessions, without ``NaN``.
+    starts : np.ndarray
+        Offset of the first bar of each session, ascending and starting at 0.
+    span : int
+        EMA span.
+    """
+    values = np.asarray(values, dtype="float64")
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return values.copy()
+    lengths = np.diff(np.append(starts, n))
+    rows = np.repeat(np.arange(len(starts)), lengths)
+    cols = np.arange(n) - np.repeat(starts, lengths)
+    grid = np.zeros((len(starts), lengths.max()))
+    grid[rows, cols] = values
+
+    out = np.empty_like(grid)
+    out[:, 0] = grid[:, 0]
+    block = max(1, int(300 / -np.log(decay)))
+    for lo in range(1, grid.shape[1], block):
+        hi = min(grid.shape[1], lo + block)
+        k = np.arange(1, hi - lo + 1)
+        carried = np.cumsum(grid[:, lo:hi] * decay ** -k, axis=1) * alpha
+        out[:, lo:hi] = decay ** k * (out[:, lo - 1 : lo] + carried)
+    return out[rows, cols]
+
+
+def above(fast: pd.DataFrame, slow: pd.DataFrame, *, inclusive: bool = False) -> pd.DataFrame:
+    """Return the boolean matrix ``fast > slow`` (``>=`` when ``inclusive``)."""
+    return fast >= slow if inclusive else fast > slow
+
+
+def rising(panel: pd.DataFrame, n: int = 3) -> pd.DataFrame:
+    """Return where each of the last ``n`` closes rose over the one before."""
+    up = (panel.diff() > 0).astype("int8")
+    return up.rolling(n).sum() == n
+
+
+def bar_counts(panel: pd.DataFrame) -> pd.Series:
+    """Return the number of bars available for each symbol."""
+    return panel.notna().sum()
+
+
+def dma_signal(
+    close: pd.DataFrame,
+    offset: int = 1,
+    *,
+    fast_period: int = 20,
+    slow_period: int = 50,
+) -> pd.Series:
+    """Evaluate the daily DMA filter for every column of a bar-aligned panel.
+
+    Returns a boolean Series indexed by symbol that is ``True`` where the
+    fast DMA is above the slow DMA ``offset`` candles before the last one.
+    """
+    if close.empty:
+        return pd.Series(dtype=bool)
+    row = -(offset + 1)
+    if len(close) < -row:
+        return pd.Series(False, index=close.columns)
+    fast = sma(close, fast_period).iloc[row]
+    slow = sma(close, slow_period).iloc[row]
+    enough = bar_counts(close) >= slow_period + offset
+    return (fast > slow) & enough
+
+
+def intraday_signal(close: pd.DataFrame, *, fast: int = 20, slow: int = 50) -> pd.Series:
+    """Evaluate the intraday EMA and rising-closes check per symbol.
+
+    ``close`` must be bar aligned. The result is ``True`` where the last
+    fast EMA is at least the slow EMA and the last three closes each rose.
+    """
+    if close.empty:
+        return pd.Series(dtype=bool)
+    if len(close) < 5:
+        return pd.Series(False, index=close.columns)
+    last_fast = ema(close, fast).iloc[-1]
+    last_slow = ema(close, slow).iloc[-1]
+    pattern = rising(close, 3).iloc[-1]
+    enough = bar_counts(close) >= 5
+    return (last_fast >= last_slow) & pattern & enough
+
+
+__all__ = [
+    "price_panel",
+    "sma",
+    "ema",
+    "session_ema",
+    "above",
+    "rising",
+    "bar_counts",
+    "dma_signal",
+    "intraday_signal",
+]
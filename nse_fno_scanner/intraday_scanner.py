@@ -1,12 +1,14 @@
 """Intraday scan helpers based on EMA crossover confirmation patterns."""
 
-from typing import Iterable, List
+from typing import Iterable, List, Mapping
 
 import logging
 
 import pandas as pd
-import yfinance as yf
-from tqdm import tqdm
+
+from .indicators import intraday_signal, price_panel
+from .ohlc import download_many
+from .session import MarketDataSession
 
 logger = logging.getLogger(__name__)
 
@@ -39,29 +41,51 @@ def pattern_confirmed(df: pd.DataFrame) -> bool:
     )
 
 
-def intraday_scan(symbols: Iterable[str], interval: str = "15m") -> List[str]:
-    shortlisted = []
-    for symbol in tqdm(list(symbols), desc="Intraday scan"):
-        try:
-            logger.debug("Downloading intraday data for %s", symbol)
-            df = yf.download(
-                f"{symbol}.NS",
-                period="2d",
-                interval=interval,
-                progress=False,
-                auto_adjust=False,
-                multi_level_index=False,
-            )
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-        except Exception as exc:
-            logger.debug("Failed to download %s: %s", symbol, exc)
-            continue
-        if df.empty or len(df) < 5:
-            continue
-        df = compute_emas(df)
-        last_row = df.iloc[-1]
-        if last_row["EMA20"] >= last_row["EMA50"] and pattern_confirmed(df):
-            shortlisted.append(symbol)
-            logger.debug("%s passed intraday scan", symbol)
+def shortlist_intraday(
+    frames: Mapping[str, pd.DataFrame], *, fast: int = 20, slow: int = 50
+) -> List[str]:
+    """Return the symbols in ``frames`` that pass the intraday check.
+
+    The EMAs and the rising-closes pattern are evaluated for all symbols at
+    once on a bar-aligned Close panel.
+    """
+    close = price_panel(frames, align="bars")
+    passed = intraday_signal(close, fast=fast, slow=slow)
+    return [sym for sym in frames if passed.get(sym, False)]
+
+
+def intraday_scan(
+    symbols: Iterable[str],
+    interval: str = "15m",
+    *,
+    batch_size: int = 50,
+    session: MarketDataSession | None = None,
+) -> List[str]:
+    """Return symbols whose latest intraday candles confirm the EMA pattern.
+
+    Parameters
+    ----------
+    symbols : Iterable[str]
+        Ticker symbols to evaluate.
+    interval : str, optional
+        Candle interval. Defaults to ``"15m"``.
+    batch_size : int, optional
+        Number of symbols requested per download. Defaults to ``50``.
+    session : MarketDataSession, optional
+        Session that serves and remembers the downloaded bars.
+    """
+    symbols = list(symbols)
+    if session is not None:
+        frames = session.get_many(symbols, period="2d", interval=interval, desc="Intraday scan")
+    else:
+        frames = download_many(
+            symbols,
+            period="2d",
+            interval=interval,
+            batch_size=batch_size,
+            desc="Intraday scan",
+        )
+    frames = {sym: frames[sym] for sym in symbols if sym in frames}
+    shortlisted = shortlist_intraday(frames)
+    logger.debug("%d of %d symbols passed intraday scan", len(shortlisted), len(symbols))
     return shortlisted
@@ -1,67 +1,77 @@
-import os
 import math
 from typing import List, Dict
 
 import logging
 
 import pandas as pd
-import yfinance as yf
-from telegram import Bot
+
+from .breadth import INDICES
+from .calibration import get_calibration
+from .indicators import price_panel
+from .notifier import get_notifier
+from .session import MarketDataSession
 
 logger = logging.getLogger(__name__)
 
 
-def predict_index_movement(shortlisted_count: int, threshold: int = 10) -> float:
-    """Estimate probability of index up move using logistic function."""
-    return 1 / (1 + math.exp(-(shortlisted_count - threshold) / 5))
+def predict_index_movement(
+    shortlisted_count: int,
+    threshold: float | None = None,
+    scale: float | None = None,
+) -> float:
+    """Estimate probability of index up move using logistic function.
+
+    ``shortlisted_count`` is the number of symbols passing the daily DMA
+    filter, the quantity the calibration is fitted on.
+    ``threshold`` and ``scale`` default to the installed
+    :func:`~nse_fno_scanner.calibration.get_calibration` parameters, which
+    are ``10`` and ``5`` until a fitted calibration is loaded.
+    """
+    calibration = get_calibration()
+    threshold = calibration.threshold if threshold is None else threshold
+    scale = calibration.scale if scale is None else scale
+    z = (shortlisted_count - threshold) / scale
+    if z < 0:
+        return math.exp(z) / (1 + math.exp(z))
+    return 1 / (1 + math.exp(-z))
 
 
-def _pct_change(symbol: str) -> float:
-    logger.debug("Downloading index data for %s", symbol)
-    df = yf.download(
-        symbol,
-        period="2d",
-        interval="1d",
-        progress=False,
-        multi_level_index=False,
-    )
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    if df.empty or len(df) < 2:
-        return 0.0
-    return df["Close"].iloc[-1] / df["Close"].iloc[0] - 1
+def _last_changes(frames: Dict[str, pd.DataFrame]) -> pd.Series:
+    """Return the change between the last two closes of every frame."""
+    close = price_panel(frames, "Close", align="bars")
+    if len(close) < 2:
+        return pd.Series(dtype="float64")
+    return (close.iloc[-1] / close.iloc[-2] - 1).dropna()
 
 
-def compare_with_indices(symbols: List[str]) -> Dict[str, float]:
-    """Compare average stock change with NIFTY50 and BankNifty indices."""
-    changes = []
-    for sym in symbols:
-        logger.debug("Downloading change data for %s", sym)
-        df = yf.download(
-            f"{sym}.NS",
-            period="2d",
-            interval="1d",
-            progress=False,
-            multi_level_index=False,
-        )
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-        if df.empty or len(df) < 2:
-            continue
-        changes.append(df["Close"].iloc[-1] / df["Close"].iloc[0] - 1)
-    avg_change = sum(changes) / len(changes) if changes else 0.0
-    return {
-        "stocks": avg_change,
-        "nifty": _pct_change("^NSEI"),
-        "banknifty": _pct_change("^NSEBANK"),
-    }
+def compare_with_indices(
+    symbols: List[str], *, session: MarketDataSession | None = None
+) -> Dict[str, float]:
+    """Compare average stock change with NIFTY50 and BankNifty indices.
+
+    The stocks and indices are requested together in one batched download,
+    and with a ``session`` the daily bars already downloaded by the scan are
+    reused. Changes are taken between the last two unadjusted daily closes,
+    the price basis of every download.
+    """
+    session = MarketDataSession() if session is None else session
+    symbols = list(symbols)
+    frames = session.get_many(symbols + list(INDICES.values()), period="5d", interval="1d")
+    changes = _last_changes(frames)
+    stocks = changes.reindex(symbols).dropna()
+    avg_change = float(stocks.mean()) if len(stocks) else 0.0
+    indices = {name: float(changes.get(ticker, 0.0)) for name, ticker in INDICES.items()}
+    return {"stocks": avg_change, **indices}
 
 
 def send_telegram_message(message: str) -> None:
-    """Send a message via Telegram using token and chat id env vars."""
-    token = os.getenv("TELEGRAM_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    if not token or not chat_id:
-        return
-    bot = Bot(token=token)
-    bot.send_message(chat_id=chat_id, text=message)
+    """Queue ``message`` for the Telegram chat configured in the environment.
+
+    ``TELEGRAM_TOKEN`` and ``TELEGRAM_CHAT_ID`` select the bot and chat;
+    nothing is sent when either is unset. The call returns immediately and
+    the message is delivered by the shared
+    :class:`~nse_fno_scanner.notifier.Notifier`.
+    """
+    notifier = get_notifier()
+    if notifier is not None:
+        notifier.send(message)
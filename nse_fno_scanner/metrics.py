@@ -0,0 +1,221 @@
+"""Lightweight timing and counter instrumentation.
+
+Code reports to the object returned by :func:`get_metrics`. By default that
+is a :class:`NullMetrics` whose methods do nothing, so instrumentation costs
+a method call when profiling is off. :func:`set_metrics` installs a
+:class:`Metrics` recorder that can be exported as JSON and in the Prometheus
+text format read by node_exporter's textfile collector.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+PREFIX = "nse_fno_"
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+def _key(name: str, labels: Dict[str, object]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(text)
+        # Readable by collectors running as another user, e.g. node_exporter.
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class NullMetrics:
+    """Recorder used when profiling is off; every method is a no-op."""
+
+    enabled = False
+    _stage = contextlib.nullcontext()
+
+    def stage(self, name: str) -> contextlib.AbstractContextManager:
+        return self._stage
+
+    def inc(self, name: str, value: float = 1, **labels: object) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        pass
+
+    def record_download(self, symbol: str, interval: str, seconds: float, nbytes: int) -> None:
+        pass
+
+    def export(self) -> None:
+        pass
+
+
+class Metrics:
+    """Thread-safe recorder of counters, observations and stage timings.
+
+    Parameters
+    ----------
+    json_path : str or Path, optional
+        File written by :meth:`export` with the full snapshot, including the
+        per-symbol download statistics.
+    prom_path : str or Path, optional
+        File written by :meth:`export` in the Prometheus text format.
+
+    Notes
+    -----
+    Counters and observations accumulate over the life of the recorder, so
+    the exported Prometheus series behave as counters across scheduled runs.
+    Per-symbol statistics are only exported as JSON to keep the number of
+    Prometheus series bounded.
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        json_path: str | os.PathLike | None = None,
+        prom_path: str | os.PathLike | None = None,
+    ) -> None:
+        self.json_path = Path(json_path) if json_path else None
+        self.prom_path = Path(prom_path) if prom_path else None
+        self.started = time.time()
+        self.counters: Dict[Key, float] = {}
+        self.summaries: Dict[Key, list] = {}
+        self.symbols: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=name)
+
+    def inc(self, name: str, value: float = 1, **labels: object) -> None:
+        """Add ``value`` to the counter ``name``."""
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        """Record one observation of ``name``; count, sum and max are kept."""
+        key = _key(name, labels)
+        with self._lock:
+            summary = self.summaries.setdefault(key, [0, 0.0, float("-inf")])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def record_download(self, symbol: str, interval: str, seconds: float, nbytes: int) -> None:
+        """Record the latency and decoded frame size of one symbol's download.
+
+        Symbols fetched in one batched request all report that request's
+        latency.
+        """
+        self.observe("download_seconds", seconds, interval=interval)
+        self.observe("download_bytes", nbytes, interval=interval)
+        with self._lock:
+            stats = self.symbols.setdefault(
+                symbol, {"downloads": 0, "seconds": 0.0, "bytes": 0}
+            )
+            stats["downloads"] += 1
+            stats["seconds"] += seconds
+            stats["bytes"] += nbytes
+
+    def snapshot(self) -> dict:
+        """Return everything recorded so far as plain data."""
+        with self._lock:
+            return {
+                "started": self.started,
+                "elapsed": time.time() - self.started,
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                "summaries": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": count,
+                        "sum": total,
+                        "max": peak,
+                    }
+                    for (name, labels), (count, total, peak) in sorted(self.summaries.items())
+                ],
+                "symbols": {sym: dict(stats) for sym, stats in sorted(self.symbols.items())},
+            }
+
+    def prometheus(self) -> str:
+        """Return the counters and summaries in the Prometheus text format."""
+
+        def series(name: str, labels: Labels, value: float) -> str:
+            text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return f"{PREFIX}{name}{{{text}}} {value!r}" if text else f"{PREFIX}{name} {value!r}"
+
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            summaries = sorted(self.summaries.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                typed.add(name)
+            lines.append(series(name, labels, float(value)))
+        for (name, labels), (count, total, _) in summaries:
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} summary")
+                typed.add(name)
+            lines.append(series(f"{name}_count", labels, float(count)))
+            lines.append(series(f"{name}_sum", labels, float(total)))
+        for (name, labels), (_, _, peak) in summaries:
+            if f"{name}_max" not in typed:
+                lines.append(f"# TYPE {PREFIX}{name}_max gauge")
+                typed.add(f"{name}_max")
+            lines.append(series(f"{name}_max", labels, float(peak)))
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> None:
+        """Write the JSON and Prometheus files that were configured."""
+        if self.json_path is not None:
+            _write_atomic(self.json_path, json.dumps(self.snapshot(), indent=2))
+        if self.prom_path is not None:
+            _write_atomic(self.prom_path, self.prometheus())
+
+
+_metrics: Metrics | NullMetrics = NullMetrics()
+
+
+def set_metrics(metrics: Optional[Metrics]) -> None:
+    """Install ``metrics`` as the shared recorder. ``None`` turns profiling off."""
+    global _metrics
+    _metrics = NullMetrics() if metrics is None else metrics
+
+
+def get_metrics() -> Metrics | NullMetrics:
+    """Return the shared recorder."""
+    return _metrics
+
+
+__all__ = ["Metrics", "NullMetrics", "get_metrics", "set_metrics"]
@@ -0,0 +1,318 @@
+"""Background Telegram notifications.
+
+:class:`Notifier` queues messages and sends them from a daemon thread, so a
+slow or rate-limiting Telegram API never delays the scan that produced
+them. Messages that pile up while a send is in flight are coalesced into
+as few Telegram messages as the length limit allows. The transport is
+pluggable; :class:`HTTPTransport` talks to the Bot API over one kept-alive
+connection and can be pointed at a local stand-in server.
+"""
+
+from __future__ import annotations
+
+import atexit
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Protocol
+from urllib.parse import urlsplit
+
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.telegram.org"
+API_URL_ENV = "TELEGRAM_API_URL"
+# Telegram rejects longer messages.
+MAX_MESSAGE_LENGTH = 4096
+
+
+class TransportError(RuntimeError):
+    """Raised by transports when a message could not be delivered."""
+
+
+class RateLimited(TransportError):
+    """Raised when the API asks to wait ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limited for {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Transport(Protocol):
+    """Delivers one message to one chat, raising :class:`TransportError`."""
+
+    def send(self, chat_id: str, text: str) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class HTTPTransport:
+    """Telegram Bot API client reusing one HTTP(S) connection.
+
+    Parameters
+    ----------
+    token : str
+        Bot token.
+    base_url : str, optional
+        API root. ``http://`` URLs are accepted for local stand-ins.
+    timeout : float, optional
+        Socket timeout in seconds.
+    """
+
+    def __init__(self, token: str, base_url: str = API_URL, timeout: float = 10.0) -> None:
+        url = urlsplit(base_url)
+        self.token = token
+        self.https = url.scheme == "https"
+        self.host = url.netloc
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.host, timeout=self.timeout)
+        return self._conn
+
+    def _post(self, method: str, payload: dict) -> tuple:
+        body = json.dumps(payload).encode()
+        path = f"{self.prefix}/bot{self.token}/{method}"
+        headers = {"Content-Type": "application/json"}
+        try:
+            return self._request(path, body, headers)
+        except (http.client.HTTPException, OSError):
+            # The server may have closed the kept-alive connection.
+            self.close()
+        try:
+            return self._request(path, body, headers)
+        except (http.client.HTTPException, OSError) as exc:
+            self.close()
+            raise TransportError(f"Telegram request failed: {exc}") from exc
+
+    def _request(self, path: str, body: bytes, headers: dict) -> tuple:
+        conn = self._connection()
+        conn.request("POST", path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def send(self, chat_id: str, text: str) -> None:
+        status, raw = self._post("sendMessage", {"chat_id": chat_id, "text": text})
+        try:
+            reply = json.loads(raw or b"{}")
+        except ValueError:
+            reply = {}
+        if status == 429:
+            retry_after = reply.get("parameters", {}).get("retry_after", 1)
+            raise RateLimited(float(retry_after))
+        if status != 200 or not reply.get("ok", False):
+            raise TransportError(f"Telegram returned {status}: {reply.get('description', raw[:200])}")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _chunks(messages: List[str], limit: int) -> List[str]:
+    """Join ``messages`` with blank lines into texts of at most ``limit`` chars."""
+    out: List[str] = []
+    for message in messages:
+        while len(message) > limit:
+            out.append(message[:limit])
+            message = message[limit:]
+        if out and len(out[-1]) + 2 + len(message) <= limit:
+            out[-1] = f"{out[-1]}\n\n{message}"
+        else:
+            out.append(message)
+    return out
+
+
+class Notifier:
+    """Send messages to one chat from a background thread.
+
+    Parameters
+    ----------
+    transport : Transport
+        Delivers the messages; kept for the life of the notifier.
+    chat_id : str
+        Target chat.
+    min_interval : float, optional
+        Minimum seconds between two sends. Defaults to ``1.0``, Telegram's
+        per-chat limit.
+    retries : int, optional
+        Attempts per message before it is dropped. Rate-limit replies wait
+        for the requested time and do not count as attempts.
+    backoff : float, optional
+        Seconds before the first retry after a failure, doubled each time.
+    max_length : int, optional
+        Longest text sent at once; coalesced messages are split below it.
+
+    Notes
+    -----
+    :meth:`send` never blocks on the network. Call :meth:`flush` to wait
+    for the queue to drain; the shared notifier is flushed at interpreter
+    exit.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        chat_id: str,
+        *,
+        min_interval: float = 1.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_length: int = MAX_MESSAGE_LENGTH,
+    ) -> None:
+        self.transport = transport
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.retries = max(1, retries)
+        self.backoff = backoff
+        self.max_length = max_length
+        self.sent = 0
+        self.dropped = 0
+        self._queue: Deque[str] = deque()
+        self._busy = False
+        self._closed = False
+        self._last_sent = float("-inf")
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._thread.start()
+
+    def send(self, text: str) -> None:
+        """Queue ``text`` for delivery and return immediately."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Notifier is closed")
+            self._queue.append(text)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued message was sent or dropped.
+
+        Returns ``False`` if ``timeout`` expired first.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Flush, stop the sending thread and close the transport."""
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self.transport.close()
+        return drained
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                pending = list(self._queue)
+                self._queue.clear()
+                self._busy = True
+            metrics = get_metrics()
+            texts = _chunks(pending, self.max_length)
+            if len(texts) < len(pending):
+                metrics.inc("notifier_coalesced_total", len(pending) - len(texts))
+            try:
+                for text in texts:
+                    self._deliver(text, metrics)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _deliver(self, text: str, metrics) -> None:
+        attempt = 0
+        while True:
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self.transport.send(self.chat_id, text)
+            except RateLimited as exc:
+                logger.debug("Telegram rate limit, waiting %.1fs", exc.retry_after)
+                metrics.inc("notifier_rate_limited_total")
+                self._last_sent = time.monotonic() + exc.retry_after - self.min_interval
+                continue
+            except Exception as exc:
+                attempt += 1
+                if attempt >= self.retries:
+                    logger.warning("Dropping Telegram message after %d attempts: %s", attempt, exc)
+                    self.dropped += 1
+                    metrics.inc("notifier_dropped_total")
+                    return
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+            self._last_sent = time.monotonic()
+            self.sent += 1
+            metrics.inc("notifier_sent_total")
+            return
+
+
+_notifier: Optional[Notifier] = None
+_notifier_config: Optional[tuple] = None
+_lock = threading.Lock()
+
+
+def set_notifier(notifier: Optional[Notifier]) -> None:
+    """Install ``notifier`` as the shared notifier, closing the previous one."""
+    global _notifier, _notifier_config
+    with _lock:
+        previous, _notifier = _notifier, notifier
+        _notifier_config = None
+    if previous is not None and previous is not notifier:
+        previous.close(timeout=5)
+
+
+def get_notifier() -> Optional[Notifier]:
+    """Return the shared notifier, creating it from the environment.
+
+    ``TELEGRAM_TOKEN`` and ``TELEGRAM_CHAT_ID`` must be set; otherwise
+    ``None`` is returned. ``TELEGRAM_API_URL`` overrides the API root.
+    """
+    global _notifier, _notifier_config
+    token, chat_id = os.getenv("TELEGRAM_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")
+    config = (token, chat_id, os.getenv(API_URL_ENV, API_URL))
+    with _lock:
+        if _notifier is not None and (_notifier_config is None or _notifier_config == config):
+            return _notifier
+        previous = _notifier
+        if not token or not chat_id:
+            _notifier, _notifier_config = None, None
+        else:
+            _notifier = Notifier(HTTPTransport(token, config[2]), chat_id)
+            _notifier_config = config
+        current = _notifier
+    if previous is not None:
+        previous.close(timeout=5)
+    return current
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _notifier is not None:
+        _notifier.close(timeout=30)
+
+
+__all__ = [
+    "HTTPTransport",
+    "Notifier",
+    "RateLimited",
+    "Transport",
+    "TransportError",
+    "get_notifier",
+    "set_notifier",
+]
@@ -2,12 +2,291 @@
 
 from __future__ import annotations
 
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
 import pandas as pd
-import yfinance as yf
 
+from .cache import get_cache
+from .executor import EmptyResult, FetchError, FetchReport, FetchOutcome, get_executor
+from .metrics import get_metrics
+from .sources import get_source
+
+if TYPE_CHECKING:
+    from .session import MarketDataSession
+
+logger = logging.getLogger(__name__)
+
+
+def to_ticker(symbol: str) -> str:
+    """Return the Yahoo ticker for an NSE ``symbol``.
+
+    Index tickers such as ``"^NSEI"`` and symbols that already carry an
+    exchange suffix are returned unchanged.
+    """
+    if symbol.startswith("^") or "." in symbol:
+        return symbol
+    return f"{symbol}.NS"
+
+
+def _download(
+    symbol: str,
+    *,
+    interval: str,
+    period: str | None = None,
+    start: str | None = None,
+) -> pd.DataFrame:
+    """Download bars for ``symbol`` from Yahoo Finance."""
+    import yfinance as yf
+
+    kwargs = {"period": period} if start is None else {"start": start}
+    df = yf.download(
+        to_ticker(symbol),
+        interval=interval,
+        progress=False,
+        auto_adjust=False,
+        multi_level_index=False,
+        **kwargs,
+    )
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+def split_frame(df: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a multi-ticker download into one frame per symbol.
+
+    A single symbol keeps the historical behaviour of flattening any column
+    ``MultiIndex`` to its first level. For several symbols the level holding
+    the tickers is located and each ticker is selected from it, dropping the
+    rows that only exist because other tickers traded on those dates.
+    """
+    if len(symbols) == 1:
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df.copy()
+            df.columns = df.columns.get_level_values(0)
+        return {symbols[0]: df}
+    if not isinstance(df.columns, pd.MultiIndex):
+        if df.empty:
+            return {}
+        raise ValueError("Batched download did not return per-ticker columns")
+
+    names = {to_ticker(sym): sym for sym in symbols}
+    names.update({sym: sym for sym in symbols})
+    for level in range(df.columns.nlevels):
+        values = set(df.columns.get_level_values(level))
+        if values & names.keys():
+            break
+    else:
+        return {}
+    out: Dict[str, pd.DataFrame] = {}
+    for ticker in values & names.keys():
+        frame = df.xs(ticker, axis=1, level=level).dropna(how="all")
+        out[names[ticker]] = frame
+    return out
+
+
+def _download_batch(
+    symbols: List[str],
+    *,
+    interval: str,
+    period: str | None = None,
+    start: str | None = None,
+) -> Dict[str, pd.DataFrame]:
+    """Download ``symbols`` with a single Yahoo Finance request."""
+    if len(symbols) == 1:
+        return {symbols[0]: _download(symbols[0], interval=interval, period=period, start=start)}
+    import yfinance as yf
+
+    kwargs = {"period": period} if start is None else {"start": start}
+    df = yf.download(
+        [to_ticker(sym) for sym in symbols],
+        interval=interval,
+        progress=False,
+        auto_adjust=False,
+        group_by="column",
+        **kwargs,
+    )
+    return split_frame(df, symbols)
+
+
+def download_many(
+    symbols: Iterable[str],
+    *,
+    period: str | None = None,
+    interval: str,
+    start: str | None = None,
+    batch_size: int = 50,
+    desc: str | None = None,
+    report: FetchReport | None = None,
+) -> Dict[str, pd.DataFrame]:
+    """Load bars for many symbols from the shared data source.
+
+    With the default :class:`~nse_fno_scanner.sources.YahooSource` symbols
+    are downloaded in chunks of ``batch_size``. Chunks are fetched
+    concurrently through the shared
+    :class:`~nse_fno_scanner.executor.FetchExecutor`. Symbols missing from an
+    otherwise successful chunk are retried on their own.
+
+    Parameters
+    ----------
+    symbols : Iterable[str]
+        NSE tickers without the ``.NS`` suffix.
+    period : str, optional
+        Yahoo period string such as ``"250d"``.
+    interval : str
+        Candle interval.
+    start : str, optional
+        Download bars from this date instead of ``period``. Such requests
+        bypass the cache.
+    batch_size : int, optional
+        Number of tickers requested together. ``1`` downloads each symbol
+        separately. Defaults to ``50``.
+    desc : str, optional
+        Progress bar label.
+    report : FetchReport, optional
+        Filled with the per-symbol outcome of the download.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        Frames keyed by symbol. Symbols whose download failed are omitted.
+    """
+    return get_source().get_many(
+        symbols,
+        period=period,
+        interval=interval,
+        start=start,
+        batch_size=batch_size,
+        desc=desc,
+        report=report,
+    )
+
+
+def _yahoo_many(
+    symbols: Iterable[str],
+    *,
+    period: str | None = None,
+    interval: str,
+    start: str | None = None,
+    batch_size: int = 50,
+    desc: str | None = None,
+    report: FetchReport | None = None,
+) -> Dict[str, pd.DataFrame]:
+    """Download bars for many symbols from Yahoo Finance, see :func:`download_many`."""
+    symbols = list(dict.fromkeys(symbols))
+    batch_size = max(1, batch_size)
+    report = FetchReport() if report is None else report
+    metrics = get_metrics()
+
+    def fetch_chunk(chunk: tuple, **kwargs) -> Dict[str, pd.DataFrame]:
+        logger.debug("Downloading %s data for %s", interval, ", ".join(chunk))
+        frames = _download_batch(list(chunk), interval=interval, **kwargs)
+        frames = {sym: df for sym, df in frames.items() if not df.empty}
+        if not frames:
+            raise EmptyResult(f"No data returned for {', '.join(chunk)}")
+        return frames
+
+    def fetch_many(syms: List[str], **kwargs) -> Dict[str, pd.DataFrame]:
+        from tqdm import tqdm
+
+        chunks = [tuple(syms[i : i + batch_size]) for i in range(0, len(syms), batch_size)]
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, BaseException] = {}
+
+        def collect(outcome: FetchOutcome) -> None:
+            if outcome.ok:
+                frames.update(outcome.value)
+                if metrics.enabled:
+                    for sym, df in outcome.value.items():
+                        nbytes = int(df.memory_usage(index=True).sum())
+                        metrics.record_download(sym, interval, outcome.elapsed, nbytes)
+            else:
+                errors.update({sym: outcome.error for sym in outcome.key})
+
+        def fetch(chunk: tuple) -> Dict[str, pd.DataFrame]:
+            return fetch_chunk(chunk, **kwargs)
+
+        executor = get_executor()
+        with tqdm(total=len(chunks), desc=desc, disable=desc is None) as bar:
+            executor.map(fetch, chunks, callback=lambda o: (collect(o), bar.update()))
+        missing = [s for s in syms if s not in frames and s not in errors]
+        if missing:
+            logger.debug("Retrying %d symbols missing from batches", len(missing))
+            executor.map(fetch, [(sym,) for sym in missing], callback=collect)
+        for sym in syms:
+            if sym in frames:
+                report.add(FetchOutcome(sym, value=frames[sym]))
+            else:
+                report.add(FetchOutcome(sym, error=errors.get(sym) or EmptyResult(sym)))
+        return frames
+
+    cache = get_cache()
+    if start is not None:
+        frames = fetch_many(symbols, start=start)
+    elif cache is None:
+        frames = fetch_many(symbols, period=period)
+    else:
+        frames = cache.get_many(symbols, period=period, interval=interval, fetch_many=fetch_many)
+        for sym, df in frames.items():
+            report.outcomes.setdefault(sym, FetchOutcome(sym, value=df))
+    failed = [sym for sym in symbols if sym not in frames]
+    if failed:
+        logger.warning("No %s data for %d symbols: %s", interval, len(failed), ", ".join(failed))
+    return frames
+
+
+def _fetch_nonempty(symbol: str, **kwargs) -> pd.DataFrame:
+    df = _download(symbol, **kwargs)
+    if df.empty:
+        raise EmptyResult(f"No data returned for {symbol}")
+    return df
 
-def fetch_ohlc(symbol: str, *, days: int = 30, interval: str = "1d") -> pd.DataFrame:
-    """Fetch OHLC data from Yahoo Finance for ``symbol``.
+
+def _download_retrying(symbol: str, **kwargs) -> pd.DataFrame:
+    """Download ``symbol`` through the shared executor.
+
+    An empty frame is returned when every attempt came back empty, matching
+    what Yahoo Finance returns for unknown symbols.
+    """
+    metrics = get_metrics()
+    started = time.perf_counter()
+    try:
+        df = get_executor().call(_fetch_nonempty, symbol, **kwargs)
+        if metrics.enabled:
+            nbytes = int(df.memory_usage(index=True).sum())
+            metrics.record_download(
+                symbol, kwargs["interval"], time.perf_counter() - started, nbytes
+            )
+        return df
+    except FetchError as exc:
+        if isinstance(exc.__cause__, EmptyResult):
+            return pd.DataFrame()
+        raise
+
+
+def load_ohlc(symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+    """Return bars for ``symbol`` from the shared data source."""
+    return get_source().get(symbol, period=period, interval=interval)
+
+
+def _yahoo_one(symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+    """Download bars for ``symbol`` through the shared cache when enabled."""
+    cache = get_cache()
+    if cache is None:
+        return _download_retrying(symbol, period=period, interval=interval)
+    return cache.get(symbol, period=period, interval=interval, fetch=_download_retrying)
+
+
+def fetch_ohlc(
+    symbol: str,
+    *,
+    days: int = 30,
+    interval: str = "1d",
+    session: MarketDataSession | None = None,
+) -> pd.DataFrame:
+    """Fetch OHLC data for ``symbol`` from the shared data source.
 
     Parameters
     ----------
@@ -17,6 +296,8 @@ def fetch_ohlc(symbol: str, *, days: int = 30, interval: str = "1d") -> pd.DataF
         Number of days of history to request. Defaults to ``30``.
     interval : str, optional
         Data interval such as ``"1d"`` for daily or ``"15m"`` for intraday.
+    session : MarketDataSession, optional
+        Session that serves and remembers the downloaded bars.
 
     Returns
     -------
@@ -24,17 +305,9 @@ def fetch_ohlc(symbol: str, *, days: int = 30, interval: str = "1d") -> pd.DataF
         DataFrame indexed by datetime containing the OHLC data.
     """
 
-    df = yf.download(
-        f"{symbol}.NS",
-        period=f"{days}d",
-        interval=interval,
-        progress=False,
-        auto_adjust=False,
-        multi_level_index=False,
-    )
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    return df
+    if session is not None:
+        return session.get(symbol, period=f"{days}d", interval=interval)
+    return load_ohlc(symbol, period=f"{days}d", interval=interval)
 
 
 __all__ = ["fetch_ohlc"]
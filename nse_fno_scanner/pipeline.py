@@ -0,0 +1,240 @@
+"""Streaming scan pipeline.
+
+Each stage consumes an iterator of symbol batches and yields the symbols that
+passed it as soon as their batch has been evaluated. Stages run their
+downloads on background threads, so a symbol that passes the daily filter is
+already being checked on intraday candles while other daily downloads are
+still in flight.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from .dma_filter import shortlist_by_dma
+from .executor import get_executor
+from .intraday_scanner import shortlist_intraday
+from .ohlc import download_many
+from .session import MarketDataSession
+from .strategy_loader import VectorizedStrategy
+
+logger = logging.getLogger(__name__)
+
+Batch = List[str]
+Evaluate = Callable[[Batch], Batch]
+
+_DONE = object()
+
+
+def batched(symbols: Iterable[str], batch_size: int) -> Iterator[Batch]:
+    """Yield ``symbols`` in lists of at most ``batch_size``."""
+    batch: Batch = []
+    for symbol in symbols:
+        batch.append(symbol)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def concurrent_stage(
+    batches: Iterable[Batch],
+    evaluate: Evaluate,
+    *,
+    workers: Optional[int] = None,
+) -> Iterator[Batch]:
+    """Apply ``evaluate`` to each batch on a thread pool.
+
+    Upstream batches are pulled on a feeder thread, so this stage starts
+    working on a batch the moment the previous stage yields it. Non-empty
+    results are yielded in completion order. Exceptions raised by
+    ``evaluate`` or by the upstream iterator are re-raised in the consumer.
+    """
+    workers = workers or get_executor().workers
+    results: "queue.Queue" = queue.Queue()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    stop = threading.Event()
+
+    def run(batch: Batch) -> None:
+        try:
+            results.put(evaluate(batch))
+        except BaseException as exc:
+            results.put(exc)
+
+    def feed() -> None:
+        futures = []
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    break
+                futures.append(pool.submit(run, batch))
+        except BaseException as exc:
+            results.put(exc)
+        for future in futures:
+            # Batches still queued when the consumer stops are cancelled.
+            try:
+                future.result()
+            except CancelledError:
+                pass
+        results.put(_DONE)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            if item:
+                yield item
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch(
+    batch: Batch, session: MarketDataSession | None, *, period: str, interval: str
+) -> Dict[str, pd.DataFrame]:
+    """Return bars for ``batch`` through ``session``, or downloaded directly."""
+    if session is None:
+        return download_many(batch, period=period, interval=interval, batch_size=len(batch))
+    return session.get_many(batch, period=period, interval=interval)
+
+
+def daily_stage(
+    batches: Iterable[Batch],
+    *,
+    offset: int = 1,
+    fast_period: int = 20,
+    slow_period: int = 50,
+    period_days: int = 250,
+    session: MarketDataSession | None = None,
+) -> Iterator[Batch]:
+    """Yield the symbols of each batch that pass the DMA filter.
+
+    With a ``session`` the daily bars are fetched through it and stay held
+    for later consumers such as the backtest and the notification.
+    """
+
+    def evaluate(batch: Batch) -> Batch:
+        frames = _fetch(batch, session, period=f"{period_days}d", interval="1d")
+        passed = shortlist_by_dma(
+            frames, offset, fast_period=fast_period, slow_period=slow_period
+        )
+        logger.debug("%d of %d symbols passed DMA filter", len(passed), len(batch))
+        return passed
+
+    return concurrent_stage(batches, evaluate)
+
+
+def intraday_stage(
+    batches: Iterable[Batch],
+    *,
+    interval: str = "15m",
+    session: MarketDataSession | None = None,
+) -> Iterator[Batch]:
+    """Yield the symbols of each batch that pass the intraday scan.
+
+    With a ``session`` the candles are fetched through it, see
+    :func:`daily_stage`.
+    """
+
+    def evaluate(batch: Batch) -> Batch:
+        frames = _fetch(batch, session, period="2d", interval=interval)
+        passed = shortlist_intraday(frames)
+        logger.debug("%d of %d symbols passed intraday scan", len(passed), len(batch))
+        return passed
+
+    return concurrent_stage(batches, evaluate)
+
+
+def strategy_stage(
+    batches: Iterable[Batch],
+    strategies: Iterable[Callable],
+    *,
+    session: MarketDataSession | None = None,
+) -> Iterator[Batch]:
+    """Apply custom strategies to each batch in turn.
+
+    Strategies see one batch at a time, so ones that rank or compare symbols
+    against the whole shortlist should be run with the non-streaming scan.
+    Vectorized strategies load their bars through ``session`` (one new
+    session for the whole stream when omitted); strategies run in the
+    consuming thread.
+    """
+    strategies = list(strategies)
+    session = MarketDataSession() if session is None else session
+    for batch in batches:
+        for strat in strategies:
+            if isinstance(strat, VectorizedStrategy):
+                batch = list(strat(batch, session=session))
+            else:
+                batch = list(strat(batch))
+        if batch:
+            yield batch
+
+
+def stream_scan(
+    symbols: Iterable[str],
+    *,
+    mode: str = "both",
+    offset: int = 1,
+    fast: int = 20,
+    slow: int = 50,
+    interval: str = "15m",
+    batch_size: int = 50,
+    extra_strategies: Optional[Iterable[Callable]] = None,
+    session: MarketDataSession | None = None,
+) -> Iterator[str]:
+    """Yield shortlisted symbols as soon as they pass every stage.
+
+    Parameters
+    ----------
+    symbols : Iterable[str]
+        Ticker symbols to scan.
+    mode : {"daily", "intraday", "both"}, optional
+        Which scans to run. Defaults to ``"both"``.
+    batch_size : int, optional
+        Symbols downloaded together by each stage.
+    extra_strategies : Iterable[callable], optional
+        Custom strategies applied to every batch of survivors.
+    session : MarketDataSession, optional
+        Session every stage fetches its bars through, so they are held for
+        the backtest and the notification. A new one when omitted.
+
+    Yields
+    ------
+    str
+        Symbols in the order they complete the pipeline.
+    """
+    session = MarketDataSession(batch_size=batch_size) if session is None else session
+    batches: Iterable[Batch] = batched(symbols, max(1, batch_size))
+    if mode in {"daily", "both"}:
+        batches = daily_stage(
+            batches, offset=offset, fast_period=fast, slow_period=slow, session=session
+        )
+    if mode in {"intraday", "both"}:
+        batches = intraday_stage(batches, interval=interval, session=session)
+    if extra_strategies:
+        batches = strategy_stage(batches, extra_strategies, session=session)
+    for batch in batches:
+        yield from batch
+
+
+__all__ = [
+    "batched",
+    "concurrent_stage",
+    "daily_stage",
+    "intraday_stage",
+    "strategy_stage",
+    "stream_scan",
+]
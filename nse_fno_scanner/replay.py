@@ -0,0 +1,302 @@
+"""Replay stored intraday bars through the live scanner.
+
+:func:`replay` steps a simulated clock over recorded candles, one candle at
+a time, and runs the scan at each step as a scheduled run would at that
+moment. The bars are served by a :class:`ReplaySource`, installed as the
+shared :mod:`~nse_fno_scanner.sources` source for the duration, which only
+returns bars up to the clock; the daily bar of the simulated day is built
+from its intraday candles so far. Every tick records the shortlist and how
+long the scan took, either as fast as possible or paced at a multiple of
+real time to check that the pipeline keeps up with the candle cadence.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import sources
+from .barstore import BarStore
+from .cache import _PERIOD_RE, is_intraday, period_start, window
+from .executor import EmptyResult, FetchOutcome
+from .metrics import get_metrics
+from .resample import interval_minutes, resample_ohlcv
+from .scanner import IncrementalScanner
+
+logger = logging.getLogger(__name__)
+
+
+def _at(ts, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """Return ``ts`` in the time zone of ``index`` so the two compare."""
+    ts = pd.Timestamp(ts)
+    if index.tz is None:
+        return ts.tz_localize(None) if ts.tz is not None else ts
+    return ts.tz_localize(index.tz) if ts.tz is None else ts.tz_convert(index.tz)
+
+
+def _until(df: pd.DataFrame, ts) -> pd.DataFrame:
+    return df.iloc[: df.index.searchsorted(_at(ts, df.index), side="right")]
+
+
+def _since(df: pd.DataFrame, ts) -> pd.DataFrame:
+    return df.iloc[df.index.searchsorted(_at(ts, df.index)) :]
+
+
+class ReplaySource:
+    """Bar source that serves recorded bars up to a simulated clock.
+
+    Parameters
+    ----------
+    bars : Mapping[str, pd.DataFrame]
+        Intraday OHLCV frames keyed by symbol.
+    interval : str, optional
+        Interval of ``bars``. Multiples of it are resampled from them.
+    daily : Mapping[str, pd.DataFrame], optional
+        Daily history for the DMA filter. Bars of the simulated day are
+        replaced by one built from the intraday candles up to the clock.
+        Without it daily bars are resampled from ``bars`` alone.
+
+    Notes
+    -----
+    Set :attr:`clock` to the timestamp of the latest visible candle, which
+    requests then see as their live bar. Periods are counted back from the
+    clock.
+    """
+
+    def __init__(
+        self,
+        bars: Mapping[str, pd.DataFrame],
+        *,
+        interval: str = "15m",
+        daily: Mapping[str, pd.DataFrame] | None = None,
+    ) -> None:
+        self.bars = {sym: df.sort_index() for sym, df in bars.items() if not df.empty}
+        self.interval = interval
+        self.minutes = interval_minutes(interval)
+        if not self.minutes:
+            raise ValueError(f"Replay needs intraday bars, not {interval!r}")
+        self.daily = {sym: df.sort_index() for sym, df in (daily or {}).items() if not df.empty}
+        self.clock: Optional[pd.Timestamp] = None
+
+    def now(self) -> pd.Timestamp:
+        """Return the simulated time; used as the scanner's clock."""
+        if self.clock is None:
+            raise RuntimeError("ReplaySource clock is not set")
+        return self.clock
+
+    def _frame(self, symbol: str, interval: str, start) -> pd.DataFrame:
+        bars = self.bars.get(symbol)
+        if bars is None:
+            return pd.DataFrame()
+        bars = _until(bars, self.now())
+        if start is not None:
+            bars = _since(bars, start)
+        if interval == self.interval:
+            return bars
+        if interval == "1d":
+            today = _at(self.now(), bars.index).normalize()
+            history = self.daily.get(symbol)
+            if history is None:
+                return resample_ohlcv(bars, "1d")
+            history = history.iloc[: history.index.searchsorted(_at(today, history.index))]
+            if start is not None:
+                history = _since(history, start)
+            live = resample_ohlcv(_since(bars, today), "1d")
+            if live.empty:
+                return history
+            if history.index.tz is None and live.index.tz is not None:
+                live.index = live.index.tz_localize(None)
+            return pd.concat([history, live])
+        minutes = interval_minutes(interval)
+        if minutes and minutes % self.minutes == 0:
+            return resample_ohlcv(bars, interval)
+        logger.debug("Replay cannot serve %s bars from %s", interval, self.interval)
+        return pd.DataFrame()
+
+    def _window(self, df: pd.DataFrame, period: str | None, interval: str) -> pd.DataFrame:
+        if df.empty or period is None:
+            return df
+        match = _PERIOD_RE.match(period)
+        if is_intraday(interval) and match is not None and match.group(2) == "d":
+            return window(df, period, interval)
+        begin = period_start(period, _at(self.now(), df.index))
+        return df if begin is None else _since(df, begin)
+
+    def get_many(self, symbols, *, interval, period=None, start=None, batch_size=50, desc=None, report=None):
+        frames: Dict[str, pd.DataFrame] = {}
+        for sym in dict.fromkeys(symbols):
+            df = self._window(self._frame(sym, interval, start), None if start else period, interval)
+            if not df.empty:
+                frames[sym] = df
+            if report is not None:
+                if df.empty:
+                    report.add(FetchOutcome(sym, error=EmptyResult(sym)))
+                else:
+                    report.add(FetchOutcome(sym, value=df))
+        return frames
+
+    def get(self, symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+        return self.get_many([symbol], period=period, interval=interval).get(symbol, pd.DataFrame())
+
+
+def replay(
+    bars: Mapping[str, pd.DataFrame] | BarStore,
+    symbols: Iterable[str] | None = None,
+    *,
+    interval: str = "15m",
+    daily: Mapping[str, pd.DataFrame] | None = None,
+    start=None,
+    end=None,
+    speed: float | None = None,
+    scan: Callable[[List[str]], List[str]] | None = None,
+    on_tick: Callable[[pd.Timestamp, List[str]], None] | None = None,
+    **scanner_kwargs,
+) -> pd.DataFrame:
+    """Run the scan at every recorded candle and record what it shortlists.
+
+    Parameters
+    ----------
+    bars : Mapping[str, pd.DataFrame] or BarStore
+        Intraday bars keyed by symbol, or a store holding them (and, if
+        stored, the daily bars).
+    symbols : Iterable[str], optional
+        Universe to scan. Defaults to every symbol in ``bars``.
+    interval : str, optional
+        Candle interval of the replay. Defaults to ``"15m"``.
+    daily : Mapping[str, pd.DataFrame], optional
+        Daily history for the DMA filter, see :class:`ReplaySource`.
+    start, end : optional
+        First and last candle timestamps replayed. Earlier bars are still
+        visible to the scan as history.
+    speed : float, optional
+        Multiple of real time, e.g. ``10`` runs a 15 minute candle every 90
+        seconds. Session gaps are skipped. ``None`` replays as fast as
+        possible.
+    scan : callable, optional
+        Called with the universe at every tick; returns the shortlist, e.g.
+        ``lambda syms: intraday_scan(filter_by_dma(syms))``. Defaults to
+        the ``tick`` of an :class:`~nse_fno_scanner.scanner.IncrementalScanner`
+        driven by the simulated clock, built with ``scanner_kwargs``.
+    on_tick : callable, optional
+        Called with the candle timestamp and the shortlist after every scan.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by candle timestamp with the columns ``shortlist`` (list of
+        symbols), ``count``, ``seconds`` (scan duration) and ``late``
+        (whether the scan took longer than the paced candle interval;
+        always ``False`` without ``speed``).
+    """
+    if isinstance(bars, BarStore):
+        store = bars
+        names = list(symbols) if symbols is not None else store.symbols(interval)
+        bars = {sym: store.read(sym, interval) for sym in names}
+        if daily is None and store.symbols("1d"):
+            daily = {sym: store.read(sym, "1d") for sym in names}
+    source = ReplaySource(bars, interval=interval, daily=daily)
+    universe = list(dict.fromkeys(symbols if symbols is not None else source.bars))
+    if not source.bars:
+        return pd.DataFrame(columns=["shortlist", "count", "seconds", "late"])
+    # Every candle of any symbol is a tick, in the time zone of the bars.
+    stamps = np.unique(np.concatenate([df.index.as_unit("ns").asi8 for df in source.bars.values()]))
+    ticks = pd.DatetimeIndex(stamps)
+    tz = next(iter(source.bars.values())).index.tz
+    if tz is not None:
+        ticks = ticks.tz_localize("UTC").tz_convert(tz)
+    if start is not None:
+        ticks = ticks[ticks >= _at(start, ticks)]
+    if end is not None:
+        ticks = ticks[ticks <= _at(end, ticks)]
+
+    if scan is None:
+        scanner = IncrementalScanner(universe, interval=interval, clock=source.now, **scanner_kwargs)
+
+        def scan(symbols: List[str]) -> List[str]:
+            return scanner.tick()
+    budget = source.minutes * 60 / speed if speed else None
+    metrics = get_metrics()
+    rows = []
+    # Read without get_source(), which would configure a default source.
+    previous = sources._source
+    sources.set_source(source)
+    started = time.perf_counter()
+    try:
+        for k, tick in enumerate(ticks):
+            source.clock = tick
+            began = time.perf_counter()
+            shortlist = list(scan(universe))
+            elapsed = time.perf_counter() - began
+            metrics.observe("replay_tick_seconds", elapsed, interval=interval)
+            rows.append((tick, shortlist, len(shortlist), elapsed, budget is not None and elapsed > budget))
+            if on_tick is not None:
+                on_tick(tick, shortlist)
+            if budget is not None:
+                delay = started + (k + 1) * budget - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        sources.set_source(previous)
+    logger.debug("Replayed %d %s candles over %d symbols", len(rows), interval, len(universe))
+    out = pd.DataFrame(rows, columns=["tick", "shortlist", "count", "seconds", "late"])
+    return out.set_index("tick")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Command line interface for :func:`replay` over a :class:`BarStore`."""
+    parser = argparse.ArgumentParser(
+        prog="run_scan.py replay",
+        description="Replay stored intraday bars through the incremental scanner",
+    )
+    parser.add_argument("--store", type=Path, required=True, help="BarStore directory")
+    parser.add_argument("--symbols", help="Comma separated list of ticker symbols (default: all stored)")
+    parser.add_argument("--interval", default="15m", help="Interval of the stored bars")
+    parser.add_argument("--start", help="First candle replayed, e.g. 2024-06-03")
+    parser.add_argument("--end", help="Last candle replayed")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        help="Multiple of real time, e.g. 10 or 1000 (default: as fast as possible)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["daily", "intraday", "both"],
+        default="both",
+        help="Which checks to run",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("replay_results.csv"),
+        help="CSV file with one row per replayed candle",
+    )
+    args = parser.parse_args(argv)
+    symbols = None
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    table = replay(
+        BarStore(args.store),
+        symbols,
+        interval=args.interval,
+        start=args.start,
+        end=args.end,
+        speed=args.speed,
+        mode=args.mode,
+    )
+    table.assign(shortlist=table["shortlist"].str.join(" ")).to_csv(args.output)
+    if len(table):
+        print(
+            f"{len(table)} candles, mean shortlist {table['count'].mean():.1f}, "
+            f"scan p50 {table['seconds'].median() * 1000:.1f} ms, "
+            f"max {table['seconds'].max() * 1000:.1f} ms, late {int(table['late'].sum())}"
+        )
+    return table
+
+
+__all__ = ["ReplaySource", "replay"]
@@ -0,0 +1,115 @@
+"""Derive coarser candles from a finer base interval.
+
+Yahoo serves every interval as a separate download. When the scans, the
+backtest and :func:`~nse_fno_scanner.ohlc.fetch_ohlc` ask for different
+intervals, a :class:`~nse_fno_scanner.session.MarketDataSession` with a
+``base_interval`` downloads only the base candles (e.g. ``"5m"``) and builds
+the others here. Intraday candles are aligned on the NSE session open at
+09:15, as Yahoo aligns its own NSE candles, so derived 15 minute and hourly
+bars match the downloaded ones bar for bar.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import period_start
+
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+
+# Oldest data Yahoo serves per interval, in days. Daily bars have no limit.
+HISTORY_DAYS = {1: 7, 2: 60, 5: 60, 15: 60, 30: 60, 60: 730, 90: 60}
+
+_INTERVAL_RE = re.compile(r"^(\d+)(m|h|d)$")
+
+
+def interval_minutes(interval: str) -> Optional[int]:
+    """Return the length of ``interval`` in minutes, ``None`` if unsupported.
+
+    Daily candles count as one NSE session and are returned as ``0``.
+    """
+    match = _INTERVAL_RE.match(interval)
+    if match is None:
+        return None
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return 0 if n == 1 else None
+    return n * 60 if unit == "h" else n
+
+
+def can_resample(base: str, interval: str, period: str) -> bool:
+    """Return whether ``period`` of ``interval`` bars can be built from ``base``.
+
+    The base must be intraday, divide the target interval and reach back far
+    enough on Yahoo to cover ``period``.
+    """
+    base_minutes, minutes = interval_minutes(base), interval_minutes(interval)
+    if not base_minutes or minutes is None or base == interval:
+        return False
+    if minutes and minutes % base_minutes:
+        return False
+    limit = HISTORY_DAYS.get(base_minutes, 60)
+    now = pd.Timestamp.now()
+    start = period_start(period, now)
+    return start is not None and start >= now - pd.Timedelta(days=limit)
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Aggregate intraday bars into ``interval`` candles.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Intraday OHLC frame with a sorted ``DatetimeIndex`` in exchange time.
+    interval : str
+        Target interval such as ``"15m"``, ``"1h"`` or ``"1d"``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per candle holding the first ``Open``, highest ``High``,
+        lowest ``Low``, last ``Close`` and summed ``Volume`` of the bars it
+        covers; other columns keep their last value. Intraday candles are
+        labelled by their start, counted from 09:15 each day, and daily
+        candles by the session date. Candles without bars are omitted.
+    """
+    minutes = interval_minutes(interval)
+    if minutes is None:
+        raise ValueError(f"Cannot resample to interval {interval!r}")
+    if df.empty:
+        return df
+    if "Close" in df:
+        df = df[df["Close"].notna()]
+        if df.empty:
+            return df
+    index = df.index
+    days = index.normalize()
+    if minutes:
+        step = pd.Timedelta(minutes=minutes)
+        labels = days + SESSION_OPEN + ((index - days - SESSION_OPEN) // step) * step
+    else:
+        labels = days
+    codes = labels.asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(df)] - 1
+    out = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if column == "Open":
+            out[column] = values[starts]
+        elif column == "High":
+            out[column] = np.maximum.reduceat(values, starts)
+        elif column == "Low":
+            out[column] = np.minimum.reduceat(values, starts)
+        elif column == "Volume":
+            out[column] = np.add.reduceat(np.nan_to_num(values), starts)
+        else:
+            out[column] = values[ends]
+    return pd.DataFrame(out, index=labels[starts])
+
+
+__all__ = ["can_resample", "interval_minutes", "resample_ohlcv"]
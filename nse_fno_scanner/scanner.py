@@ -0,0 +1,259 @@
+"""Long-lived scanner for scheduled runs.
+
+:class:`IncrementalScanner` keeps per-symbol indicator state between ticks:
+:mod:`~nse_fno_scanner.streaming` ring buffers for the daily DMAs and the
+last EMA values and closes for the intraday check. After the first tick only
+the newest candles are downloaded and each indicator is updated in constant
+time per symbol.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .ohlc import download_many
+from .resample import SESSION_OPEN
+from .streaming import EMA, SMA, Rising
+
+logger = logging.getLogger(__name__)
+
+IST = "Asia/Kolkata"
+
+
+# Kept under its earlier name for existing imports.
+RollingMean = SMA
+
+
+class _DailyState:
+    """DMA state over finalized daily bars plus the latest, possibly live, bar."""
+
+    def __init__(self, fast: int, slow: int, offset: int) -> None:
+        self.fast = SMA(fast)
+        self.slow = SMA(slow)
+        self.offset = offset
+        self.history: deque = deque(maxlen=offset + 1)
+        self.last_final: Optional[pd.Timestamp] = None
+        self.live: Optional[float] = None
+        self.live_at: Optional[pd.Timestamp] = None
+
+    @property
+    def count(self) -> int:
+        """Number of finalized bars consumed."""
+        return self.slow.count
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Consume bars newer than the last finalized one.
+
+        Every bar except the newest is final; the newest may still change and
+        is only kept aside until a later bar arrives.
+        """
+        if self.last_final is not None:
+            df = df.iloc[df.index.searchsorted(self.last_final, side="right") :]
+        if df.empty:
+            return
+        closes = df["Close"].to_numpy(dtype="float64")
+        if len(closes) > 1:
+            keep = self.offset + 1
+            fast = self.fast.update(closes[:-1])[-keep:]
+            slow = self.slow.update(closes[:-1])[-keep:]
+            self.history.extend(zip(fast, slow))
+            self.last_final = df.index[-2]
+        self.live = closes[-1]
+        self.live_at = df.index[-1]
+
+    def passes(self) -> bool:
+        bars = self.count + (self.live is not None)
+        if bars < self.slow.period + self.offset:
+            return False
+        if self.live is None:
+            fast, slow = self.history[-(self.offset + 1)]
+        elif self.offset == 0:
+            fast, slow = self.fast.peek(self.live), self.slow.peek(self.live)
+        else:
+            fast, slow = self.history[-self.offset]
+        return fast > slow
+
+
+class _IntradayState:
+    """EMA and recent-close state for the intraday check."""
+
+    def __init__(self, fast: int, slow: int) -> None:
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.rising = Rising(3)
+        self.last_final: Optional[pd.Timestamp] = None
+        self.live: Optional[float] = None
+
+    @property
+    def count(self) -> int:
+        """Number of finalized bars consumed."""
+        return self.fast.count
+
+    def update(self, df: pd.DataFrame) -> None:
+        if self.last_final is not None:
+            df = df.iloc[df.index.searchsorted(self.last_final, side="right") :]
+        if df.empty:
+            return
+        closes = df["Close"].to_numpy(dtype="float64")
+        if len(closes) > 1:
+            self.fast.update(closes[:-1])
+            self.slow.update(closes[:-1])
+            self.rising.update(closes[:-1])
+            self.last_final = df.index[-2]
+        self.live = closes[-1]
+
+    def passes(self) -> bool:
+        if self.live is None or self.count + 1 < 5:
+            return False
+        crossed = self.fast.peek(self.live) >= self.slow.peek(self.live)
+        return crossed and self.rising.peek(self.live)
+
+
+class IncrementalScanner:
+    """Scanner that keeps indicator state across scheduled ticks.
+
+    Parameters
+    ----------
+    symbols : Iterable[str]
+        Universe to scan.
+    fast, slow : int, optional
+        DMA periods for the daily check. The intraday check uses EMA20 and
+        EMA50 like :func:`~nse_fno_scanner.intraday_scan`.
+    offset : int, optional
+        Number of latest daily candles ignored by the DMA check.
+    interval : str, optional
+        Candle interval for the intraday check.
+    mode : {"daily", "intraday", "both"}, optional
+        Which checks to run.
+    period_days : int, optional
+        Daily history downloaded to seed the DMAs.
+    batch_size : int, optional
+        Number of symbols requested per download.
+    clock : callable, optional
+        Returns the current time; defaults to the time in India. Naive
+        timestamps are taken as IST. Replays pass their simulated clock.
+
+    Notes
+    -----
+    EMAs are seeded from the first two sessions of intraday bars and then
+    carried forward, rather than re-seeded from a fresh two-day window on
+    every run as :func:`~nse_fno_scanner.intraday_scan` does.
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        *,
+        fast: int = 20,
+        slow: int = 50,
+        offset: int = 1,
+        interval: str = "15m",
+        mode: str = "both",
+        period_days: int = 250,
+        batch_size: int = 50,
+        clock: Callable[[], pd.Timestamp] = lambda: pd.Timestamp.now(tz=IST),
+    ) -> None:
+        self.symbols = list(dict.fromkeys(symbols))
+        self.fast = fast
+        self.slow = slow
+        self.offset = offset
+        self.interval = interval
+        self.mode = mode
+        self.period_days = period_days
+        self.batch_size = batch_size
+        self.clock = clock
+        self.daily: Dict[str, _DailyState] = {}
+        self.intraday: Dict[str, _IntradayState] = {}
+
+    def _refresh(
+        self,
+        symbols: List[str],
+        states: Dict[str, object],
+        factory: Callable[[], object],
+        *,
+        interval: str,
+        period: str,
+    ) -> None:
+        """Seed new symbols from ``period`` of history and update the rest."""
+        new = [sym for sym in symbols if sym not in states]
+        if new:
+            frames = download_many(new, period=period, interval=interval, batch_size=self.batch_size)
+            for sym, df in frames.items():
+                state = factory()
+                state.update(df)
+                states[sym] = state
+
+        by_start: Dict[str, List[str]] = {}
+        for sym in symbols:
+            state = states.get(sym)
+            if sym in new or state is None or state.last_final is None:
+                continue
+            by_start.setdefault(state.last_final.strftime("%Y-%m-%d"), []).append(sym)
+        for start, syms in by_start.items():
+            frames = download_many(syms, start=start, interval=interval, batch_size=self.batch_size)
+            for sym, df in frames.items():
+                states[sym].update(df)
+
+    def _daily_due(self) -> bool:
+        """Return whether daily bars can have changed what the DMA check sees.
+
+        With ``offset >= 1`` the check only reads finalized candles, which
+        change once a session has opened. Bars are refreshed while the newest
+        held daily bar is older than the current IST session date; before
+        09:15 today's bar does not exist yet, so nothing is fetched. On
+        holidays the refresh is retried on each tick with a small
+        ``start=`` request.
+        """
+        if self.offset == 0 or not self.daily:
+            return True
+        now = self.clock()
+        now = now.tz_localize(IST) if now.tz is None else now.tz_convert(IST)
+        if now - now.normalize() < SESSION_OPEN:
+            return False
+        newest = max((s.live_at for s in self.daily.values() if s.live_at is not None), default=None)
+        return newest is None or newest.date() < now.date()
+
+    def daily_count(self) -> Optional[int]:
+        """Return how many symbols pass the daily DMA check.
+
+        ``None`` until daily bars were loaded, e.g. in ``"intraday"`` mode.
+        """
+        if not self.daily:
+            return None
+        return sum(self.daily[sym].passes() for sym in self.symbols if sym in self.daily)
+
+    def tick(self) -> List[str]:
+        """Fetch the newest candles, update indicators and return the shortlist."""
+        results = self.symbols
+        if self.mode in {"daily", "both"}:
+            if self._daily_due():
+                self._refresh(
+                    self.symbols,
+                    self.daily,
+                    lambda: _DailyState(self.fast, self.slow, self.offset),
+                    interval="1d",
+                    period=f"{self.period_days}d",
+                )
+            results = [sym for sym in results if sym in self.daily and self.daily[sym].passes()]
+            logger.debug("%d symbols passed DMA filter", len(results))
+        if self.mode in {"intraday", "both"}:
+            # Symbols that left the daily shortlist are re-seeded when they return.
+            for sym in set(self.intraday) - set(results):
+                del self.intraday[sym]
+            self._refresh(
+                results,
+                self.intraday,
+                lambda: _IntradayState(20, 50),
+                interval=self.interval,
+                period="2d",
+            )
+            results = [sym for sym in results if sym in self.intraday and self.intraday[sym].passes()]
+            logger.debug("%d symbols passed intraday scan", len(results))
+        return results
+
+
+__all__ = ["IncrementalScanner", "RollingMean", "EMA"]
@@ -0,0 +1,397 @@
+"""Screening expressions compiled to vectorized evaluation.
+
+A screen is a boolean expression over the OHLCV columns of each symbol,
+for example::
+
+    sma(close, 20) > sma(close, 50) and rising(close, 3) and volume > 1.5 * sma(volume, 20)
+
+The text is parsed once with :mod:`ast` into a graph of operations in which
+identical subexpressions are shared, so ``sma(volume, 20)`` used twice is
+computed once. The graph is evaluated on (bar x symbol) arrays, deciding
+the latest bar of every symbol at once. Operations whose full history is
+not needed by a moving-window function only compute their last row.
+
+Names are ``open``, ``high``, ``low``, ``close`` and ``volume`` (in any
+case). Supported functions:
+
+``sma(x, n)``, ``ema(x, n)``
+    Simple and exponential moving averages.
+``highest(x, n)``, ``lowest(x, n)``
+    Rolling maximum and minimum over ``n`` bars.
+``rising(x, n)``, ``falling(x, n)``
+    Whether each of the last ``n`` values rose (fell) from the one before.
+``ref(x, n)``
+    The value ``n`` bars ago.
+``abs(x)``
+
+Arithmetic (``+ - * /``), comparisons (chains included), ``and``, ``or``
+and ``not`` work as in Python, except for undefined values: an indicator
+without enough history is ``NaN``, comparing it is undefined rather than
+``False``, and ``not`` keeps it undefined. ``and`` and ``or`` are undefined
+unless the defined side decides them (``False and x``, ``True or x``).
+Symbols whose screen is undefined do not pass.
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import ema, rising, sma
+from .strategy_loader import Panel, VectorizedStrategy, vectorized
+
+COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+# Functions taking a series and a window length, which need the series'
+# history rather than only its last value.
+_WINDOW = {"sma", "ema", "highest", "lowest", "rising", "falling", "ref"}
+_BINARY = {
+    ast.Add: "add",
+    ast.Sub: "sub",
+    ast.Mult: "mul",
+    ast.Div: "div",
+}
+_COMPARE = {
+    ast.Gt: "gt",
+    ast.GtE: "ge",
+    ast.Lt: "lt",
+    ast.LtE: "le",
+    ast.Eq: "eq",
+    ast.NotEq: "ne",
+}
+_COMMUTATIVE = {"add", "mul", "eq", "ne", "and", "or"}
+_UFUNCS = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "lt": np.less,
+    "le": np.less_equal,
+    "eq": np.equal,
+    "ne": np.not_equal,
+}
+
+
+def _truth(value) -> Tuple[np.ndarray, np.ndarray]:
+    """Return where ``value`` is true and where it is undefined."""
+    value = np.asarray(value, dtype="float64")
+    undefined = np.isnan(value)
+    return (value != 0) & ~undefined, undefined
+
+
+def _logic(op: str, *args) -> np.ndarray:
+    """Apply ``op`` in three-valued logic; undefined results are ``NaN``."""
+    if op in _COMPARE.values():
+        with np.errstate(invalid="ignore"):
+            result = _UFUNCS[op](*args).astype("float64")
+        undefined = np.isnan(np.asarray(args[0], dtype="float64"))
+        undefined = undefined | np.isnan(np.asarray(args[1], dtype="float64"))
+        return np.where(undefined, np.nan, result)
+    if op == "not":
+        true, undefined = _truth(args[0])
+        return np.where(undefined, np.nan, (~true).astype("float64"))
+    (a, a_nan), (b, b_nan) = _truth(args[0]), _truth(args[1])
+    if op == "and":
+        decided = (~a & ~a_nan) | (~b & ~b_nan)  # a defined False
+        return np.where(decided, 0.0, np.where(a_nan | b_nan, np.nan, 1.0))
+    decided = a | b
+    return np.where(decided, 1.0, np.where(a_nan | b_nan, np.nan, 0.0))
+
+
+class ScreenError(ValueError):
+    """Raised for screen expressions that cannot be compiled."""
+
+
+@dataclass(frozen=True)
+class Node:
+    """One operation of a compiled screen.
+
+    ``args`` holds the indices of the operand nodes, except for ``col``
+    (column name) and ``const`` (value) nodes. Window functions carry their
+    length in ``window``.
+    """
+
+    op: str
+    args: Tuple = ()
+    window: int = 0
+
+
+class _Compiler:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.nodes: List[Node] = []
+        self._ids: Dict[Node, int] = {}
+
+    def add(self, node: Node) -> int:
+        if node.op in _COMMUTATIVE:
+            node = Node(node.op, tuple(sorted(node.args)), node.window)
+        if node not in self._ids:
+            self._ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return self._ids[node]
+
+    def error(self, node: ast.AST, message: str) -> ScreenError:
+        col = getattr(node, "col_offset", None)
+        where = f" at column {col + 1}" if col is not None else ""
+        return ScreenError(f"{message}{where} in screen {self.text!r}")
+
+    def visit(self, node: ast.AST) -> int:
+        if isinstance(node, ast.Name):
+            column = COLUMNS.get(node.id.lower())
+            if column is None:
+                raise self.error(node, f"Unknown name {node.id!r}")
+            return self.add(Node("col", (column,)))
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise self.error(node, f"Unsupported constant {node.value!r}")
+            return self.add(Node("const", (float(node.value),)))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            return self.add(
+                Node(_BINARY[type(node.op)], (self.visit(node.left), self.visit(node.right)))
+            )
+        if isinstance(node, ast.UnaryOp):
+            if isinstance(node.op, ast.USub):
+                return self.add(Node("neg", (self.visit(node.operand),)))
+            if isinstance(node.op, ast.UAdd):
+                return self.visit(node.operand)
+            if isinstance(node.op, ast.Not):
+                return self.add(Node("not", (self.visit(node.operand),)))
+        if isinstance(node, ast.BoolOp):
+            op = "and" if isinstance(node.op, ast.And) else "or"
+            ids = [self.visit(v) for v in node.values]
+            result = ids[0]
+            for other in ids[1:]:
+                result = self.add(Node(op, (result, other)))
+            return result
+        if isinstance(node, ast.Compare):
+            if not all(type(op) in _COMPARE for op in node.ops):
+                raise self.error(node, "Unsupported comparison")
+            left = self.visit(node.left)
+            result = None
+            for op, right_node in zip(node.ops, node.comparators):
+                right = self.visit(right_node)
+                cmp = self.add(Node(_COMPARE[type(op)], (left, right)))
+                result = cmp if result is None else self.add(Node("and", (result, cmp)))
+                left = right
+            return result
+        if isinstance(node, ast.Call):
+            return self.call(node)
+        raise self.error(node, f"Unsupported syntax {type(node).__name__}")
+
+    def call(self, node: ast.Call) -> int:
+        name = node.func.id.lower() if isinstance(node.func, ast.Name) else None
+        if node.keywords:
+            raise self.error(node, "Keyword arguments are not supported")
+        if name == "abs":
+            if len(node.args) != 1:
+                raise self.error(node, "abs() takes one argument")
+            return self.add(Node("abs", (self.visit(node.args[0]),)))
+        if name not in _WINDOW:
+            raise self.error(node, f"Unknown function {name or ast.unparse(node.func)!r}")
+        if len(node.args) != 2:
+            raise self.error(node, f"{name}() takes a series and a length")
+        length = node.args[1]
+        if (
+            not isinstance(length, ast.Constant)
+            or isinstance(length.value, bool)
+            or not isinstance(length.value, int)
+            or length.value < 1
+        ):
+            raise self.error(length, f"{name}() length must be a positive integer")
+        return self.add(Node(name, (self.visit(node.args[0]),), length.value))
+
+
+class Screen:
+    """A compiled screening expression.
+
+    Parameters
+    ----------
+    text : str
+        The expression, see the module documentation.
+
+    Attributes
+    ----------
+    nodes : List[Node]
+        Operations in evaluation order; the last one is the result.
+    columns : Tuple[str, ...]
+        OHLCV columns the expression reads.
+    bars : int
+        Bars of history needed for the result to be defined. EMAs count
+        three spans.
+    """
+
+    __name__ = "screen"
+
+    def __init__(self, text: str) -> None:
+        self.text = text.strip()
+        try:
+            tree = ast.parse(self.text, mode="eval")
+        except SyntaxError as exc:
+            raise ScreenError(f"Invalid screen {self.text!r}: {exc.msg}") from None
+        compiler = _Compiler(self.text)
+        compiler.visit(tree.body)
+        self.nodes = compiler.nodes
+        self.columns = tuple(
+            dict.fromkeys(n.args[0] for n in self.nodes if n.op == "col")
+        )
+        if not self.columns:
+            raise ScreenError(f"Screen {self.text!r} reads no price or volume column")
+        self._full = self._full_history()
+        self.bars = self._bars()
+
+    def _full_history(self) -> List[bool]:
+        """Mark the nodes whose whole history is needed, not only the last row."""
+        full = [False] * len(self.nodes)
+        for i in range(len(self.nodes) - 1, -1, -1):
+            node = self.nodes[i]
+            if node.op in {"col", "const"}:
+                continue
+            if node.op in _WINDOW or full[i]:
+                for arg in node.args:
+                    full[arg] = True
+        return full
+
+    def _bars(self) -> int:
+        bars: List[int] = []
+        for node in self.nodes:
+            if node.op in {"col", "const"}:
+                bars.append(1)
+            elif node.op == "ema":
+                bars.append(bars[node.args[0]] + 3 * node.window)
+            elif node.op in {"rising", "falling", "ref"}:
+                bars.append(bars[node.args[0]] + node.window)
+            elif node.op in _WINDOW:
+                bars.append(bars[node.args[0]] + node.window - 1)
+            else:
+                bars.append(max(bars[a] for a in node.args))
+        return bars[-1]
+
+    def evaluate(self, columns: Mapping[str, object]) -> np.ndarray:
+        """Evaluate the screen on the latest bar of every symbol.
+
+        Parameters
+        ----------
+        columns : Mapping[str, array-like]
+            Bar-aligned (bar x symbol) panels keyed by column name, as built
+            by :func:`~nse_fno_scanner.indicators.price_panel` with
+            ``align="bars"``.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array with one entry per symbol.
+        """
+        values: List[object] = []
+        for i, node in enumerate(self.nodes):
+            values.append(self._evaluate(node, values, columns, self._full[i]))
+        result = values[-1]
+        if np.ndim(result) == 0:
+            width = np.shape(np.asarray(columns[self.columns[0]]))[1]
+            result = np.full(width, result)
+        return np.asarray(result, dtype=bool) & ~np.isnan(np.asarray(result, dtype="float64"))
+
+    def _evaluate(self, node: Node, values: list, columns: Mapping, full: bool):
+        op = node.op
+        if op == "const":
+            return node.args[0]
+        if op == "col":
+            panel = np.asarray(columns[node.args[0]], dtype="float64")
+            return panel if full else panel[-1]
+        args = [values[a] for a in node.args]
+        if op in _WINDOW:
+            return self._window(op, args[0], node.window, full)
+        if not full:
+            # Operands shared with a window function hold their full history.
+            args = [a[-1] if np.ndim(a) == 2 else a for a in args]
+        if op in _BINARY.values():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return _UFUNCS[op](*args)
+        if op == "neg":
+            return np.negative(args[0])
+        if op == "abs":
+            return np.abs(args[0])
+        return _logic(op, *args)
+
+    @staticmethod
+    def _window(op: str, series: np.ndarray, n: int, full: bool):
+        rows = series.shape[0]
+        if op == "ref":
+            if full:
+                return pd.DataFrame(series).shift(n).to_numpy()
+            return series[-1 - n] if rows > n else np.full(series.shape[1], np.nan)
+        if op in {"rising", "falling"}:
+            # Undefined until n + 1 values are present, like the other windows.
+            if full:
+                frame = pd.DataFrame(series if op == "rising" else -series)
+                valid = frame.notna().rolling(n + 1).sum().to_numpy() == n + 1
+                return np.where(valid, rising(frame, n).to_numpy(), np.nan)
+            if rows <= n:
+                return np.full(series.shape[1], np.nan)
+            window = series[-n - 1 :]
+            steps = np.diff(window, axis=0)
+            passed = (steps > 0 if op == "rising" else steps < 0).all(axis=0)
+            return np.where(np.isnan(window).any(axis=0), np.nan, passed)
+        if op == "ema":
+            out = ema(pd.DataFrame(series), n).to_numpy()
+            return out if full else out[-1]
+        if not full:
+            if rows < n:
+                return np.full(series.shape[1], np.nan)
+            window = series[-n:]
+            # A NaN in the window leaves the value undefined, as rolling() does.
+            if op == "sma":
+                return window.mean(axis=0)
+            return window.max(axis=0) if op == "highest" else window.min(axis=0)
+        frame = pd.DataFrame(series)
+        if op == "sma":
+            return sma(frame, n).to_numpy()
+        rolled = frame.rolling(n)
+        return (rolled.max() if op == "highest" else rolled.min()).to_numpy()
+
+    def __call__(self, panel: Panel) -> pd.Series:
+        """Evaluate on a :class:`~nse_fno_scanner.strategy_loader.Panel`."""
+        return pd.Series(self.evaluate(panel.columns), index=panel.symbols)
+
+    def __repr__(self) -> str:
+        return f"Screen({self.text!r})"
+
+
+def compile_screen(
+    text: str, *, lookback: str | None = None, interval: str = "1d"
+) -> VectorizedStrategy:
+    """Compile ``text`` into a strategy usable wherever strategies are.
+
+    Parameters
+    ----------
+    text : str
+        Screen expression.
+    lookback : str, optional
+        Period of bars to load. Defaults to ``"250d"``, the range the daily
+        DMA filter downloads, or a longer one when the expression needs more
+        than 150 bars.
+    interval : str, optional
+        Candle interval of the bars. Defaults to ``"1d"``.
+    """
+    screen = Screen(text)
+    if lookback is None:
+        lookback = "250d" if screen.bars <= 150 else f"{math.ceil(screen.bars * 1.6)}d"
+    return vectorized(columns=screen.columns, lookback=lookback, interval=interval)(screen)
+
+
+def load_screens(path: str | Path) -> List[str]:
+    """Read screen expressions from ``path``, one per line.
+
+    Blank lines and lines starting with ``#`` are ignored.
+    """
+    lines = Path(path).read_text().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+__all__ = ["Screen", "ScreenError", "compile_screen", "load_screens"]
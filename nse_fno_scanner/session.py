@@ -0,0 +1,172 @@
+"""In-process memo of the bars downloaded during one run.
+
+A :class:`MarketDataSession` is created once per scan and handed to the
+filters, the backtester and the notifier. Each ``(symbol, interval)`` pair is
+downloaded at most once for the widest range requested so far; narrower
+ranges are served by slicing the frame already held. With a
+``base_interval`` the coarser intervals are built from the base candles by
+:mod:`~nse_fno_scanner.resample` instead of being downloaded separately.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .cache import _PERIOD_RE, is_intraday, period_start, window
+from .metrics import get_metrics
+from .ohlc import download_many
+from .resample import can_resample, resample_ohlcv
+
+logger = logging.getLogger(__name__)
+
+
+def covers(held: str, wanted: str, interval: str) -> bool:
+    """Return whether bars downloaded for ``held`` include all of ``wanted``."""
+    if held == wanted or held == "max":
+        return True
+    if wanted == "max":
+        return False
+    held_match, wanted_match = _PERIOD_RE.match(held), _PERIOD_RE.match(wanted)
+    if (
+        is_intraday(interval)
+        and held_match is not None
+        and wanted_match is not None
+        and held_match.group(2) == wanted_match.group(2) == "d"
+    ):
+        return int(held_match.group(1)) >= int(wanted_match.group(1))
+    now = pd.Timestamp.now()
+    held_start, wanted_start = period_start(held, now), period_start(wanted, now)
+    if held_start is None or wanted_start is None:
+        return False
+    return held_start <= wanted_start
+
+
+class MarketDataSession:
+    """Memoize OHLC frames by symbol, interval and range for one run.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        Number of symbols requested per download. Defaults to ``50``.
+    base_interval : str, optional
+        Finest intraday interval downloaded, e.g. ``"5m"``. Requests for
+        multiples of it, including daily bars, are resampled from the base
+        candles while the base interval's history covers the period, so
+        adding timeframes does not add downloads. Other requests are
+        downloaded as usual.
+
+    Notes
+    -----
+    The memo is guarded by a lock, so pipeline stages may fetch through one
+    session from several threads; downloads run outside the lock. Symbols
+    whose download
+    failed are remembered as empty, so they are not requested again for the
+    same or a narrower range.
+    """
+
+    def __init__(self, batch_size: int = 50, base_interval: str | None = None) -> None:
+        self.batch_size = batch_size
+        self.base_interval = base_interval
+        self._frames: Dict[Tuple[str, str], Tuple[str, pd.DataFrame]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _lookup(self, symbol: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+        held = self._frames.get((symbol, interval))
+        if held is None or not covers(held[0], period, interval):
+            return None
+        held_period, df = held
+        if held_period == period or df.empty:
+            return df
+        if not isinstance(df.index, pd.DatetimeIndex):
+            return None
+        return window(df, period, interval)
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        *,
+        period: str,
+        interval: str,
+        desc: str | None = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Return bars for ``symbols``, downloading only what is not held.
+
+        Parameters
+        ----------
+        symbols : Iterable[str]
+            NSE tickers without the ``.NS`` suffix.
+        period : str
+            Yahoo period string such as ``"250d"``.
+        interval : str
+            Candle interval.
+        desc : str, optional
+            Progress bar label for the download of missing symbols.
+
+        Returns
+        -------
+        Dict[str, pd.DataFrame]
+            Non-empty frames keyed by symbol, in the order of ``symbols``.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        found: Dict[str, pd.DataFrame] = {}
+        missing: List[str] = []
+        with self._lock:
+            for sym in symbols:
+                df = self._lookup(sym, period, interval)
+                if df is None:
+                    missing.append(sym)
+                else:
+                    found[sym] = df
+            self.hits += len(found)
+            self.misses += len(missing)
+        metrics = get_metrics()
+        metrics.inc("session_hits_total", len(found), interval=interval)
+        metrics.inc("session_misses_total", len(missing), interval=interval)
+        if missing and self.base_interval and can_resample(self.base_interval, interval, period):
+            logger.debug(
+                "Session resampling %s %s bars for %d symbols from %s",
+                period,
+                interval,
+                len(missing),
+                self.base_interval,
+            )
+            base = self.get_many(missing, period=period, interval=self.base_interval, desc=desc)
+            metrics.inc("session_resampled_total", len(missing), interval=interval)
+            resampled = {sym: resample_ohlcv(base.get(sym, pd.DataFrame()), interval) for sym in missing}
+            self._hold(resampled, period, interval)
+            found.update(resampled)
+        elif missing:
+            logger.debug("Session fetching %s %s bars for %d symbols", period, interval, len(missing))
+            fetched = download_many(
+                missing, period=period, interval=interval, batch_size=self.batch_size, desc=desc
+            )
+            fetched = {sym: fetched.get(sym, pd.DataFrame()) for sym in missing}
+            self._hold(fetched, period, interval)
+            found.update(fetched)
+        return {sym: found[sym] for sym in symbols if not found[sym].empty}
+
+    def _hold(self, frames: Dict[str, pd.DataFrame], period: str, interval: str) -> None:
+        """Remember ``frames`` unless a wider range arrived meanwhile."""
+        with self._lock:
+            for sym, df in frames.items():
+                held = self._frames.get((sym, interval))
+                if held is None or not covers(held[0], period, interval):
+                    self._frames[(sym, interval)] = (period, df)
+
+    def get(self, symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+        """Return bars for a single ``symbol``; empty when none are available."""
+        return self.get_many([symbol], period=period, interval=interval).get(symbol, pd.DataFrame())
+
+    def clear(self) -> None:
+        """Forget every frame held by the session."""
+        with self._lock:
+            self._frames.clear()
+
+
+__all__ = ["MarketDataSession", "covers"]
@@ -2,13 +2,64 @@ from __future__ import annotations
 
 """Market simulation utilities."""
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, Tuple, List
+from typing import Iterable, Tuple, List, Optional
 
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from .backtester import backtest_strategy, Trade
+from .backtester import _intraday_signals
+from .barstore import BarStore
+from .cache import OHLCCache, get_cache, set_cache
+from .executor import FetchExecutor, get_executor, set_executor
+from .ohlc import load_ohlc
+from .sources import DataSource, get_source, set_source
+from .tradelog import TradeLog
+
+
+def _simulate_symbol(
+    symbol: str,
+    period: str,
+    interval: str,
+    fast: int,
+    slow: int,
+    store: Optional[BarStore] = None,
+) -> TradeLog:
+    """Backtest ``symbol`` and return its trades.
+
+    The log holds plain NumPy columns, so results cross process boundaries
+    without pickling Timestamp objects.
+    """
+    df = store.read(symbol, interval, period=period) if store is not None else None
+    if df is None or df.empty:
+        df = load_ohlc(symbol, period=period, interval=interval)
+    if df.empty:
+        return TradeLog([symbol])
+    dates, entry, exit_price, ret = _intraday_signals(df, start_hour=None, fast=fast, slow=slow)
+    return TradeLog.from_arrays(symbol, dates, entry, exit_price, ret)
+
+
+def _init_worker(
+    executor_kwargs: dict, cache: Optional[OHLCCache], source: DataSource
+) -> None:
+    set_executor(FetchExecutor(**executor_kwargs))
+    set_cache(cache)
+    set_source(source)
+
+
+def _worker_executor_kwargs(workers: int) -> dict:
+    """Split the shared download rate limit evenly between ``workers``."""
+    executor = get_executor()
+    return {
+        "workers": executor.workers,
+        "rate": executor.limiter.rate / workers,
+        "burst": max(1, executor.limiter.burst // workers),
+        "timeout": executor.timeout,
+        "retries": executor.retries,
+        "backoff": executor.backoff,
+        "max_backoff": executor.max_backoff,
+    }
 
 
 def simulate_market(
@@ -19,7 +70,10 @@ def simulate_market(
     fast: int = 20,
     slow: int = 50,
     save_path: str | None = None,
-) -> Tuple[List[str], pd.DataFrame]:
+    workers: int | None = 1,
+    store: BarStore | None = None,
+    as_log: bool = False,
+) -> Tuple[List[str], pd.DataFrame | TradeLog]:
     """Simulate trading on ``symbols`` using the intraday strategy.
 
     Parameters
@@ -28,45 +82,51 @@ def simulate_market(
         Symbols to backtest.
     save_path : str, optional
         If given, shortlisted symbols are written to this path one per line.
+    workers : int, optional
+        Number of processes backtesting symbols in parallel. ``1`` (the
+        default) runs in the current process and ``None`` uses one process
+        per CPU.
+    store : BarStore, optional
+        Bar store read before downloading. Worker processes map the same
+        files, so they share the stored pages instead of each holding a copy.
+    as_log : bool, optional
+        Return the trades as a :class:`TradeLog` instead of a DataFrame.
 
     Returns
     -------
-    Tuple[List[str], pd.DataFrame]
+    Tuple[List[str], pd.DataFrame | TradeLog]
         List of shortlisted symbols and DataFrame with trade logs and PnL.
+        Trades are ordered by date, then by symbol order, before the
+        cumulative PnL is computed. With ``as_log`` the ordered trades are
+        returned as a :class:`TradeLog` without the PnL columns.
     """
 
-    shortlisted: List[str] = []
-    logs: List[dict] = []
-    for sym in symbols:
-        trades, win_rate, avg_ret, trade_log = backtest_strategy(
-            sym,
-            period=period,
-            interval=interval,
-            mode="intraday",
-            fast=fast,
-            slow=slow,
-            return_trades=True,
-        )
-        if trades > 0:
-            shortlisted.append(sym)
-            for t in trade_log:
-                logs.append(
-                    {
-                        "symbol": sym,
-                        "date": t.date,
-                        "entry": t.entry,
-                        "exit": t.exit,
-                        "pct_return": t.pct_return,
-                    }
-                )
+    symbols = list(symbols)
+    workers = workers or os.cpu_count() or 1
+    args = [(sym, period, interval, fast, slow, store) for sym in symbols]
+    if workers == 1 or len(symbols) <= 1:
+        results = [_simulate_symbol(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(_worker_executor_kwargs(workers), get_cache(), get_source()),
+        ) as pool:
+            results = list(pool.map(_simulate_symbol, *zip(*args)))
+
+    trades = TradeLog.concat(results).sorted()
+    shortlisted = trades.symbols_with_trades()
 
     if save_path is not None:
         Path(save_path).write_text("\n".join(shortlisted))
 
-    df = pd.DataFrame(logs)
-    if not df.empty:
-        df["pnl"] = df["pct_return"]
-        df["cum_pnl"] = df["pnl"].cumsum()
+    if as_log:
+        return shortlisted, trades
+    if not shortlisted:
+        return shortlisted, pd.DataFrame()
+    df = trades.to_frame()
+    df["pnl"] = df["pct_return"]
+    df["cum_pnl"] = df["pnl"].cumsum()
     return shortlisted, df
 
 
@@ -74,6 +134,8 @@ def plot_pnl(df: pd.DataFrame, ax=None):
     """Plot cumulative PnL from a DataFrame returned by :func:`simulate_market`."""
     if df.empty:
         return None
+    import matplotlib.pyplot as plt
+
     if ax is None:
         fig, ax = plt.subplots()
     ax.plot(df["date"], df["cum_pnl"], marker="o")
@@ -0,0 +1,344 @@
+"""Pluggable sources of OHLC bars.
+
+:func:`~nse_fno_scanner.ohlc.download_many` and
+:func:`~nse_fno_scanner.ohlc.load_ohlc` (and so the scans, the backtester
+and :func:`~nse_fno_scanner.ohlc.fetch_ohlc`) read bars from the source
+returned by :func:`get_source`. The default :class:`YahooSource` downloads
+from Yahoo Finance. :class:`BhavcopySource` serves daily bars from a
+directory of end-of-day bulk files, one CSV per date holding every symbol,
+so daily scans run from local disk and work offline.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Protocol
+
+import pandas as pd
+
+from .barstore import COLUMNS, BarStore
+from .executor import EmptyResult, FetchOutcome, FetchReport
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR_ENV = "NSE_FNO_BHAVCOPY_DIR"
+
+# Accepted header names, upper-cased, for each field. They cover the NSE
+# equity bhavcopy, the newer UDiFF bhavcopy and plain OHLCV exports.
+ALIASES = {
+    "Symbol": ("SYMBOL", "TCKRSYMB", "TICKER"),
+    "Series": ("SERIES", "SCTYSRS"),
+    "Date": ("TIMESTAMP", "TRADDT", "DATE", "DATE1"),
+    "Open": ("OPEN", "OPNPRIC", "OPEN_PRICE"),
+    "High": ("HIGH", "HGHPRIC", "HIGH_PRICE"),
+    "Low": ("LOW", "LWPRIC", "LOW_PRICE"),
+    "Close": ("CLOSE", "CLSPRIC", "CLOSE_PRICE"),
+    "Volume": ("TOTTRDQTY", "TTLTRADGVOL", "TTL_TRD_QNTY", "VOLUME"),
+}
+_FILE_DATE = re.compile(r"(\d{4}-?\d{2}-?\d{2}|\d{2}[A-Za-z]{3}\d{4})")
+
+
+class DataSource(Protocol):
+    """Interface of a bar source.
+
+    ``get_many`` returns non-empty frames keyed by symbol and omits symbols
+    it has no bars for; ``get`` returns an empty frame instead.
+    """
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        *,
+        interval: str,
+        period: str | None = None,
+        start: str | None = None,
+        batch_size: int = 50,
+        desc: str | None = None,
+        report: FetchReport | None = None,
+    ) -> Dict[str, pd.DataFrame]:
+        ...
+
+    def get(self, symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+        ...
+
+
+class YahooSource:
+    """Download bars from Yahoo Finance through the shared executor and cache."""
+
+    def get_many(self, symbols, *, interval, period=None, start=None, batch_size=50, desc=None, report=None):
+        from .ohlc import _yahoo_many
+
+        return _yahoo_many(
+            symbols,
+            period=period,
+            interval=interval,
+            start=start,
+            batch_size=batch_size,
+            desc=desc,
+            report=report,
+        )
+
+    def get(self, symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+        from .ohlc import _yahoo_one
+
+        return _yahoo_one(symbol, period=period, interval=interval)
+
+
+def _column(columns: Dict[str, str], field: str) -> Optional[str]:
+    for alias in ALIASES[field]:
+        if alias in columns:
+            return columns[alias]
+    return None
+
+
+def _file_date(path: Path) -> Optional[pd.Timestamp]:
+    match = _FILE_DATE.search(path.stem)
+    if match is None:
+        return None
+    try:
+        return pd.Timestamp(match.group(1))
+    except ValueError:
+        return None
+
+
+def read_bhavcopy(path: str | os.PathLike, *, series: Iterable[str] = ("EQ",)) -> pd.DataFrame:
+    """Parse one bulk end-of-day file into long format.
+
+    Parameters
+    ----------
+    path : str or Path
+        CSV file with one row per symbol. Headers are matched against
+        :data:`ALIASES`; the date comes from a date column or, failing that,
+        from a date in the file name (``2024-06-28``, ``20240628`` or
+        ``28JUN2024``).
+    series : Iterable[str], optional
+        Series kept when the file has a series column. Defaults to ``EQ``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns ``Date``, ``Symbol`` and the OHLCV fields.
+    """
+    path = Path(path)
+    raw = pd.read_csv(path, skipinitialspace=True)
+    columns = {str(c).strip().upper(): c for c in raw.columns}
+    symbol_col = _column(columns, "Symbol")
+    if symbol_col is None:
+        raise ValueError(f"{path} has no symbol column")
+    series_col = _column(columns, "Series")
+    if series_col is not None:
+        keep = raw[series_col].astype(str).str.strip().isin(set(series))
+        raw = raw[keep]
+    out = pd.DataFrame({"Symbol": raw[symbol_col].astype(str).str.strip()})
+    for field in COLUMNS:
+        col = _column(columns, field)
+        out[field] = pd.to_numeric(raw[col], errors="coerce") if col is not None else float("nan")
+    date_col = _column(columns, "Date")
+    if date_col is not None:
+        out["Date"] = pd.to_datetime(raw[date_col].astype(str).str.strip(), format="mixed")
+    else:
+        date = _file_date(path)
+        if date is None:
+            raise ValueError(f"{path} has no date column and no date in its name")
+        out["Date"] = date
+    return out
+
+
+def _in_bulk_files(symbol: str) -> bool:
+    """Return whether ``symbol`` can appear in a bulk file; indices cannot."""
+    return not symbol.startswith("^")
+
+
+class BhavcopySource:
+    """Daily bars built from a directory of per-date bulk CSV files.
+
+    Parameters
+    ----------
+    root : str or Path
+        Directory of CSV files, one per trading date, each covering every
+        symbol.
+    store : BarStore or str or Path, optional
+        Where the per-symbol columnar history is kept. Defaults to a
+        ``.barstore`` directory inside ``root``.
+    fallback : DataSource, optional
+        Source used for intervals other than ``"1d"`` and, when
+        ``offline`` is false, for daily symbols missing from the files.
+        Defaults to :class:`YahooSource`.
+    offline : bool, optional
+        Never use ``fallback`` for daily bars of symbols the files can hold.
+        Index tickers such as ``^NSEI`` are not in the bulk files and always
+        come from ``fallback``. Defaults to ``True``.
+    series : Iterable[str], optional
+        Bhavcopy series kept. Defaults to ``EQ``.
+
+    Notes
+    -----
+    Files are ingested by :meth:`ingest`, which only reads files not seen
+    before. Periods are counted back from the latest ingested date, so a
+    directory that stops at an old date still yields full windows.
+    """
+
+    interval = "1d"
+
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        store: BarStore | str | os.PathLike | None = None,
+        *,
+        fallback: DataSource | None = None,
+        offline: bool = True,
+        series: Iterable[str] = ("EQ",),
+    ) -> None:
+        self.root = Path(root)
+        if store is None:
+            store = self.root / ".barstore"
+        self.store = store if isinstance(store, BarStore) else BarStore(store)
+        self.fallback = YahooSource() if fallback is None else fallback
+        self.offline = offline
+        self.series = tuple(series)
+
+    @property
+    def _manifest(self) -> Path:
+        return self.store.root / "ingested.json"
+
+    def _ingested(self) -> Dict[str, Optional[List[int]]]:
+        """Return ``[size, mtime_ns]`` of each ingested file keyed by name."""
+        try:
+            data = json.loads(self._manifest.read_text())
+        except (OSError, ValueError):
+            return {}
+        if isinstance(data, list):  # names only, as written by earlier versions
+            return {name: None for name in data}
+        return data
+
+    def ingest(self) -> int:
+        """Add the bars of every CSV file not ingested yet to the store.
+
+        Bars newer than a symbol's stored history are appended; files for
+        earlier dates (e.g. backfills) rewrite that symbol's history. Files
+        are recognised by name, size and modification time, so a file that
+        is replaced is read again. Files that fail to parse are not
+        recorded and are retried on the next call.
+
+        Returns
+        -------
+        int
+            Number of files ingested.
+        """
+        seen = self._ingested()
+        stamps = {}
+        for path in self.root.iterdir():
+            if path.suffix.lower() == ".csv" and path.is_file():
+                stat = path.stat()
+                stamp = [stat.st_size, stat.st_mtime_ns]
+                if path.name not in seen or seen[path.name] not in (None, stamp):
+                    stamps[path] = stamp
+        new = sorted(stamps, key=lambda p: (_file_date(p) or pd.Timestamp.min, p.name))
+        if not new:
+            return 0
+        frames = []
+        for path in new:
+            try:
+                frames.append(read_bhavcopy(path, series=self.series))
+            except (ValueError, OSError, pd.errors.ParserError) as exc:
+                logger.warning("Skipping %s: %s", path, exc)
+                continue
+            seen[path.name] = stamps[path]
+        if frames:
+            bars = pd.concat(frames, ignore_index=True).dropna(subset=["Close"])
+            for symbol, rows in bars.groupby("Symbol", sort=False):
+                df = rows.set_index(pd.DatetimeIndex(rows["Date"]).as_unit("ns"))[list(COLUMNS)]
+                df = df.rename_axis(None).sort_index()
+                self._add(symbol, df)
+        self.store.root.mkdir(parents=True, exist_ok=True)
+        self._manifest.write_text(json.dumps(dict(sorted(seen.items()))))
+        logger.debug("Ingested %d bulk files from %s", len(frames), self.root)
+        return len(frames)
+
+    def _add(self, symbol: str, df: pd.DataFrame) -> None:
+        series = self.store.open(symbol, self.interval)
+        if series is None or len(series) == 0 or series.ts[-1] < df.index.asi8[0]:
+            self.store.append(symbol, self.interval, df)
+            return
+        held = self.store.read(symbol, self.interval)
+        merged = pd.concat([held, df])
+        self.store.write(symbol, self.interval, merged[~merged.index.duplicated(keep="last")])
+
+    def get_many(self, symbols, *, interval, period=None, start=None, batch_size=50, desc=None, report=None):
+        symbols = list(dict.fromkeys(symbols))
+        if interval != self.interval:
+            return self.fallback.get_many(
+                symbols,
+                interval=interval,
+                period=period,
+                start=start,
+                batch_size=batch_size,
+                desc=desc,
+                report=report,
+            )
+        frames: Dict[str, pd.DataFrame] = {}
+        for sym in symbols:
+            if not _in_bulk_files(sym):
+                continue
+            df = self.store.read(sym, interval, period=None if start else period, start=start)
+            if not df.empty:
+                frames[sym] = df
+        missing = [sym for sym in symbols if sym not in frames]
+        if self.offline:
+            missing = [sym for sym in missing if not _in_bulk_files(sym)]
+        if missing:
+            frames.update(
+                self.fallback.get_many(
+                    missing, interval=interval, period=period, start=start, batch_size=batch_size
+                )
+            )
+            missing = [sym for sym in symbols if sym not in frames]
+        if report is not None:
+            for sym in symbols:
+                if sym in frames:
+                    report.add(FetchOutcome(sym, value=frames[sym]))
+                else:
+                    report.add(FetchOutcome(sym, error=EmptyResult(sym)))
+        if missing:
+            logger.debug("No local daily bars for %d symbols: %s", len(missing), ", ".join(missing))
+        return {sym: frames[sym] for sym in symbols if sym in frames}
+
+    def get(self, symbol: str, *, period: str, interval: str) -> pd.DataFrame:
+        return self.get_many([symbol], period=period, interval=interval).get(symbol, pd.DataFrame())
+
+
+_YAHOO = YahooSource()
+_source: Optional[DataSource] = None
+
+
+def set_source(source: DataSource | None) -> None:
+    """Install ``source`` as the shared bar source. ``None`` restores Yahoo."""
+    global _source
+    _source = source
+
+
+def get_source() -> DataSource:
+    """Return the shared source, configuring it from the environment if unset.
+
+    ``NSE_FNO_BHAVCOPY_DIR`` installs a :class:`BhavcopySource` over that
+    directory, ingesting any new files.
+    """
+    if _source is None and os.getenv(SOURCE_DIR_ENV):
+        source = BhavcopySource(os.environ[SOURCE_DIR_ENV])
+        source.ingest()
+        set_source(source)
+    return _YAHOO if _source is None else _source
+
+
+__all__ = [
+    "DataSource",
+    "YahooSource",
+    "BhavcopySource",
+    "read_bhavcopy",
+    "set_source",
+    "get_source",
+]
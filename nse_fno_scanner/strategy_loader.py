@@ -1,11 +1,191 @@
+"""Loading of custom screening strategies.
+
+Two kinds of strategy are supported. A plain callable receives the list of
+surviving symbols and returns the ones it keeps. A strategy decorated with
+:func:`vectorized` declares the columns, lookback and indicators it needs
+and receives them as wide (bar x symbol) panels built from the bars the
+scan already downloaded, evaluating the whole universe at once.
+"""
+
+from __future__ import annotations
+
+import functools
 import importlib
-from typing import Callable, Iterable, List
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype
+
+from .indicators import ema, price_panel, sma
+
+if TYPE_CHECKING:
+    from .session import MarketDataSession
 
 Strategy = Callable[[Iterable[str]], List[str]]
 
+_INDICATOR_RE = re.compile(r"^(sma|ema)(\d+)$")
+_INDICATORS = {"sma": sma, "ema": ema}
+
+
+@dataclass(frozen=True)
+class DataRequirements:
+    """Bars and indicators a vectorized strategy needs.
+
+    Attributes
+    ----------
+    columns : Tuple[str, ...]
+        OHLCV columns to load, e.g. ``("Close", "Volume")``.
+    lookback : str
+        Yahoo period string covering the bars needed, e.g. ``"250d"``.
+    interval : str
+        Candle interval.
+    indicators : Tuple[str, ...]
+        Moving averages of the close computed for every symbol, named
+        ``"sma<N>"`` or ``"ema<N>"``.
+    align : {"bars", "time"}
+        Panel alignment, see :func:`~nse_fno_scanner.indicators.price_panel`.
+    top : int, optional
+        When the strategy returns scores, keep only the ``top`` best.
+    """
+
+    columns: Tuple[str, ...] = ("Close",)
+    lookback: str = "250d"
+    interval: str = "1d"
+    indicators: Tuple[str, ...] = ()
+    align: str = "bars"
+    top: Optional[int] = None
+
+
+@dataclass
+class Panel:
+    """Data handed to a vectorized strategy.
+
+    ``columns`` and ``indicators`` map names to panels with one column per
+    entry of ``symbols``. Indexing a panel looks a name up in both.
+    """
+
+    symbols: List[str]
+    columns: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    indicators: Dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name in self.columns:
+            return self.columns[name]
+        return self.indicators[name]
+
+
+def _select(symbols: List[str], result, top: Optional[int]) -> List[str]:
+    """Turn a strategy's mask or scores over ``symbols`` into a shortlist.
+
+    Masks keep the ``True`` symbols in universe order. Scores keep the
+    ``top`` highest, best first, or every positive score when ``top`` is
+    ``None``. ``NaN`` scores never pass.
+    """
+    if isinstance(result, pd.Series):
+        values = result.reindex(symbols)
+    else:
+        values = pd.Series(np.asarray(result), index=symbols)
+    if is_bool_dtype(values.dtype) or values.dtype == object:
+        # Reindexing a boolean Series over missing symbols yields NaN.
+        mask = values.astype("boolean").fillna(False).to_numpy(dtype=bool)
+        return values.index[mask].tolist()
+    scores = values.astype("float64").dropna()
+    if top is not None:
+        return scores.sort_values(ascending=False, kind="stable").index[:top].tolist()
+    return scores.index[scores.to_numpy() > 0].tolist()
+
+
+class VectorizedStrategy:
+    """Strategy evaluated on panels of preloaded bars.
+
+    Calling the strategy with a list of symbols loads the declared data
+    through ``session`` (a new :class:`MarketDataSession` when omitted),
+    passes a :class:`Panel` to the wrapped function and returns the
+    symbols it selects. Symbols without bars are dropped.
+    """
+
+    def __init__(self, func: Callable[[Panel], object], needs: DataRequirements) -> None:
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.needs = needs
+
+    def load(self, symbols: Iterable[str], session: "MarketDataSession | None" = None) -> Panel:
+        """Return the panel for ``symbols`` with the declared data."""
+        from .session import MarketDataSession
+
+        session = MarketDataSession() if session is None else session
+        needs = self.needs
+        frames = session.get_many(symbols, period=needs.lookback, interval=needs.interval)
+        columns = {
+            col: price_panel(frames, col, align=needs.align) for col in needs.columns
+        }
+        close = columns.get("Close")
+        if close is None and needs.indicators:
+            close = price_panel(frames, "Close", align=needs.align)
+        indicators = {}
+        for name in needs.indicators:
+            kind, length = _INDICATOR_RE.match(name).groups()
+            indicators[name] = _INDICATORS[kind](close, int(length))
+        return Panel(list(frames), columns, indicators)
+
+    def __call__(
+        self, symbols: Iterable[str], *, session: "MarketDataSession | None" = None
+    ) -> List[str]:
+        panel = self.load(symbols, session)
+        if not panel.symbols:
+            return []
+        return _select(panel.symbols, self.func(panel), self.needs.top)
+
+    def __repr__(self) -> str:
+        return f"<vectorized strategy {self.__name__}>"
+
+
+def vectorized(
+    *,
+    columns: Iterable[str] = ("Close",),
+    lookback: str = "250d",
+    interval: str = "1d",
+    indicators: Iterable[str] = (),
+    align: str = "bars",
+    top: int | None = None,
+) -> Callable[[Callable[[Panel], object]], VectorizedStrategy]:
+    """Declare a strategy that works on panels of preloaded bars.
+
+    The decorated function receives a :class:`Panel` and returns, for every
+    symbol of ``panel.symbols``, either a boolean mask or a score, as a
+    Series indexed by symbol or an array in the same order. See
+    :class:`DataRequirements` for the parameters.
+
+    Examples
+    --------
+    >>> @vectorized(columns=("Close",), indicators=("sma20", "sma50"))
+    ... def golden(panel):
+    ...     return panel["sma20"].iloc[-1] > panel["sma50"].iloc[-1]
+    """
+    indicators = tuple(indicators)
+    for name in indicators:
+        if _INDICATOR_RE.match(name) is None:
+            raise ValueError(f"Unknown indicator {name!r}; expected sma<N> or ema<N>")
+    if align not in {"bars", "time"}:
+        raise ValueError("align must be 'time' or 'bars'")
+    needs = DataRequirements(tuple(columns), lookback, interval, indicators, align, top)
+
+    def decorate(func: Callable[[Panel], object]) -> VectorizedStrategy:
+        return VectorizedStrategy(func, needs)
+
+    return decorate
+
 
 def load_strategy(path: str) -> Strategy:
-    """Load a strategy callable from ``module:function`` string."""
+    """Load a strategy callable from ``module:function`` string.
+
+    Functions decorated with :func:`vectorized` are returned as
+    :class:`VectorizedStrategy` objects, which are also called with a list
+    of symbols.
+    """
     if ":" not in path:
         raise ValueError("Strategy path must be in module:function format")
     module_name, func_name = path.split(":", 1)
@@ -14,3 +194,13 @@ def load_strategy(path: str) -> Strategy:
     if not callable(func):
         raise TypeError(f"{path} is not callable")
     return func
+
+
+__all__ = [
+    "DataRequirements",
+    "Panel",
+    "Strategy",
+    "VectorizedStrategy",
+    "load_strategy",
+    "vectorized",
+]
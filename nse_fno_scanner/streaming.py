@@ -0,0 +1,284 @@
+"""Streaming indicators updated one candle at a time.
+
+Each indicator keeps only the state it needs, a ring buffer of the last
+values or the last result, so consuming a new candle costs constant time per
+symbol instead of a recompute over the whole history. They back
+:class:`~nse_fno_scanner.scanner.IncrementalScanner` and event replay.
+
+Every indicator has the same interface:
+
+``push(value)``
+    Consume one value and return the updated result.
+``update(values)``
+    Consume a batch and return the result after each value, computed
+    without a per-value Python loop for all but short batches.
+``peek(value)``
+    Return the result as if ``value`` had been pushed, without changing the
+    state. Used for the live, still forming candle.
+``seed(history)``
+    Reset the state from a historical frame (its ``Close`` column), Series
+    or array.
+
+Results match the pandas computations in
+:mod:`~nse_fno_scanner.indicators` for the same values. Inputs must not
+contain ``NaN``.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .indicators import session_ema
+
+History = Union[pd.DataFrame, pd.Series, np.ndarray, list]
+
+
+def _values(history: History, column: str = "Close") -> np.ndarray:
+    if isinstance(history, pd.DataFrame):
+        history = history[column]
+    return np.asarray(history, dtype="float64").ravel()
+
+
+class _RingBuffer:
+    """Fixed-size buffer of the last ``size`` floats, oldest first on read."""
+
+    def __init__(self, size: int) -> None:
+        self.data = np.zeros(size)
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def __getitem__(self, i: int) -> float:
+        """Return the ``i``-th value, ``0`` being the oldest held."""
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("ring buffer index out of range")
+        return float(self.data[(self.pos - n + i) % self.size])
+
+    def append(self, value: float) -> float:
+        """Store ``value`` and return the value it overwrote (``0`` if none)."""
+        dropped = self.data[self.pos] if self.count >= self.size else 0.0
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count += 1
+        return float(dropped)
+
+    def extend(self, values: np.ndarray) -> None:
+        tail = values[-self.size :]
+        idx = (self.pos + np.arange(len(tail))) % self.size
+        self.data[idx] = tail
+        self.pos = (self.pos + len(tail)) % self.size
+        self.count += len(values)
+
+    def to_array(self) -> np.ndarray:
+        """Return the held values, oldest first."""
+        n = len(self)
+        return np.roll(self.data, -self.pos)[self.size - n :] if n else np.empty(0)
+
+    def clear(self) -> None:
+        self.pos = 0
+        self.count = 0
+
+
+class SMA:
+    """Simple moving average matching ``rolling(period).mean()``.
+
+    The running sum is recomputed from the buffer every
+    :attr:`RESUM_EVERY` values so floating point error cannot accumulate
+    over long-running sessions.
+    """
+
+    RESUM_EVERY = 1024
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.window = _RingBuffer(period)
+        self.total = 0.0
+        self._pushes = 0
+
+    @property
+    def count(self) -> int:
+        """Number of values consumed."""
+        return self.window.count
+
+    @property
+    def value(self) -> float:
+        if self.window.count < self.period:
+            return math.nan
+        return self.total / self.period
+
+    def push(self, value: float) -> float:
+        self.total += value - self.window.append(value)
+        self._pushes += 1
+        if self._pushes % self.RESUM_EVERY == 0:
+            self.total = math.fsum(self.window.to_array())
+        return self.value
+
+    def peek(self, value: float) -> float:
+        if self.window.count + 1 < self.period:
+            return math.nan
+        dropped = self.window[0] if self.window.count >= self.period else 0.0
+        return (self.total - dropped + value) / self.period
+
+    def update(self, values) -> np.ndarray:
+        values = _values(values)
+        held = self.window.to_array()
+        joined = np.r_[held[len(held) - min(len(held), self.period - 1) :], values]
+        out = np.full(len(values), math.nan)
+        if len(joined) >= self.period:
+            sums = np.lib.stride_tricks.sliding_window_view(joined, self.period).sum(axis=1)
+            out[len(out) - len(sums) :] = sums / self.period
+        self.window.extend(values)
+        self.total = math.fsum(self.window.to_array())
+        self._pushes = 0
+        return out
+
+    def seed(self, history: History) -> "SMA":
+        self.window.clear()
+        self.total = 0.0
+        self.update(history)
+        return self
+
+
+class EMA:
+    """Exponential moving average matching ``ewm(span, adjust=False).mean()``."""
+
+    # Batches up to this size are pushed one by one, which is cheaper than
+    # setting up the closed-form solution.
+    SHORT_BATCH = 16
+
+    def __init__(self, span: int) -> None:
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = math.nan
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        self.value = self.peek(value)
+        self.count += 1
+        return self.value
+
+    def peek(self, value: float) -> float:
+        if math.isnan(self.value):
+            return value
+        return self.value + self.alpha * (value - self.value)
+
+    def update(self, values) -> np.ndarray:
+        values = _values(values)
+        if len(values) <= self.SHORT_BATCH:
+            return np.array([self.push(v) for v in values])
+        if math.isnan(self.value):
+            out = session_ema(values, np.array([0]), self.span)
+        else:
+            out = session_ema(np.r_[self.value, values], np.array([0]), self.span)[1:]
+        self.value = float(out[-1])
+        self.count += len(values)
+        return out
+
+    def seed(self, history: History) -> "EMA":
+        self.value = math.nan
+        self.count = 0
+        self.update(history)
+        return self
+
+
+class Rising:
+    """Whether each of the last ``n`` values rose over the one before.
+
+    Matches :func:`~nse_fno_scanner.indicators.rising`; ``False`` until
+    ``n + 1`` values were seen.
+    """
+
+    def __init__(self, n: int = 3) -> None:
+        self.n = n
+        self.window = _RingBuffer(n + 1)
+
+    @property
+    def count(self) -> int:
+        return self.window.count
+
+    @property
+    def value(self) -> bool:
+        return self._rising(self.window.to_array())
+
+    def _rising(self, values: np.ndarray) -> bool:
+        return len(values) == self.n + 1 and bool(np.all(np.diff(values) > 0))
+
+    def push(self, value: float) -> bool:
+        self.window.append(value)
+        return self.value
+
+    def peek(self, value: float) -> bool:
+        held = self.window.to_array()
+        return self._rising(np.r_[held[len(held) - min(len(held), self.n) :], value])
+
+    def update(self, values) -> np.ndarray:
+        values = _values(values)
+        held = self.window.to_array()
+        up = np.diff(np.r_[held[len(held) - min(len(held), self.n) :], values]) > 0
+        out = np.zeros(len(values), dtype=bool)
+        if len(up) >= self.n:
+            runs = np.lib.stride_tricks.sliding_window_view(up, self.n).all(axis=1)
+            out[len(out) - len(runs) :] = runs
+        self.window.extend(values)
+        return out
+
+    def seed(self, history: History) -> "Rising":
+        self.window.clear()
+        self.update(history)
+        return self
+
+
+class Crossover:
+    """Detect ``fast`` crossing ``slow``.
+
+    Results are ``1`` on the value where ``fast > slow`` after
+    ``fast <= slow`` on the previous one, ``-1`` for the reverse and ``0``
+    otherwise, i.e. ``above.astype(int).diff()`` with
+    ``above = fast > slow``. Values where either input is ``NaN`` count as
+    not above, so a warming-up moving average never crosses.
+    """
+
+    def __init__(self) -> None:
+        self.above: bool | None = None
+
+    @staticmethod
+    def _above(fast, slow):
+        with np.errstate(invalid="ignore"):
+            return np.greater(fast, slow)
+
+    def push(self, fast: float, slow: float) -> int:
+        result = self.peek(fast, slow)
+        self.above = bool(self._above(fast, slow))
+        return result
+
+    def peek(self, fast: float, slow: float) -> int:
+        above = bool(self._above(fast, slow))
+        if self.above is None or above == self.above:
+            return 0
+        return 1 if above else -1
+
+    def update(self, fast, slow) -> np.ndarray:
+        above = self._above(_values(fast), _values(slow)).astype("int8")
+        if len(above) == 0:
+            return above
+        prev = np.r_[above[0] if self.above is None else int(self.above), above[:-1]]
+        self.above = bool(above[-1])
+        return above - prev
+
+    def seed(self, fast: History, slow: History) -> "Crossover":
+        self.above = None
+        self.update(fast, slow)
+        return self
+
+
+__all__ = ["SMA", "EMA", "Rising", "Crossover"]
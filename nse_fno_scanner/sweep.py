@@ -0,0 +1,236 @@
+"""Parameter sweeps for the backtester.
+
+:func:`sweep` downloads each symbol's bars once per interval, evaluates every
+combination of the parameter grid on them and spreads the symbols across a
+process pool. Moving averages are cached per symbol, so combinations sharing
+a period or EMA span reuse the same rolling results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .backtester import _daily_signals, _intraday_signals, summarize_returns
+from .ohlc import download_many
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = [
+    "symbol",
+    "mode",
+    "interval",
+    "start_hour",
+    "fast",
+    "slow",
+    "trades",
+    "win_rate",
+    "avg_return",
+]
+
+
+def _combos(
+    mode: str,
+    fast: Sequence[int],
+    slow: Sequence[int],
+    start_hour: Sequence[Optional[int]],
+    interval: Sequence[str],
+) -> List[dict]:
+    """Expand the grid, dropping axes the ``mode`` does not use."""
+    if mode == "daily":
+        start_hour, interval = [None], [None]
+    return [
+        {"interval": i, "start_hour": h, "fast": f, "slow": s}
+        for i, h, f, s in itertools.product(interval, start_hour, fast, slow)
+    ]
+
+
+def _sweep_symbol(
+    symbol: str,
+    frames: Dict[Optional[str], pd.DataFrame],
+    combos: List[dict],
+    mode: str,
+) -> List[dict]:
+    """Evaluate every combination for one symbol.
+
+    ``frames`` maps each intraday interval to its bars and ``None`` to the
+    daily bars.
+    """
+    caches: Dict[Optional[str], dict] = {key: {} for key in frames}
+    rows = []
+    for combo in combos:
+        parts = []
+        intraday = frames.get(combo["interval"]) if mode != "daily" else None
+        if intraday is not None and not intraday.empty:
+            parts.append(
+                _intraday_signals(
+                    intraday,
+                    start_hour=combo["start_hour"],
+                    fast=combo["fast"],
+                    slow=combo["slow"],
+                    cache=caches[combo["interval"]],
+                )[3]
+            )
+        daily = frames.get(None) if mode != "intraday" else None
+        if daily is not None and not daily.empty:
+            parts.append(
+                _daily_signals(daily, fast=combo["fast"], slow=combo["slow"], cache=caches[None])[3]
+            )
+        returns = np.concatenate(parts) if parts else np.empty(0)
+        trades, win_rate, avg_return = summarize_returns(returns)
+        rows.append(
+            {
+                "symbol": symbol,
+                "mode": mode,
+                **combo,
+                "trades": trades,
+                "win_rate": win_rate,
+                "avg_return": avg_return,
+            }
+        )
+    return rows
+
+
+def sweep(
+    symbols: Iterable[str],
+    *,
+    fast: Sequence[int] = (20,),
+    slow: Sequence[int] = (50,),
+    start_hour: Sequence[Optional[int]] = (None,),
+    interval: Sequence[str] = ("15m",),
+    mode: str = "intraday",
+    period: str = "30d",
+    workers: Optional[int] = None,
+    batch_size: int = 50,
+) -> pd.DataFrame:
+    """Backtest every combination of the parameter grid on ``symbols``.
+
+    Parameters
+    ----------
+    symbols : Iterable[str]
+        Symbols to backtest.
+    fast, slow : Sequence[int], optional
+        Moving average periods to try.
+    start_hour : Sequence[int or None], optional
+        Intraday session start hours to try.
+    interval : Sequence[str], optional
+        Intraday candle intervals to try.
+    mode : {"intraday", "daily", "both"}, optional
+        Strategy to run, as for :func:`~nse_fno_scanner.backtest_strategy`.
+    period : str, optional
+        Data period downloaded for every symbol and interval.
+    workers : int, optional
+        Size of the process pool. ``1`` evaluates in the current process;
+        ``None`` uses one process per CPU.
+    batch_size : int, optional
+        Number of symbols requested per download.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per symbol and parameter combination with the trade count,
+        win rate and average return.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    combos = _combos(mode, fast, slow, start_hour, interval)
+    data: Dict[str, Dict[Optional[str], pd.DataFrame]] = {sym: {} for sym in symbols}
+    if mode in {"intraday", "both"}:
+        for ivl in dict.fromkeys(interval):
+            frames = download_many(symbols, period=period, interval=ivl, batch_size=batch_size)
+            for sym, df in frames.items():
+                data[sym][ivl] = df
+    if mode in {"daily", "both"}:
+        frames = download_many(symbols, period=period, interval="1d", batch_size=batch_size)
+        for sym, df in frames.items():
+            data[sym][None] = df
+
+    logger.debug("Sweeping %d combinations over %d symbols", len(combos), len(symbols))
+    args = [(sym, data[sym], combos, mode) for sym in symbols]
+    if workers == 1 or len(symbols) <= 1:
+        results = [_sweep_symbol(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_sweep_symbol, *zip(*args)))
+    rows = [row for rows in results for row in rows]
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def _hour_list(text: str) -> List[Optional[int]]:
+    return [None if v.strip().lower() == "none" else int(v) for v in text.split(",") if v.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Command line interface for :func:`sweep`."""
+    parser = argparse.ArgumentParser(
+        prog="run_scan.py sweep", description="Backtest a grid of strategy parameters"
+    )
+    parser.add_argument("--symbols", help="Comma separated list of ticker symbols")
+    parser.add_argument("--fno-url", help="Custom URL to download F&O stock list")
+    parser.add_argument("--fast", type=_int_list, default=[20], help="Fast periods, e.g. 10,20")
+    parser.add_argument("--slow", type=_int_list, default=[50], help="Slow periods, e.g. 50,100")
+    parser.add_argument(
+        "--start-hour",
+        type=_hour_list,
+        default=[None],
+        help="Intraday start hours, e.g. none,10",
+    )
+    parser.add_argument(
+        "--interval",
+        type=lambda t: [v.strip() for v in t.split(",") if v.strip()],
+        default=["15m"],
+        help="Intraday intervals, e.g. 5m,15m",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["daily", "intraday", "both"],
+        default="intraday",
+        help="Strategy mode to backtest",
+    )
+    parser.add_argument("--period", default="30d", help="Data period to download")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("sweep_results.csv"),
+        help="CSV file for the results table",
+    )
+    args = parser.parse_args(argv)
+
+    from .fetch_fno_list import fetch_fno_list
+
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    else:
+        symbols = fetch_fno_list(url=args.fno_url) if args.fno_url else fetch_fno_list()
+    table = sweep(
+        symbols,
+        fast=args.fast,
+        slow=args.slow,
+        start_hour=args.start_hour,
+        interval=args.interval,
+        mode=args.mode,
+        period=args.period,
+        workers=args.workers,
+    )
+    table.to_csv(args.output, index=False)
+    summary = (
+        table.groupby(["mode", "interval", "start_hour", "fast", "slow"], dropna=False)
+        .agg(trades=("trades", "sum"), win_rate=("win_rate", "mean"), avg_return=("avg_return", "mean"))
+        .sort_values("avg_return", ascending=False)
+    )
+    print(summary.to_string())
+    return table
+
+
+__all__ = ["sweep"]
@@ -0,0 +1,211 @@
+"""Columnar trade records.
+
+A :class:`TradeLog` stores trades as parallel NumPy columns (symbol code,
+date, entry, exit and return) instead of one object per trade. Logs are
+built in bulk from the signal arrays of the backtester, concatenated
+cheaply and turned into a DataFrame without copying the price columns.
+Iterating a log still yields :class:`Trade` objects for older callers.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Trade:
+    date: pd.Timestamp
+    entry: float
+    exit: float
+    pct_return: float
+
+
+def _as_ns(dates) -> tuple:
+    """Return ``dates`` as ``datetime64[ns]`` wall times in UTC and their zone."""
+    index = pd.DatetimeIndex(dates)
+    tz = index.tz
+    if tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").values, (str(tz) if tz is not None else None)
+
+
+class TradeLog:
+    """Struct-of-arrays record of trades across symbols.
+
+    Parameters
+    ----------
+    symbols : Sequence[str], optional
+        Symbol table indexed by ``code``.
+    code : np.ndarray, optional
+        ``int32`` index into ``symbols`` for every trade.
+    date : np.ndarray, optional
+        ``datetime64[ns]`` trade dates, in UTC when ``tz`` is set.
+    entry, exit, ret : np.ndarray, optional
+        ``float64`` entry price, exit price and fractional return.
+    tz : str, optional
+        Time zone the dates are presented in.
+
+    Notes
+    -----
+    :meth:`append` only queues its arrays; they are concatenated once, the
+    next time a column is read, so appending many symbols costs a single
+    copy.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str] = (),
+        code: Optional[np.ndarray] = None,
+        date: Optional[np.ndarray] = None,
+        entry: Optional[np.ndarray] = None,
+        exit: Optional[np.ndarray] = None,
+        ret: Optional[np.ndarray] = None,
+        *,
+        tz: Optional[str] = None,
+    ) -> None:
+        self.symbols: List[str] = list(symbols)
+        self._codes = {sym: i for i, sym in enumerate(self.symbols)}
+        self._columns = (
+            np.asarray(code if code is not None else [], dtype="int32"),
+            np.asarray(date if date is not None else [], dtype="datetime64[ns]"),
+            np.asarray(entry if entry is not None else [], dtype="float64"),
+            np.asarray(exit if exit is not None else [], dtype="float64"),
+            np.asarray(ret if ret is not None else [], dtype="float64"),
+        )
+        self._pending: List[tuple] = []
+        self.tz = tz
+
+    @classmethod
+    def from_arrays(cls, symbol: str, dates, entry, exit, ret) -> "TradeLog":
+        """Build a log of one symbol's trades from signal arrays."""
+        log = cls()
+        log.append(symbol, dates, entry, exit, ret)
+        return log
+
+    @classmethod
+    def concat(cls, logs: Iterable["TradeLog"]) -> "TradeLog":
+        """Concatenate ``logs``, merging their symbol tables in order."""
+        out = cls()
+        for log in logs:
+            out.extend(log)
+        return out
+
+    def _code(self, symbol: str) -> int:
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def _merge_tz(self, tz: Optional[str]) -> None:
+        if self.tz is None:
+            self.tz = tz
+
+    def append(self, symbol: str, dates, entry, exit, ret) -> None:
+        """Queue the trades of ``symbol`` given as parallel arrays."""
+        if len(entry) == 0:
+            self._code(symbol)
+            return
+        ns, tz = _as_ns(dates)
+        self._merge_tz(tz)
+        code = np.full(len(ns), self._code(symbol), dtype="int32")
+        self._pending.append(
+            (
+                code,
+                ns,
+                np.asarray(entry, dtype="float64"),
+                np.asarray(exit, dtype="float64"),
+                np.asarray(ret, dtype="float64"),
+            )
+        )
+
+    def extend(self, other: "TradeLog") -> None:
+        """Queue every trade of ``other``."""
+        remap = np.array([self._code(sym) for sym in other.symbols], dtype="int32")
+        self._merge_tz(other.tz)
+        if len(other):
+            code, date, entry, exit, ret = other._consolidated()
+            self._pending.append((remap[code], date, entry, exit, ret))
+
+    def _consolidated(self) -> tuple:
+        if self._pending:
+            parts = [self._columns, *self._pending]
+            self._columns = tuple(np.concatenate(col) for col in zip(*parts))
+            self._pending = []
+        return self._columns
+
+    @property
+    def code(self) -> np.ndarray:
+        return self._consolidated()[0]
+
+    @property
+    def date(self) -> np.ndarray:
+        return self._consolidated()[1]
+
+    @property
+    def entry(self) -> np.ndarray:
+        return self._consolidated()[2]
+
+    @property
+    def exit(self) -> np.ndarray:
+        return self._consolidated()[3]
+
+    @property
+    def ret(self) -> np.ndarray:
+        return self._consolidated()[4]
+
+    def __len__(self) -> int:
+        return len(self._columns[0]) + sum(len(p[0]) for p in self._pending)
+
+    def _timestamp(self, value: np.datetime64) -> pd.Timestamp:
+        ts = pd.Timestamp(value)
+        return ts.tz_localize("UTC").tz_convert(self.tz) if self.tz else ts
+
+    def __getitem__(self, i: int) -> Trade:
+        _, date, entry, exit, ret = self._consolidated()
+        return Trade(self._timestamp(date[i]), float(entry[i]), float(exit[i]), float(ret[i]))
+
+    def __iter__(self) -> Iterator[Trade]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def sorted(self) -> "TradeLog":
+        """Return the trades ordered by date, then by symbol code."""
+        code, date, entry, exit, ret = self._consolidated()
+        order = np.lexsort((code, date))
+        return TradeLog(
+            self.symbols, code[order], date[order], entry[order], exit[order], ret[order], tz=self.tz
+        )
+
+    def symbols_with_trades(self) -> List[str]:
+        """Return the symbols that have at least one trade, in table order."""
+        counts = np.bincount(self.code, minlength=len(self.symbols))
+        return [sym for sym, n in zip(self.symbols, counts) if n]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the trades as a DataFrame.
+
+        ``symbol`` holds plain strings; the codes stay internal to the log.
+        The price columns share memory with the log.
+        """
+        code, date, entry, exit, ret = self._consolidated()
+        dates = pd.DatetimeIndex(date)
+        if self.tz:
+            dates = dates.tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame(
+            {
+                "symbol": np.array(self.symbols, dtype=object)[code],
+                "date": dates,
+                "entry": entry,
+                "exit": exit,
+                "pct_return": ret,
+            },
+            copy=False,
+        )
+
+
+__all__ = ["Trade", "TradeLog"]
@@ -2,14 +2,36 @@
 
 import argparse
 import logging
+import sys
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
+if TYPE_CHECKING:
+    import pandas as pd
 
 from nse_fno_scanner.fetch_fno_list import fetch_fno_list, FNO_LIST_URL
 from nse_fno_scanner.dma_filter import filter_by_dma
 from nse_fno_scanner.intraday_scanner import intraday_scan
 from nse_fno_scanner.backtester import backtest_strategy
-from nse_fno_scanner.strategy_loader import load_strategy
+from nse_fno_scanner.strategy_loader import VectorizedStrategy, load_strategy
+from nse_fno_scanner.screen import ScreenError, compile_screen, load_screens
+from nse_fno_scanner.pipeline import stream_scan
+from nse_fno_scanner.sweep import main as sweep_main
+from nse_fno_scanner.replay import main as replay_main
+from nse_fno_scanner.scanner import IncrementalScanner
+from nse_fno_scanner.session import MarketDataSession
+from nse_fno_scanner.cache import set_cache
+from nse_fno_scanner.executor import FetchExecutor, set_executor
+from nse_fno_scanner.metrics import Metrics, get_metrics, set_metrics
+from nse_fno_scanner.sources import BhavcopySource, set_source
+from nse_fno_scanner.breadth import market_breadth
+from nse_fno_scanner.calibration import (
+    DEFAULT_PATH as DEFAULT_CALIBRATION,
+    load_calibration,
+    main as calibrate_main,
+    set_calibration,
+)
 from nse_fno_scanner.market_predictor import (
     predict_index_movement,
     compare_with_indices,
@@ -27,6 +49,65 @@ def _parse_symbols(text: str | None) -> list[str] | None:
     return [s.strip().upper() for s in text.split(",") if s.strip()]
 
 
+def _count_filter(metrics, name: str, before: list[str], after: list[str]) -> None:
+    """Record how many symbols entered and left the filter ``name``."""
+    metrics.inc("filter_symbols_in_total", len(before), filter=name)
+    metrics.inc("filter_symbols_out_total", len(after), filter=name)
+
+
+def _daily_count(
+    results: list[str],
+    *,
+    symbols: list[str] | None = None,
+    mode: str = "both",
+    fast: int = 20,
+    slow: int = 50,
+    offset: int = 1,
+    session: MarketDataSession | None = None,
+    scanner: IncrementalScanner | None = None,
+) -> "tuple[int, pd.DataFrame | None]":
+    """Return the count the prediction reads and the breadth table, if computed.
+
+    The prediction is calibrated on the daily DMA filter pass count. A
+    scanner answers from its DMA state; a daily scan reads the latest
+    ``trending`` value of the breadth of ``symbols``, whose bars the session
+    already holds. Without daily bars (``"intraday"`` mode) the final
+    shortlist count ``len(results)`` is used instead of downloading the
+    universe's daily history.
+    """
+    if scanner is not None:
+        count = scanner.daily_count()
+        return (len(results) if count is None else count), None
+    if mode not in {"daily", "both"}:
+        return len(results), None
+    breadth = market_breadth(symbols, session=session, fast=fast, slow=slow, offset=offset)
+    if breadth.empty:
+        return 0, breadth
+    return int(breadth["trending"].iloc[-1]), breadth
+
+
+def _stream_results(
+    symbols: list[str],
+    output: Path,
+    on_result: Callable[[str], None] | None,
+    **scan_kwargs,
+) -> list[str]:
+    """Run the pipelined scan, emitting each symbol as soon as it passes."""
+    logging.debug("Running streaming scan on %d symbols", len(symbols))
+    results: list[str] = []
+    print("Shortlisted stocks:")
+    with output.open("w") as fh:
+        for sym in stream_scan(symbols, **scan_kwargs):
+            fh.write(f"\n{sym}" if results else sym)
+            fh.flush()
+            results.append(sym)
+            print(sym)
+            if on_result is not None:
+                on_result(sym)
+    print(f"Shortlisted {len(results)} stocks")
+    return results
+
+
 def run(
     output: Path = DEFAULT_LOG,
     backtest: bool = False,
@@ -44,6 +125,12 @@ def run(
     bt_period: str = "6mo",
     bt_interval: str | None = None,
     extra_strategies: list[callable] | None = None,
+    batch_size: int = 50,
+    stream: bool = False,
+    on_result: Callable[[str], None] | None = None,
+    scanner: IncrementalScanner | None = None,
+    session: MarketDataSession | None = None,
+    base_interval: str | None = None,
 ) -> list[str]:
     """Run the scan and optionally notify/backtest.
 
@@ -68,75 +155,202 @@ def run(
         Intraday interval for the backtester. Defaults to ``interval``.
     extra_strategies : list[callable], optional
         Additional strategy callables applied after the built-in scans. Each
-        callable receives and returns a list of symbols.
-    
+        callable receives and returns a list of symbols. Strategies built with
+        :func:`~nse_fno_scanner.strategy_loader.vectorized` load their bars
+        through ``session``.
+    batch_size : int, optional
+        Number of symbols requested per Yahoo Finance download.
+    stream : bool, optional
+        Pipeline the scans so symbols passing the daily filter are checked
+        on intraday candles while other daily downloads are still running.
+        Custom strategies are then applied to each batch of survivors.
+    on_result : callable, optional
+        Called with each shortlisted symbol as soon as it is known.
+    scanner : IncrementalScanner, optional
+        Long-lived scanner whose :meth:`~IncrementalScanner.tick` replaces
+        the daily and intraday scans. The universe, ``mode`` and scan
+        parameters are then taken from the scanner.
+    session : MarketDataSession, optional
+        Memo of downloaded bars shared by the scans, the backtest and the
+        notification. A new session is created for every call by default.
+    base_interval : str, optional
+        Finest interval downloaded by the new session; coarser intervals
+        such as ``interval`` and ``bt_interval`` are resampled from it.
+
     Returns
     -------
     list[str]
         Symbols that passed the scan.
     """
 
-    logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
+    metrics = get_metrics()
+    run_started = time.perf_counter()
+    if session is None:
+        session = MarketDataSession(batch_size=batch_size, base_interval=base_interval)
 
-    if symbols is None:
-        logging.debug("Fetching F&O list")
-        symbols = fetch_fno_list(url=fno_url) if fno_url else fetch_fno_list()
+    if scanner is None:
+        logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
 
-    results: list[str] = symbols
-    if mode in {"daily", "both"}:
-        logging.debug("Running daily DMA filter on %d symbols", len(results))
-        results = filter_by_dma(results, offset=offset, fast_period=fast, slow_period=slow)
-    if mode in {"intraday", "both"}:
-        logging.debug("Running intraday scan on %d symbols", len(results))
-        results = intraday_scan(results, interval=interval)
+        if symbols is None:
+            logging.debug("Fetching F&O list")
+            with metrics.stage("fno_list"):
+                symbols = fetch_fno_list(url=fno_url) if fno_url else fetch_fno_list()
 
-    if extra_strategies:
-        for strat in extra_strategies:
-            logging.debug("Running custom strategy %s on %d symbols", strat, len(results))
-            results = strat(results)
+    if scanner is None and stream:
+        with metrics.stage("stream_scan"):
+            results = _stream_results(
+                symbols,
+                output,
+                on_result,
+                mode=mode,
+                offset=offset,
+                fast=fast,
+                slow=slow,
+                interval=interval,
+                batch_size=batch_size,
+                extra_strategies=extra_strategies,
+                session=session,
+            )
+        _count_filter(metrics, "stream", symbols, results)
+    else:
+        if scanner is not None:
+            logging.debug("Running incremental scan on %d symbols", len(scanner.symbols))
+            with metrics.stage("incremental_scan"):
+                results = scanner.tick()
+            _count_filter(metrics, "incremental", scanner.symbols, results)
+        else:
+            results: list[str] = symbols
+            if mode in {"daily", "both"}:
+                logging.debug("Running daily DMA filter on %d symbols", len(results))
+                with metrics.stage("daily_filter"):
+                    passed = filter_by_dma(
+                        results,
+                        offset=offset,
+                        fast_period=fast,
+                        slow_period=slow,
+                        batch_size=batch_size,
+                        session=session,
+                    )
+                _count_filter(metrics, "dma", results, passed)
+                results = passed
+            if mode in {"intraday", "both"}:
+                logging.debug("Running intraday scan on %d symbols", len(results))
+                with metrics.stage("intraday_scan"):
+                    passed = intraday_scan(
+                        results, interval=interval, batch_size=batch_size, session=session
+                    )
+                _count_filter(metrics, "intraday", results, passed)
+                results = passed
+
+        if extra_strategies:
+            for strat in extra_strategies:
+                logging.debug("Running custom strategy %s on %d symbols", strat, len(results))
+                with metrics.stage("strategies"):
+                    if isinstance(strat, VectorizedStrategy):
+                        passed = strat(results, session=session)
+                    else:
+                        passed = strat(results)
+                _count_filter(metrics, getattr(strat, "__name__", "strategy"), results, passed)
+                results = passed
 
-    output.write_text("\n".join(results))
-    print(f"Shortlisted stocks ({len(results)}):")
-    for sym in results:
-        print(sym)
+        output.write_text("\n".join(results))
+        print(f"Shortlisted stocks ({len(results)}):")
+        for sym in results:
+            print(sym)
+            if on_result is not None:
+                on_result(sym)
 
     if backtest:
         print("\nBacktest results:")
         log_lines = []
         bt_int = bt_interval or interval
         mode_to_use = bt_mode or mode
-        for sym in results:
-            trades, win_rate, avg_ret = backtest_strategy(
-                sym,
-                period=bt_period,
-                interval=bt_int,
-                mode=mode_to_use,
+        with metrics.stage("backtest"):
+            # Download the backtest bars for the whole shortlist in batches.
+            if mode_to_use in {"intraday", "both"}:
+                session.get_many(results, period=bt_period, interval=bt_int)
+            if mode_to_use in {"daily", "both"}:
+                session.get_many(results, period=bt_period, interval="1d")
+            for sym in results:
+                trades, win_rate, avg_ret = backtest_strategy(
+                    sym,
+                    period=bt_period,
+                    interval=bt_int,
+                    mode=mode_to_use,
+                    fast=fast,
+                    slow=slow,
+                    session=session,
+                )
+                print(
+                    f"{sym}: trades={trades}, avg_return={avg_ret * 100:.2f}%, win_rate={win_rate * 100:.1f}%"
+                )
+                log_lines.append(f"{sym},{trades},{avg_ret * 100:.2f},{win_rate * 100:.1f}")
+        Path("backtest_results.txt").write_text("\n".join(log_lines))
+
+    if notify:
+        with metrics.stage("notify"):
+            # The daily bars of the universe are already held by the session
+            # after the DMA filter, streamed or not, so breadth and the index
+            # comparison need at most the index bars.
+            count, breadth = _daily_count(
+                results,
+                symbols=symbols,
+                mode=mode,
                 fast=fast,
                 slow=slow,
+                offset=offset,
+                session=session,
+                scanner=scanner,
             )
-            print(
-                f"{sym}: trades={trades}, avg_return={avg_ret * 100:.2f}%, win_rate={win_rate * 100:.1f}%"
+            prob = predict_index_movement(count)
+            comp = compare_with_indices(results, session=session)
+            msg = (
+                f"Shortlisted {len(results)} stocks. "
+                f"Market up probability: {prob:.1%}\n"
+                f"Avg stock change: {comp['stocks']:.2%}\n"
+                f"NIFTY50: {comp['nifty']:.2%}, BankNifty: {comp['banknifty']:.2%}"
             )
-            log_lines.append(f"{sym},{trades},{avg_ret * 100:.2f},{win_rate * 100:.1f}")
-        Path("backtest_results.txt").write_text("\n".join(log_lines))
-
-    if notify:
-        prob = predict_index_movement(len(results))
-        comp = compare_with_indices(results)
-        msg = (
-            f"Shortlisted {len(results)} stocks. "
-            f"Market up probability: {prob:.1%}\n"
-            f"Avg stock change: {comp['stocks']:.2%}\n"
-            f"NIFTY50: {comp['nifty']:.2%}, BankNifty: {comp['banknifty']:.2%}"
-        )
-        send_telegram_message(msg)
+            if breadth is not None and not breadth.empty:
+                today = breadth.iloc[-1]
+                msg += (
+                    f"\nBreadth: {int(today['advances'])} up / {int(today['declines'])} down, "
+                    f"{today['above_dma50']:.0%} above 50 DMA"
+                )
+            send_telegram_message(msg)
 
+    metrics.observe("run_seconds", time.perf_counter() - run_started)
+    metrics.export()
     return results
 
 
+def _scanner_for(kwargs: dict) -> IncrementalScanner:
+    """Build the long-lived scanner used by the scheduling loops.
+
+    Logging is configured and the F&O list fetched once, here, instead of on
+    every tick.
+    """
+    logging.basicConfig(level=logging.DEBUG if kwargs.get("debug") else logging.INFO)
+    symbols = kwargs.get("symbols")
+    if symbols is None:
+        fno_url = kwargs.get("fno_url")
+        symbols = fetch_fno_list(url=fno_url) if fno_url else fetch_fno_list()
+    return IncrementalScanner(
+        symbols,
+        fast=kwargs.get("fast", 20),
+        slow=kwargs.get("slow", 50),
+        offset=kwargs.get("offset", 1),
+        interval=kwargs.get("interval", "15m"),
+        mode=kwargs.get("mode", "both"),
+        batch_size=kwargs.get("batch_size", 50),
+    )
+
+
 def schedule_scan(freq_minutes: int = 15, **kwargs) -> None:
     """Run :func:`run` periodically and print market prediction.
 
+    Indicator state is kept in an :class:`IncrementalScanner` between runs so
+    each tick only downloads the newest candles.
+
     Parameters
     ----------
     freq_minutes : int, optional
@@ -144,9 +358,11 @@ def schedule_scan(freq_minutes: int = 15, **kwargs) -> None:
     """
     import time
 
+    scanner = _scanner_for(kwargs)
     while True:
-        results = run(**kwargs)
-        prob = predict_index_movement(len(results))
+        results = run(scanner=scanner, **kwargs)
+        count, _ = _daily_count(results, scanner=scanner)
+        prob = predict_index_movement(count)
         print(f"Predicted market up move probability: {prob:.1%}")
         time.sleep(freq_minutes * 60)
 
@@ -154,6 +370,9 @@ def schedule_scan(freq_minutes: int = 15, **kwargs) -> None:
 def schedule_scan_with_prediction(freq_minutes: int = 15, **kwargs) -> None:
     """Run :func:`run` periodically and print shortlisted stocks and prediction.
 
+    Indicator state is kept in an :class:`IncrementalScanner` between runs so
+    each tick only downloads the newest candles.
+
     Parameters
     ----------
     freq_minutes : int, optional
@@ -161,15 +380,27 @@ def schedule_scan_with_prediction(freq_minutes: int = 15, **kwargs) -> None:
     """
     import time
 
+    scanner = _scanner_for(kwargs)
     while True:
-        results = run(**kwargs)
-        prob = predict_index_movement(len(results))
+        results = run(scanner=scanner, **kwargs)
+        count, _ = _daily_count(results, scanner=scanner)
+        prob = predict_index_movement(count)
         print(f"Stocks ({len(results)}): {', '.join(results)}")
         print(f"Predicted market up move probability: {prob:.1%}")
         time.sleep(freq_minutes * 60)
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["sweep"]:
+        sweep_main(argv[1:])
+        return
+    if argv[:1] == ["calibrate"]:
+        calibrate_main(argv[1:])
+        return
+    if argv[:1] == ["replay"]:
+        replay_main(argv[1:])
+        return
     parser = argparse.ArgumentParser(description="NSE F&O bullish setup scanner")
     parser.add_argument(
         "--output",
@@ -265,8 +496,127 @@ def main() -> None:
         dest="strategies",
         help="Import path to a custom strategy callable (module:function)",
     )
-    args = parser.parse_args()
-    extra_strats = [load_strategy(p) for p in args.strategies] if args.strategies else None
+    parser.add_argument(
+        "--screen",
+        action="append",
+        dest="screens",
+        help="Screen expression, e.g. 'sma(close,20) > sma(close,50) and rising(close,3)'",
+    )
+    parser.add_argument(
+        "--screen-file",
+        type=Path,
+        help="File with one screen expression per line",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Pipeline daily and intraday scans and emit results as they pass",
+    )
+    parser.add_argument(
+        "--base-interval",
+        help="Download only this interval (e.g. 5m) and resample coarser ones from it",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Number of symbols requested per download",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent OHLC cache",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=0.0,
+        help="Minutes cached bars are reused without fetching new candles",
+    )
+    parser.add_argument(
+        "--bhavcopy-dir",
+        type=Path,
+        help="Directory of per-date bulk CSV files serving daily bars offline",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent downloads",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=4.0,
+        help="Maximum download requests started per second",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Seconds a single download may take before it is retried",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Download attempts per request before giving up",
+    )
+    parser.add_argument(
+        "--calibration",
+        type=Path,
+        default=DEFAULT_CALIBRATION,
+        help="Fitted prediction parameters from 'run_scan.py calibrate' (used if present)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record stage timings and download counters",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=Path("."),
+        help="Directory for scan_metrics.json and scan_metrics.prom",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        set_metrics(
+            Metrics(
+                args.profile_dir / "scan_metrics.json",
+                args.profile_dir / "scan_metrics.prom",
+            )
+        )
+    set_executor(
+        FetchExecutor(
+            args.workers,
+            rate=args.rate_limit,
+            timeout=args.timeout,
+            retries=args.retries,
+        )
+    )
+    if args.cache_dir:
+        set_cache(args.cache_dir, max_age=args.cache_max_age * 60)
+    if args.bhavcopy_dir:
+        source = BhavcopySource(args.bhavcopy_dir)
+        logging.info("Ingested %d new bulk files", source.ingest())
+        set_source(source)
+    if args.calibration.exists():
+        try:
+            set_calibration(load_calibration(args.calibration))
+        except (KeyError, TypeError, ValueError) as exc:
+            parser.error(f"invalid calibration file {args.calibration}: {exc}")
+        logging.info("Loaded prediction calibration from %s", args.calibration)
+    screens = list(args.screens or [])
+    if args.screen_file:
+        screens.extend(load_screens(args.screen_file))
+    try:
+        extra_strats = [compile_screen(text) for text in screens]
+    except ScreenError as exc:
+        parser.error(str(exc))
+    if args.strategies:
+        extra_strats.extend(load_strategy(p) for p in args.strategies)
+    extra_strats = extra_strats or None
     if args.schedule_pred:
         schedule_scan_with_prediction(
             freq_minutes=args.freq,
@@ -285,6 +635,9 @@ def main() -> None:
             bt_period=args.bt_period,
             bt_interval=args.bt_interval,
             extra_strategies=extra_strats,
+            batch_size=args.batch_size,
+            base_interval=args.base_interval,
+            stream=args.stream,
         )
     elif args.schedule:
         schedule_scan(
@@ -304,6 +657,9 @@ def main() -> None:
             bt_period=args.bt_period,
             bt_interval=args.bt_interval,
             extra_strategies=extra_strats,
+            batch_size=args.batch_size,
+            base_interval=args.base_interval,
+            stream=args.stream,
         )
     else:
         run(
@@ -322,6 +678,9 @@ def main() -> None:
             bt_period=args.bt_period,
             bt_interval=args.bt_interval,
             extra_strategies=extra_strats,
+            batch_size=args.batch_size,
+            base_interval=args.base_interval,
+            stream=args.stream,
         )
 
 
@@ -3,10 +3,10 @@ from setuptools import setup, find_packages
 setup(
     name="nse_fno_scanner",
     version="0.1.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks"]),
     install_requires=[
         "yfinance",
-        "pandas",
+        "pandas>=2.0",
         "numpy",
         "tqdm",
         "gdown",
@@ -15,5 +15,5 @@ setup(
     entry_points={
         "console_scripts": ["nse-fno-scan=run_scan:main"],
     },
-    python_requires=">=3.8",
+    python_requires=">=3.10",
 )
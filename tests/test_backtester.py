@@ -19,3 +19,70 @@ def test_backtest_strategy(monkeypatch):
         trades, win_rate, avg_ret = backtest_strategy("TEST", mode=mode)
         assert trades >= 0
         assert 0.0 <= win_rate <= 1.0
+
+
+def test_daily_signals_match_row_loop():
+    import numpy as np
+    from nse_fno_scanner.backtester import _daily_signals
+    from nse_fno_scanner.dma_filter import compute_dmas
+
+    rng = np.random.default_rng(1)
+    close = 100 + rng.normal(size=300).cumsum()
+    df = pd.DataFrame(
+        {"Open": close + rng.normal(size=300), "Close": close},
+        index=pd.date_range("2020-01-01", periods=300),
+    )
+    expected = []
+    ref = compute_dmas(df, fast=10, slow=30)
+    for i in range(len(ref) - 1):
+        row = ref.iloc[i]
+        if i < 29 or row["DMA10"] <= row["DMA30"]:
+            continue
+        entry, exit_price = ref.iloc[i + 1]["Open"], ref.iloc[i + 1]["Close"]
+        expected.append((ref.index[i + 1], entry, exit_price, (exit_price - entry) / entry))
+
+    dates, entries, exits, returns = _daily_signals(df, fast=10, slow=30)
+    assert list(zip(dates, entries, exits, returns)) == expected
+
+
+def test_intraday_signals_match_groupby_loop():
+    import numpy as np
+    from nse_fno_scanner.backtester import _intraday_signals
+    from nse_fno_scanner.intraday_scanner import compute_emas, pattern_confirmed
+
+    rng = np.random.default_rng(2)
+    sessions = [
+        pd.date_range(day + pd.Timedelta("9h15min"), periods=int(rng.integers(3, 30)), freq="15min")
+        for day in pd.bdate_range("2024-01-01", periods=40)
+    ]
+    index = sessions[0].append(sessions[1:]).tz_localize("Asia/Kolkata")
+    close = 100 + rng.normal(0.3, 1, size=len(index)).cumsum()
+    df = pd.DataFrame({"Open": close + rng.normal(size=len(index)), "Close": close}, index=index)
+
+    expected = []
+    for day, day_df in df.groupby(df.index.date):
+        day_df = day_df[day_df.index.hour >= 10]
+        if len(day_df) < 10:
+            continue
+        day_df = compute_emas(day_df, fast=5, slow=10)
+        if day_df.iloc[-1]["EMA5"] >= day_df.iloc[-1]["EMA10"] and pattern_confirmed(day_df):
+            entry, exit_price = day_df["Open"].iloc[0], day_df["Close"].iloc[-1]
+            expected.append((pd.Timestamp(day), entry, exit_price))
+
+    dates, entries, exits, _ = _intraday_signals(df, start_hour=10, fast=5, slow=10)
+    assert expected
+    assert list(dates) == [e[0] for e in expected]
+    np.testing.assert_allclose(entries, [e[1] for e in expected])
+    np.testing.assert_allclose(exits, [e[2] for e in expected])
+
+
+def test_session_ema_matches_pandas():
+    import numpy as np
+    from nse_fno_scanner.indicators import session_ema
+
+    values = np.random.default_rng(3).normal(size=900).cumsum() + 100
+    starts = np.array([0, 375, 750])
+    out = session_ema(values, starts, 3)
+    for lo, hi in [(0, 375), (375, 750), (750, 900)]:
+        ref = pd.Series(values[lo:hi]).ewm(span=3, adjust=False).mean().to_numpy()
+        np.testing.assert_allclose(out[lo:hi], ref, rtol=1e-10)
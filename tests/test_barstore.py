@@ -0,0 +1,64 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.backtester import backtest_strategy
+from nse_fno_scanner.barstore import BarStore
+from nse_fno_scanner.simulator import simulate_market
+
+
+def _intraday(days, seed=0):
+    sessions = pd.bdate_range("2023-01-02", periods=days)
+    offsets = pd.Timedelta(hours=9, minutes=15) + pd.to_timedelta(np.arange(25) * 15, unit="min")
+    index = pd.DatetimeIndex([d + o for d in sessions for o in offsets]).tz_localize("Asia/Kolkata")
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0.3, 1, len(index)))
+    return pd.DataFrame(
+        {"Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0},
+        index=index,
+    )
+
+
+def test_write_append_and_read(tmp_path):
+    store = BarStore(tmp_path)
+    df = _intraday(10)
+    store.write("AAA", "15m", df.iloc[:100])
+    assert store.append("AAA", "15m", df.iloc[90:]) == len(df) - 100
+    assert store.symbols("15m") == ["AAA"]
+
+    out = store.read("AAA", "15m")
+    pd.testing.assert_frame_equal(out, df.set_axis(df.index.as_unit("ns")), check_freq=False)
+    series = store.open("AAA", "15m")
+    frame = series.between("2023-01-05").to_frame()
+    assert np.shares_memory(frame["Close"].to_numpy(), series.columns["Close"])
+
+    last2 = store.read("AAA", "15m", period="2d")
+    assert len(last2) == 50 and last2.index[0] == df.index[-50]
+    ranged = store.read("AAA", "15m", start="2023-01-03", end="2023-01-04")
+    assert len(ranged) == 25
+    assert store.read("MISSING", "15m").empty
+
+
+def test_backtest_and_simulate_from_store(monkeypatch, tmp_path):
+    df = _intraday(30)
+    store = BarStore(tmp_path)
+    store.write("AAA", "15m", df)
+
+    def fake_download(*args, **kwargs):
+        return df
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    expected = backtest_strategy("AAA", period="1y", interval="15m", fast=5, slow=10)
+    assert expected[0] > 0
+
+    def no_download(*args, **kwargs):
+        raise AssertionError("store should be used")
+
+    monkeypatch.setattr(yf, "download", no_download)
+    assert backtest_strategy("AAA", period="1y", interval="15m", fast=5, slow=10, store=store) == expected
+    shortlisted, trades = simulate_market(["AAA"], period="1y", fast=5, slow=10, store=store)
+    assert shortlisted == ["AAA"] and len(trades) == expected[0]
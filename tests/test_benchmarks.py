@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.replay import Recorder, Replayer
+from benchmarks.suite import compare, run_suite
+from benchmarks.synthetic import SyntheticMarket
+
+
+def test_synthetic_market_is_deterministic():
+    market = SyntheticMarket(seed=1)
+    wide = market.download("AAA.NS", period="6mo", interval="1d")
+    narrow = SyntheticMarket(seed=1).download("AAA.NS", period="1mo", interval="1d")
+    assert narrow.equals(wide.loc[narrow.index])
+    assert wide.index.dayofweek.max() < 5
+
+    bars = market.download(["AAA.NS", "BBB.NS"], period="2d", interval="15m")
+    assert bars["Close"].shape == (2 * 25, 2)
+    assert bars.index[0].strftime("%H:%M") == "09:15"
+
+
+def test_record_replay_roundtrip(tmp_path):
+    market = SyntheticMarket()
+    recorder = Recorder(market.download, tmp_path)
+    recorded = recorder(["AAA.NS", "BBB.NS"], period="5d", interval="1d")
+    replayed = Replayer(tmp_path)(["AAA.NS", "BBB.NS"], period="5d", interval="1d")
+    assert replayed.equals(recorded)
+
+
+def test_run_suite_report_and_compare():
+    report = run_suite(["filter_by_dma", "intraday_scan"], [5], repeat=1)
+    assert [(r["name"], r["symbols"]) for r in report["results"]] == [
+        ("filter_by_dma", 5),
+        ("intraday_scan", 5),
+    ]
+    slower = {"results": [dict(r, best=r["best"] * 2) for r in report["results"]]}
+    assert compare(report, report) == []
+    assert [r["name"] for r in compare(slower, report)] == ["filter_by_dma", "intraday_scan"]
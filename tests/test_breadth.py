@@ -0,0 +1,60 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.breadth import compute_breadth, market_breadth
+
+
+def test_compute_breadth_counts():
+    dates = pd.bdate_range("2024-01-01", periods=4)
+    close = pd.DataFrame(
+        {"A": [10.0, 11, 12, 11], "B": [20.0, 19, 19, np.nan], "C": [np.nan, 5, 6, 7]},
+        index=dates,
+    )
+    nifty = pd.Series([100.0, 101, 102, 101], index=dates)
+    out = compute_breadth(close, {"nifty": nifty}, dma_periods=(2,), fast=2, slow=3, offset=0)
+    assert out["symbols"].tolist() == [2, 3, 3, 2]
+    assert out["advances"].tolist() == [0, 1, 2, 1]
+    assert out["declines"].tolist() == [0, 1, 0, 1]
+    assert out["ad_line"].tolist() == [0, 0, 2, 2]
+    # A closes above its 2-day average on the 2nd and 3rd days, C on the 3rd and 4th.
+    assert out["above_dma2"].tolist()[1:] == [0.5, 2 / 3, 0.5]
+    assert out["trending"].tolist() == [0, 0, 1, 2]
+    np.testing.assert_allclose(out["avg_return"].iloc[2], np.mean([12 / 11 - 1, 0.0, 6 / 5 - 1]))
+    np.testing.assert_allclose(out["nifty_excess"].iloc[3], np.mean([11 / 12 - 1, 7 / 6 - 1]) - (101 / 102 - 1))
+
+
+def test_market_breadth_aligns_indices_and_uses_session():
+    dates = pd.bdate_range("2024-01-01", periods=60)
+    stock_index = (dates + pd.Timedelta(hours=9, minutes=15)).tz_localize("Asia/Kolkata")
+    frames = {
+        "UP": pd.DataFrame({"Close": np.arange(1.0, 61.0)}, index=stock_index),
+        "DOWN": pd.DataFrame({"Close": np.arange(60.0, 0.0, -1)}, index=stock_index),
+        "^NSEI": pd.DataFrame({"Close": np.full(60, 100.0)}, index=dates),
+    }
+    calls = []
+
+    class Session:
+        def get_many(self, symbols, *, period, interval, desc=None):
+            calls.append((list(symbols), period, interval))
+            return {s: frames[s] for s in symbols if s in frames}
+
+    out = market_breadth(["UP", "DOWN"], session=Session(), indices={"nifty": "^NSEI"})
+    assert calls == [(["UP", "DOWN", "^NSEI"], "250d", "1d")]
+    assert list(out.index) == list(dates)
+    last = out.iloc[-1]
+    assert (last["advances"], last["declines"], last["trending"]) == (1, 1, 1)
+    assert last["above_dma50"] == 0.5
+    assert last["nifty"] == 0.0
+
+
+def test_trending_counts_the_daily_filter_with_offset():
+    dates = pd.bdate_range("2024-01-01", periods=6)
+    close = pd.DataFrame({"A": [5.0, 4, 3, 2, 10, 20], "B": [1.0, 2, 3, 4, 5, 6]}, index=dates)
+    out = compute_breadth(close, dma_periods=(), fast=2, slow=3, offset=1)
+    # With offset 1 each row reads the DMAs of the row before, so A's jump
+    # on the 5th day only counts on the 6th.
+    assert out["trending"].tolist() == [0, 0, 0, 1, 1, 2]
@@ -0,0 +1,65 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.cache import OHLCCache
+
+
+def _bars(start, periods):
+    dates = pd.date_range(start, periods=periods, freq="D")
+    return pd.DataFrame({"Open": range(periods), "Close": range(periods)}, index=dates, dtype=float)
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = OHLCCache(tmp_path)
+    df = _bars("2024-01-01", 5)
+    cache.store("TEST", "1d", df)
+    loaded, _ = cache.load("TEST", "1d")
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+
+
+def test_cache_keeps_column_dtypes(tmp_path):
+    cache = OHLCCache(tmp_path)
+    df = _bars("2024-01-01", 3).assign(Volume=[10, 20, 30], Partial=pd.array([1, None, 3], dtype="Int64"))
+    cache.store("TEST", "1d", df)
+    loaded, _ = cache.load("TEST", "1d")
+    assert loaded.dtypes.astype(str).tolist() == ["float64", "float64", "int64", "float64"]
+    assert loaded["Volume"].tolist() == [10, 20, 30]
+    assert loaded["Partial"].isna().tolist() == [False, True, False]
+
+
+def test_cache_fetches_only_new_bars(tmp_path):
+    today = pd.Timestamp.now().normalize()
+    history = _bars(today - pd.Timedelta(days=40), 40)
+    calls = []
+
+    def fetch(symbol, *, interval, period=None, start=None):
+        calls.append({"period": period, "start": start})
+        if start is None:
+            return history
+        return _bars(start, 2)
+
+    cache = OHLCCache(tmp_path)
+    cache.get("TEST", period="30d", interval="1d", fetch=fetch)
+    assert calls == [{"period": "30d", "start": None}]
+
+    second = cache.get("TEST", period="30d", interval="1d", fetch=fetch)
+    assert calls[1]["start"] == history.index[-1].strftime("%Y-%m-%d")
+    assert second.index[-1] == history.index[-1] + pd.Timedelta(days=1)
+    assert not second.index.duplicated().any()
+
+
+def test_cache_max_age_skips_network(tmp_path):
+    today = pd.Timestamp.now().normalize()
+    calls = []
+
+    def fetch(symbol, **kwargs):
+        calls.append(kwargs)
+        return _bars(today - pd.Timedelta(days=9), 10)
+
+    cache = OHLCCache(tmp_path, max_age=3600)
+    cache.get("TEST", period="5d", interval="1d", fetch=fetch)
+    cache.get("TEST", period="5d", interval="1d", fetch=fetch)
+    assert len(calls) == 1
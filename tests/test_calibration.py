@@ -0,0 +1,102 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import calibration
+from nse_fno_scanner.calibration import (
+    calibrate,
+    fit_logistic,
+    load_calibration,
+    save_calibration,
+    shortlist_counts,
+)
+from nse_fno_scanner.dma_filter import shortlist_by_dma
+from nse_fno_scanner.market_predictor import predict_index_movement
+
+
+def test_fit_logistic_recovers_parameters_for_each_column():
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 60, 20_000).astype(float)
+    p = 1 / (1 + np.exp(-(x - 25) / 8))
+    y = np.column_stack([rng.random(len(x)) < p, rng.random(len(x)) < 1 - p]).astype(float)
+    threshold, scale = fit_logistic(x, y)
+    np.testing.assert_allclose(threshold, [25, 25], atol=1.0)
+    np.testing.assert_allclose(scale, [8, -8], rtol=0.1)
+
+
+def test_shortlist_counts_match_daily_filter():
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range("2023-01-02", periods=120)
+    close = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (120, 6)), axis=0)),
+        index=dates,
+        columns=[f"S{i}" for i in range(6)],
+    )
+    counts = shortlist_counts(close, 1, fast_period=5, slow_period=20)
+    for day in (10, 21, 60, 119):
+        frames = {s: close[[s]].iloc[: day + 1].set_axis(["Close"], axis=1) for s in close}
+        assert counts.iloc[day] == len(shortlist_by_dma(frames, 1, fast_period=5, slow_period=20))
+
+
+def test_calibrate_save_load_and_predict(tmp_path):
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range("2022-01-03", periods=400)
+    index = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    frames = {"^NSEI": pd.DataFrame({"Close": index}, index=dates)}
+    for i in range(30):
+        frames[f"S{i}"] = pd.DataFrame(
+            {"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))}, index=dates
+        )
+
+    class Session:
+        def get_many(self, symbols, *, period, interval, desc=None):
+            assert (period, interval) == ("5y", "1d")
+            return {s: frames[s] for s in symbols if s in frames}
+
+    symbols = [f"S{i}" for i in range(30)]
+    fitted = calibrate(symbols, session=Session(), indices={"nifty": "^NSEI"})
+    assert list(fitted) == ["nifty"]
+    # Warm-up needs slow + offset bars and the last day has no next-day return.
+    assert fitted["nifty"].samples == 400 - 50 - 1
+    assert np.isfinite(fitted["nifty"].log_loss)
+
+    path = tmp_path / "calibration.json"
+    save_calibration(path, {"nifty": calibration.Calibration(threshold=30.0, scale=2.0)})
+    assert load_calibration(path).threshold == 30.0
+    calibration.set_calibration(load_calibration(path))
+    try:
+        assert predict_index_movement(30) == 0.5
+        assert predict_index_movement(30, threshold=10, scale=5) > 0.98
+    finally:
+        calibration.set_calibration(None)
+    assert predict_index_movement(10) == 0.5
+
+
+def test_unusable_fit_is_not_kept_or_saved(tmp_path):
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2022-01-03", periods=200)
+    # The index rises every day, so the counts cannot separate the outcomes.
+    frames = {"^NSEI": pd.DataFrame({"Close": np.arange(1.0, 201.0)}, index=dates)}
+    for i in range(10):
+        frames[f"S{i}"] = pd.DataFrame(
+            {"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))}, index=dates
+        )
+
+    class Session:
+        def get_many(self, symbols, *, period, interval, desc=None):
+            return {s: frames[s] for s in symbols if s in frames}
+
+    symbols = [f"S{i}" for i in range(10)]
+    assert calibrate(symbols, session=Session(), indices={"nifty": "^NSEI"}) == {}
+
+    path = tmp_path / "calibration.json"
+    with pytest.raises(ValueError):
+        save_calibration(path, {"nifty": calibration.Calibration(threshold=float("inf"))})
+    assert not path.exists()
+    path.write_text('{"nifty": {"threshold": NaN, "scale": 5.0}}')
+    with pytest.raises(ValueError):
+        load_calibration(path)
@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.executor import FetchExecutor, RateLimiter
+
+
+def test_executor_retries_until_success():
+    calls = {}
+
+    def flaky(item):
+        calls[item] = calls.get(item, 0) + 1
+        if calls[item] < 2:
+            raise RuntimeError("flaky")
+        return item * 2
+
+    executor = FetchExecutor(4, rate=0, backoff=0.01)
+    report = executor.map(flaky, [1, 2, 3])
+    assert report.values == {1: 2, 2: 4, 3: 6}
+    assert all(o.attempts == 2 for o in report.outcomes.values())
+
+
+def test_executor_reports_failures_and_timeouts():
+    def work(item):
+        if item == "slow":
+            time.sleep(0.5)
+        if item == "bad":
+            raise ValueError("bad")
+        return item
+
+    executor = FetchExecutor(4, rate=0, timeout=0.1, retries=2, backoff=0.01)
+    report = executor.map(work, ["ok", "bad", "slow"])
+    assert report.succeeded == ["ok"]
+    assert isinstance(report.failed["bad"], ValueError)
+    assert isinstance(report.failed["slow"], TimeoutError)
+
+
+def test_workers_limit_concurrent_maps():
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def work(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return item
+
+    executor = FetchExecutor(2, rate=0)
+    reports = []
+    threads = [
+        threading.Thread(target=lambda n=n: reports.append(executor.map(work, range(n, n + 6))))
+        for n in (0, 10, 20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(len(r.succeeded) for r in reports) == 18
+    assert peak[0] == 2
+
+
+def test_timed_out_attempt_is_retried_on_a_fresh_thread():
+    release = threading.Event()
+    calls = []
+
+    def work(item):
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            release.wait(5)  # hangs past the timeout
+            return "stale"
+        return "fresh"
+
+    executor = FetchExecutor(1, rate=0, timeout=0.1, retries=2, backoff=0.01)
+    started = time.monotonic()
+    report = executor.map(work, ["x"])
+    release.set()
+    assert report.values == {"x": "fresh"}
+    assert report.outcomes["x"].attempts == 2
+    assert time.monotonic() - started < 2
+    assert calls[0] is not calls[1]
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+
 from nse_fno_scanner import (
     fetch_fno_list,
     filter_by_dma,
@@ -21,3 +25,16 @@ def test_root_exports_callable():
     assert callable(schedule_scan_with_prediction)
     assert callable(load_strategy)
     assert callable(printf)
+
+
+def test_package_import_is_lazy():
+    code = (
+        "import sys\n"
+        "from nse_fno_scanner import printf\n"
+        "heavy = ['pandas', 'yfinance', 'matplotlib', 'telegram', 'gdown', 'run_scan']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == ""
@@ -0,0 +1,48 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.dma_filter import compute_dmas
+from nse_fno_scanner.indicators import dma_signal, ema, intraday_signal, price_panel, rising
+from nse_fno_scanner.intraday_scanner import compute_emas, pattern_confirmed
+
+
+def _frames():
+    rng = np.random.default_rng(0)
+    frames = {}
+    for i, n in enumerate([80, 60, 52, 30]):
+        close = 100 + rng.normal(size=n).cumsum()
+        frames[f"S{i}"] = pd.DataFrame({"Close": close}, index=pd.date_range("2024-01-01", periods=n))
+    return frames
+
+
+def test_dma_signal_matches_per_symbol_filter():
+    frames = _frames()
+    signal = dma_signal(price_panel(frames, align="bars"), offset=1)
+    for sym, df in frames.items():
+        expected = False
+        if len(df) >= 51:
+            row = compute_dmas(df).iloc[-2]
+            expected = row["DMA20"] > row["DMA50"]
+        assert signal[sym] == expected
+
+
+def test_intraday_signal_matches_per_symbol_scan():
+    frames = _frames()
+    frames["UP"] = pd.DataFrame({"Close": np.arange(1.0, 40.0)})
+    close = price_panel(frames, align="bars")
+    signal = intraday_signal(close)
+    for sym, df in frames.items():
+        last = compute_emas(df).iloc[-1]
+        expected = last["EMA20"] >= last["EMA50"] and pattern_confirmed(df)
+        assert signal[sym] == expected
+    ema20 = compute_emas(frames["S3"])["EMA20"].to_numpy()
+    np.testing.assert_allclose(ema(close, 20)["S3"].dropna().to_numpy(), ema20)
+
+
+def test_rising():
+    panel = pd.DataFrame({"A": [1, 2, 3, 4], "B": [1, 3, 2, 4]})
+    assert rising(panel, 3).iloc[-1].tolist() == [True, False]
@@ -26,8 +26,11 @@ def test_compare_with_indices(monkeypatch):
         "TEST.NS": pd.DataFrame({"Close": [50, 55]}),
     }
 
-    def fake_download(symbol, *args, **kwargs):
-        return data_map.get(symbol, data_map["TEST.NS"])
+    def fake_download(tickers, *args, **kwargs):
+        if isinstance(tickers, str):
+            return data_map.get(tickers, data_map["TEST.NS"])
+        frames = {t: data_map.get(t, data_map["TEST.NS"]) for t in tickers}
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
 
     monkeypatch.setattr(yf, "download", fake_download)
     res = compare_with_indices(["TEST"])
@@ -37,20 +40,38 @@ def test_compare_with_indices(monkeypatch):
 
 
 def test_send_telegram_message(monkeypatch):
-    sent = {}
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from nse_fno_scanner import notifier
 
-    class FakeBot:
-        def __init__(self, token):
-            sent["token"] = token
+    sent = []
 
-        def send_message(self, chat_id, text):
-            sent["chat_id"] = chat_id
-            sent["text"] = text
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
 
-    monkeypatch.setattr("nse_fno_scanner.market_predictor.Bot", FakeBot)
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            sent.append((self.path, json.loads(body)))
+            reply = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(notifier, "_notifier", None)
     monkeypatch.setenv("TELEGRAM_TOKEN", "tkn")
     monkeypatch.setenv("TELEGRAM_CHAT_ID", "cid")
-    send_telegram_message("hello")
-    assert sent["token"] == "tkn"
-    assert sent["chat_id"] == "cid"
-    assert sent["text"] == "hello"
+    monkeypatch.setenv("TELEGRAM_API_URL", f"http://127.0.0.1:{server.server_port}")
+    try:
+        send_telegram_message("hello")
+        assert notifier.get_notifier().flush(timeout=5)
+    finally:
+        notifier.set_notifier(None)
+        server.shutdown()
+    assert sent == [("/bottkn/sendMessage", {"chat_id": "cid", "text": "hello"})]
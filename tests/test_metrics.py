@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import metrics
+from nse_fno_scanner.metrics import Metrics, NullMetrics
+import run_scan
+
+
+def test_metrics_prometheus_text():
+    m = Metrics()
+    with m.stage("daily_filter"):
+        pass
+    m.inc("fetch_retries_total", 2)
+    m.inc("cache_hits_total", 3, interval="1d")
+    m.record_download("A", "1d", 0.5, 100)
+    text = m.prometheus()
+    assert "# TYPE nse_fno_fetch_retries_total counter" in text
+    assert 'nse_fno_cache_hits_total{interval="1d"} 3.0' in text
+    assert 'nse_fno_stage_seconds_count{stage="daily_filter"} 1.0' in text
+    assert 'nse_fno_download_bytes_sum{interval="1d"} 100.0' in text
+    assert m.snapshot()["symbols"]["A"] == {"downloads": 1, "seconds": 0.5, "bytes": 100}
+
+
+def test_null_metrics_is_default():
+    assert isinstance(metrics.get_metrics(), NullMetrics)
+    with metrics.get_metrics().stage("x"):
+        metrics.get_metrics().inc("y")
+
+
+def test_run_exports_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(run_scan, "filter_by_dma", lambda syms, **kw: syms[:2])
+    monkeypatch.setattr(run_scan, "intraday_scan", lambda syms, **kw: syms[:1])
+    recorder = Metrics(tmp_path / "m.json", tmp_path / "m.prom")
+    monkeypatch.setattr(metrics, "_metrics", recorder)
+
+    run_scan.run(tmp_path / "out.txt", symbols=["A", "B", "C"])
+    data = json.loads((tmp_path / "m.json").read_text())
+    counts = {(c["name"], c["labels"].get("filter")): c["value"] for c in data["counters"]}
+    assert counts[("filter_symbols_in_total", "dma")] == 3
+    assert counts[("filter_symbols_out_total", "intraday")] == 1
+    stages = {s["labels"].get("stage") for s in data["summaries"]}
+    assert {"daily_filter", "intraday_scan"} <= stages
+    assert "nse_fno_run_seconds_count 1.0" in (tmp_path / "m.prom").read_text()
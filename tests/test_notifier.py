@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.notifier import Notifier, RateLimited, TransportError
+
+
+class FakeTransport:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+        self.release = threading.Event()
+        self.release.set()
+        self.closed = False
+
+    def send(self, chat_id, text):
+        self.release.wait(5)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text))
+
+    def close(self):
+        self.closed = True
+
+
+def test_messages_queued_during_a_send_are_coalesced():
+    transport = FakeTransport()
+    transport.release.clear()
+    notifier = Notifier(transport, "cid", min_interval=0)
+    started = time.perf_counter()
+    notifier.send("first")
+    time.sleep(0.05)  # the worker is now blocked sending "first"
+    for i in range(3):
+        notifier.send(f"tick {i}")
+    assert time.perf_counter() - started < 1.0
+    transport.release.set()
+    assert notifier.close(timeout=5)
+    assert transport.sent == [("cid", "first"), ("cid", "tick 0\n\ntick 1\n\ntick 2")]
+    assert transport.closed
+
+
+def test_rate_limits_are_waited_out_and_failures_retried():
+    transport = FakeTransport([RateLimited(0.05), TransportError("boom")])
+    notifier = Notifier(transport, "cid", min_interval=0, retries=2, backoff=0.01, max_length=10)
+    notifier.send("x" * 15)
+    assert notifier.flush(timeout=5)
+    assert transport.sent == [("cid", "x" * 10), ("cid", "x" * 5)]
+    assert notifier.dropped == 0
+
+    transport.failures = [TransportError("boom")] * 2
+    notifier.send("lost")
+    assert notifier.close(timeout=5)
+    assert notifier.dropped == 1
@@ -20,3 +20,27 @@ def test_fetch_ohlc(monkeypatch):
     monkeypatch.setattr(yf, "download", fake_download)
     df = fetch_ohlc("TEST", days=30, interval="15m")
     assert df.equals(data)
+
+
+def test_download_many_splits_batches(monkeypatch):
+    from nse_fno_scanner.ohlc import download_many
+
+    dates = pd.date_range("2024-01-01", periods=3)
+    calls = []
+
+    def fake_download(tickers, *args, **kwargs):
+        calls.append(tickers)
+        if isinstance(tickers, str):
+            return pd.DataFrame({"Close": [1.0, 2.0, 3.0]}, index=dates)
+        cols = pd.MultiIndex.from_product([["Open", "Close"], tickers])
+        df = pd.DataFrame(1.0, index=dates, columns=cols)
+        df.loc[dates[0], ("Close", tickers[0])] = float("nan")
+        df.loc[dates[0], ("Open", tickers[0])] = float("nan")
+        return df
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    frames = download_many(["A", "B", "C"], period="5d", interval="1d", batch_size=2)
+    assert sorted(calls, key=str) == ["C.NS", ["A.NS", "B.NS"]]
+    assert sorted(frames) == ["A", "B", "C"]
+    assert list(frames["B"].columns) == ["Open", "Close"]
+    assert len(frames["A"]) == 2 and len(frames["B"]) == 3
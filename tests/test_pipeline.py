@@ -0,0 +1,87 @@
+import os
+import sys
+import threading
+import time
+import pandas as pd
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import executor
+from nse_fno_scanner.pipeline import batched, concurrent_stage, strategy_stage, stream_scan
+from nse_fno_scanner.session import MarketDataSession
+from nse_fno_scanner.strategy_loader import vectorized
+
+
+def test_batched():
+    assert list(batched(["A", "B", "C"], 2)) == [["A", "B"], ["C"]]
+
+
+def test_stream_scan_matches_staged_scan(monkeypatch):
+    dates = pd.date_range("2024-01-01", periods=60)
+    rising = pd.DataFrame({"Open": range(1, 61), "Close": range(1, 61)}, index=dates, dtype=float)
+    falling = rising.iloc[::-1].set_axis(dates)
+
+    def fake_download(tickers, *args, **kwargs):
+        if isinstance(tickers, str):
+            return falling if tickers.startswith("DOWN") else rising
+        frames = {t: falling if t.startswith("DOWN") else rising for t in tickers}
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    symbols = ["UP1", "DOWN1", "UP2", "DOWN2", "UP3"]
+    out = list(stream_scan(symbols, batch_size=2))
+    assert sorted(out) == ["UP1", "UP2", "UP3"]
+
+    strat = lambda syms: [s for s in syms if s != "UP2"]
+    out = list(stream_scan(symbols, batch_size=2, extra_strategies=[strat]))
+    assert sorted(out) == ["UP1", "UP3"]
+
+    session = MarketDataSession()
+    assert sorted(stream_scan(symbols, batch_size=2, session=session)) == ["UP1", "UP2", "UP3"]
+    monkeypatch.setattr(yf, "download", lambda *args, **kwargs: 1 / 0)
+    # The stages fetched through the session, so later consumers download nothing.
+    assert len(session.get_many(symbols, period="250d", interval="1d")) == 5
+    assert len(session.get_many(["UP1", "UP2", "UP3"], period="2d", interval="15m")) == 3
+
+
+def test_concurrent_stage_stops_quietly_when_the_consumer_does(monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    fed = threading.Event()
+
+    def batches():
+        for i in range(20):
+            yield [str(i)]
+        fed.set()
+
+    def evaluate(batch):
+        time.sleep(0.01)
+        return batch
+
+    stage = concurrent_stage(batches(), evaluate, workers=1)
+    assert len(next(stage)) == 1
+    fed.wait(1)
+    stage.close()  # cancels the batches still queued
+    time.sleep(0.1)
+    assert errors == []
+
+
+def test_strategy_stage_loads_vectorized_bars_through_the_session():
+    dates = pd.date_range("2024-01-01", periods=5)
+    frames = {s: pd.DataFrame({"Close": [1.0, 2, 3, 4, 5 if s != "B" else 0]}, index=dates) for s in "ABC"}
+    calls = []
+
+    class Session:
+        def get_many(self, symbols, *, period, interval, desc=None):
+            calls.append(list(symbols))
+            return {s: frames[s] for s in symbols}
+
+    @vectorized(lookback="5d")
+    def up(panel):
+        return panel["Close"].iloc[-1] > panel["Close"].iloc[-2]
+
+    out = list(strategy_stage(iter([["A", "B"], ["C"]]), [up], session=Session()))
+    assert out == [["A"], ["C"]]
+    assert calls == [["A", "B"], ["C"]]
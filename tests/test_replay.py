@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import sources
+from nse_fno_scanner.ohlc import download_many
+from nse_fno_scanner.replay import ReplaySource, replay
+
+DAYS = ["2024-06-26", "2024-06-27", "2024-06-28"]
+
+
+def _bars(direction):
+    index = pd.DatetimeIndex(
+        [
+            ts
+            for day in DAYS
+            for ts in pd.date_range(f"{day} 09:15", f"{day} 15:15", freq="15min", tz="Asia/Kolkata")
+        ]
+    )
+    close = 100 + direction * np.arange(len(index), dtype=float)
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1.0},
+        index=index,
+    )
+
+
+def _daily(direction):
+    index = pd.bdate_range(end="2024-06-28", periods=80, tz="Asia/Kolkata")
+    close = 100 + direction * np.arange(80, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0}, index=index)
+
+
+def test_source_serves_bars_up_to_the_clock():
+    source = ReplaySource({"UP": _bars(1)}, daily={"UP": _daily(1)})
+    source.clock = pd.Timestamp("2024-06-27 10:00", tz="Asia/Kolkata")
+    intraday = source.get("UP", period="2d", interval="15m")
+    assert intraday.index[0] == pd.Timestamp("2024-06-26 09:15", tz="Asia/Kolkata")
+    assert intraday.index[-1] == source.clock
+    hourly = source.get("UP", period="1d", interval="1h")
+    assert hourly.index[-1] == pd.Timestamp("2024-06-27 09:15", tz="Asia/Kolkata")
+
+    daily = source.get("UP", period="1mo", interval="1d")
+    assert daily.index[-1] == pd.Timestamp("2024-06-27", tz="Asia/Kolkata")
+    assert daily["Close"].iloc[-1] == intraday["Close"].iloc[-1]
+    assert daily.index[0] >= pd.Timestamp("2024-05-27", tz="Asia/Kolkata")
+    assert "DOWN" not in source.get_many(["UP", "DOWN"], period="2d", interval="15m")
+
+
+def test_replay_records_shortlists_without_lookahead():
+    bars = {"UP": _bars(1), "DOWN": _bars(-1)}
+    daily = {"UP": _daily(1), "DOWN": _daily(-1)}
+    previous = sources._source
+    table = replay(bars, daily=daily, start="2024-06-28")
+    assert sources._source is previous
+    assert len(table) == 25
+    assert table.index[0] == pd.Timestamp("2024-06-28 09:15", tz="Asia/Kolkata")
+    assert all(s == ["UP"] for s in table["shortlist"])
+    assert not table["late"].any()
+
+    seen = []
+
+    def scan(symbols):
+        frames = download_many(symbols, period="2d", interval="15m")
+        seen.append(max(df.index[-1] for df in frames.values()))
+        return [s for s, df in frames.items() if df["Close"].iloc[-1] > df["Close"].iloc[0]]
+
+    table = replay(bars, daily=daily, start="2024-06-28 14:00", scan=scan)
+    assert seen == list(table.index)
+    assert table["count"].tolist() == [1] * 6
+
+
+def test_replay_paces_at_speed():
+    bars = {"UP": _bars(1)}
+    began = time.perf_counter()
+    table = replay(bars, start="2024-06-28 14:45", speed=18_000, scan=lambda syms: syms)
+    assert len(table) == 3
+    assert time.perf_counter() - began >= 3 * 900 / 18_000
@@ -0,0 +1,80 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import executor
+from nse_fno_scanner.resample import can_resample, resample_ohlcv
+from nse_fno_scanner.session import MarketDataSession
+
+
+def _five_minute_bars(days):
+    index = pd.DatetimeIndex(
+        [
+            ts
+            for day in days
+            for ts in pd.date_range(f"{day} 09:15", f"{day} 15:25", freq="5min", tz="Asia/Kolkata")
+        ]
+    )
+    close = np.arange(1.0, len(index) + 1)
+    return pd.DataFrame(
+        {"Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 10.0},
+        index=index,
+    )
+
+
+def test_resample_aligns_on_session_open():
+    bars = _five_minute_bars(["2024-06-27", "2024-06-28"])
+    per_day = 75
+
+    m15 = resample_ohlcv(bars, "15m")
+    assert len(m15) == 2 * 25
+    assert m15.index[0] == pd.Timestamp("2024-06-27 09:15", tz="Asia/Kolkata")
+    assert m15.iloc[0].tolist() == [0.5, 4.0, 0.0, 3.0, 30.0]
+
+    hourly = resample_ohlcv(bars, "1h")
+    assert [ts.strftime("%H:%M") for ts in hourly.index[:7]] == [
+        "09:15", "10:15", "11:15", "12:15", "13:15", "14:15", "15:15"
+    ]
+    assert hourly["Volume"].iloc[6] == 30.0  # 15:15 to 15:30 holds three bars
+
+    daily = resample_ohlcv(bars, "1d")
+    assert list(daily.index) == list(pd.DatetimeIndex(["2024-06-27", "2024-06-28"], tz="Asia/Kolkata"))
+    assert daily.iloc[1].tolist() == [per_day + 0.5, 2.0 * per_day + 1, per_day, 2.0 * per_day, 750.0]
+
+
+def test_can_resample():
+    assert can_resample("5m", "15m", "5d")
+    assert can_resample("5m", "1d", "30d")
+    assert not can_resample("5m", "1d", "250d")  # beyond Yahoo's 5 minute history
+    assert not can_resample("15m", "5m", "5d")
+    assert not can_resample("30m", "45m", "5d")
+    assert not can_resample("1d", "1wk", "1y")
+
+
+def test_session_downloads_only_the_base_interval(monkeypatch):
+    today = pd.Timestamp.now(tz="Asia/Kolkata").normalize()
+    days = [str(d.date()) for d in pd.bdate_range(end=today.tz_localize(None), periods=3)]
+    bars = _five_minute_bars(days)
+    calls = []
+
+    def fake_download(tickers, *args, **kwargs):
+        calls.append((tickers, kwargs["interval"]))
+        if isinstance(tickers, str):
+            return bars
+        return pd.concat({t: bars for t in tickers}, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    session = MarketDataSession(base_interval="5m")
+
+    m15 = session.get_many(["A", "B"], period="5d", interval="15m")
+    hourly = session.get_many(["A", "B"], period="5d", interval="1h")
+    daily = session.get_many(["A", "B"], period="5d", interval="1d")
+    assert calls == [(["A.NS", "B.NS"], "5m")]
+    assert len(m15["A"]) == 75 and len(hourly["B"]) == 21 and len(daily["A"]) == 3
+    assert session.get_many(["A"], period="2d", interval="15m")["A"].equals(m15["A"].iloc[25:])
+    assert len(calls) == 1
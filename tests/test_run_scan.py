@@ -1,5 +1,6 @@
 import os
 import sys
+import pandas as pd
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -18,16 +19,31 @@ def test_run_with_notify(monkeypatch, tmp_path):
         sent["msg"] = msg
 
     monkeypatch.setattr(run_scan, "send_telegram_message", fake_send)
-    monkeypatch.setattr(run_scan, "predict_index_movement", lambda c: 0.5)
+    predicted = []
+    monkeypatch.setattr(run_scan, "predict_index_movement", lambda c: predicted.append(c) or 0.5)
+    breadth_kwargs = {}
+
+    def fake_breadth(syms, **kw):
+        breadth_kwargs.update(kw)
+        return pd.DataFrame(
+            {"advances": [3], "declines": [1], "above_dma50": [0.75], "trending": [7]}
+        )
+
+    monkeypatch.setattr(run_scan, "market_breadth", fake_breadth)
     monkeypatch.setattr(
         run_scan,
         "compare_with_indices",
-        lambda syms: {"stocks": 0.01, "nifty": 0.02, "banknifty": 0.03},
+        lambda syms, **kw: {"stocks": 0.01, "nifty": 0.02, "banknifty": 0.03},
     )
 
     out = tmp_path / "out.txt"
-    run_scan.run(out, backtest=False, notify=True)
+    run_scan.run(out, backtest=False, notify=True, fast=10, slow=30, offset=2)
     assert "Market up" in sent["msg"]
+    # The prediction reads the daily filter pass count it was calibrated on,
+    # not the final shortlist.
+    assert predicted == [7]
+    assert (breadth_kwargs["fast"], breadth_kwargs["slow"], breadth_kwargs["offset"]) == (10, 30, 2)
+    assert "3 up / 1 down, 75% above 50 DMA" in sent["msg"]
 
 
 def test_run_with_custom_strategy(monkeypatch, tmp_path):
@@ -45,3 +61,40 @@ def test_run_with_custom_strategy(monkeypatch, tmp_path):
     res = run_scan.run(out, extra_strategies=[strat])
     assert res == ["B"]
     assert called["syms"] == ["A", "B"]
+
+
+def test_run_streaming_emits_incrementally(monkeypatch, tmp_path):
+    monkeypatch.setattr(run_scan, "stream_scan", lambda syms, **kw: iter(["B", "A"]))
+
+    seen = []
+    out = tmp_path / "out.txt"
+    res = run_scan.run(out, symbols=["A", "B", "C"], stream=True, on_result=seen.append)
+    assert res == ["B", "A"]
+    assert seen == ["B", "A"]
+    assert out.read_text() == "B\nA"
+
+
+def test_intraday_notify_and_schedule_skip_daily_history(monkeypatch, tmp_path):
+    monkeypatch.setattr(run_scan, "intraday_scan", lambda syms, **kw: ["A"])
+    monkeypatch.setattr(run_scan, "market_breadth", lambda *a, **kw: 1 / 0)
+    monkeypatch.setattr(run_scan, "send_telegram_message", lambda msg: None)
+    monkeypatch.setattr(
+        run_scan,
+        "compare_with_indices",
+        lambda syms, **kw: {"stocks": 0.01, "nifty": 0.02, "banknifty": 0.03},
+    )
+    predicted = []
+    monkeypatch.setattr(run_scan, "predict_index_movement", lambda c: predicted.append(c) or 0.5)
+    run_scan.run(tmp_path / "out.txt", notify=True, symbols=["A", "B"], mode="intraday")
+    assert predicted == [1]
+
+    class Scanner:
+        symbols = ["A", "B"]
+
+        def tick(self):
+            return ["A"]
+
+        def daily_count(self):
+            return None
+
+    assert run_scan._daily_count(["A"], scanner=Scanner()) == (1, None)
@@ -0,0 +1,80 @@
+import os
+import sys
+import pandas as pd
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import executor
+from nse_fno_scanner.dma_filter import filter_by_dma
+from nse_fno_scanner.intraday_scanner import intraday_scan
+from nse_fno_scanner.scanner import EMA, IncrementalScanner, RollingMean
+
+
+def test_streaming_indicators_match_pandas():
+    values = pd.Series([float(v % 7) for v in range(40)])
+    mean, ema = RollingMean(5), EMA(10)
+    for v in values:
+        mean.push(v)
+        ema.push(v)
+    assert abs(mean.value - values.rolling(5).mean().iloc[-1]) < 1e-12
+    assert abs(ema.value - values.ewm(span=10, adjust=False).mean().iloc[-1]) < 1e-12
+
+
+def test_incremental_scanner_fetches_only_new_bars(monkeypatch):
+    dates = pd.date_range("2024-01-01", periods=60)
+    rising = pd.DataFrame({"Open": range(1, 61), "Close": range(1, 61)}, index=dates, dtype=float)
+    falling = rising.iloc[::-1].set_axis(dates)
+    calls = []
+
+    def fake_download(tickers, *args, **kwargs):
+        calls.append(kwargs)
+        names = [tickers] if isinstance(tickers, str) else tickers
+        frames = {t: falling if t.startswith("DOWN") else rising for t in names}
+        if kwargs.get("start"):
+            frames = {t: df[df.index >= kwargs["start"]] for t, df in frames.items()}
+        if isinstance(tickers, str):
+            return frames[tickers]
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    symbols = ["UP1", "DOWN1", "UP2"]
+    expected = intraday_scan(filter_by_dma(symbols))
+
+    scanner = IncrementalScanner(
+        symbols, clock=lambda: pd.Timestamp("2024-03-01 10:00", tz="Asia/Kolkata")
+    )
+    assert scanner.tick() == expected
+    calls.clear()
+    assert scanner.tick() == expected
+    assert calls and all("start" in kw and "period" not in kw for kw in calls)
+
+
+def test_daily_refresh_waits_for_the_session_open(monkeypatch):
+    dates = pd.bdate_range("2024-01-01", "2024-03-29")
+    close = pd.Series(100.0, index=dates)
+    close.iloc[-2:] = 200.0  # the fast DMA moves above the slow one on 2024-03-28
+    frame = pd.DataFrame({"Open": close, "Close": close})
+    available = {"until": pd.Timestamp("2024-03-28")}
+
+    def fake_download(tickers, *args, **kwargs):
+        df = frame[frame.index <= available["until"]]
+        if kwargs.get("start"):
+            df = df[df.index >= kwargs["start"]]
+        if isinstance(tickers, str):
+            return df
+        return pd.concat({t: df for t in tickers}, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    now = {"t": pd.Timestamp("2024-03-29 08:30")}  # naive clocks are read as IST
+    scanner = IncrementalScanner(["A"], mode="daily", clock=lambda: now["t"])
+
+    # Before the open the newest bar is yesterday's; with offset 1 the check
+    # reads the day before it.
+    assert scanner.tick() == filter_by_dma(["A"]) == []
+    available["until"] = pd.Timestamp("2024-03-29")
+    assert scanner.tick() == []  # still before the open: no refresh
+    now["t"] = pd.Timestamp("2024-03-29 09:30")
+    assert scanner.tick() == filter_by_dma(["A"]) == ["A"]
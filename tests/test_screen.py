@@ -0,0 +1,83 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import run_scan
+from nse_fno_scanner.indicators import rising, sma
+from nse_fno_scanner.screen import Screen, ScreenError
+
+EXAMPLE = "sma(close,20) > sma(close,50) and rising(close,3) and volume > 1.5*sma(volume,20)"
+
+
+def _panels(seed=0):
+    rng = np.random.default_rng(seed)
+    close = pd.DataFrame(100 + rng.standard_normal((120, 40)).cumsum(axis=0))
+    close.iloc[:90, :3] = np.nan  # short histories
+    volume = pd.DataFrame(rng.uniform(1e5, 3e5, (120, 40)))
+    return close, volume
+
+
+def test_screen_matches_indicators_and_shares_subexpressions():
+    close, volume = _panels()
+    screen = Screen(EXAMPLE + " or volume > 1.5*sma(volume, 20) and close > sma(close, 20)")
+    expected = (
+        (sma(close, 20).iloc[-1] > sma(close, 50).iloc[-1])
+        & rising(close, 3).iloc[-1]
+        & (volume.iloc[-1] > 1.5 * sma(volume, 20).iloc[-1])
+    ) | ((volume.iloc[-1] > 1.5 * sma(volume, 20).iloc[-1]) & (close.iloc[-1] > sma(close, 20).iloc[-1]))
+    result = screen.evaluate({"Close": close, "Volume": volume})
+    assert result.tolist() == expected.tolist()
+    assert screen.columns == ("Close", "Volume")
+    assert sum(1 for n in screen.nodes if n.op == "sma" and n.window == 20) == 2
+    assert sum(1 for n in screen.nodes if n.op == "col") == 2
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "not (close > sma(close, 400))",
+        "close != sma(close, 400)",
+        "not rising(close, 400)",
+        "not (sma(close, 400) > 0 and close > 0)",
+        "ref(close, 1) != sma(ref(close, 1), 400)",
+    ],
+)
+def test_screen_never_passes_undefined_values(text):
+    close = pd.DataFrame(100 + np.arange(300.0)[:, None] * [1, -0.1, 0.5])
+    assert Screen(text).evaluate({"Close": close}).tolist() == [False, False, False]
+
+
+def test_screen_negation_drops_short_histories():
+    close, _ = _panels()
+    result = Screen("not (close > sma(close, 100))").evaluate({"Close": close})
+    expected = ~(close.iloc[-1] > sma(close, 100).iloc[-1])
+    assert not result[:3].any()  # 30 bars: the average is undefined
+    assert result[3:].tolist() == expected[3:].tolist()
+    assert Screen("sma(close, 100) > 0 or close > 0").evaluate({"Close": close}).all()
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["close > foo", "sma(close)", "sma(close, 0)", "close.shift(1) > 0", "__import__('os')", "close >", "1 > 0"],
+)
+def test_screen_rejects_invalid_expressions(text):
+    with pytest.raises(ScreenError):
+        Screen(text)
+
+
+def test_main_compiles_screens(monkeypatch, tmp_path):
+    captured = {}
+    monkeypatch.setattr(run_scan, "set_executor", lambda executor: None)
+    monkeypatch.setattr(run_scan, "run", lambda *a, **kw: captured.update(kw))
+    screens = tmp_path / "screens.txt"
+    screens.write_text("# trend\nclose > sma(close, 5)\n\n")
+    run_scan.main(["--screen", "rising(close, 2)", "--screen-file", str(screens)])
+    strategies = captured["extra_strategies"]
+    assert [s.func.text for s in strategies] == ["rising(close, 2)", "close > sma(close, 5)"]
+    assert strategies[0].needs.lookback == "250d"
+    with pytest.raises(SystemExit):
+        run_scan.main(["--screen", "close >> 1"])
@@ -0,0 +1,52 @@
+import os
+import sys
+import pandas as pd
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import executor
+from nse_fno_scanner.backtester import backtest_strategy
+from nse_fno_scanner.cache import window
+from nse_fno_scanner.dma_filter import filter_by_dma
+from nse_fno_scanner.market_predictor import compare_with_indices
+from nse_fno_scanner.session import MarketDataSession, covers
+
+
+def test_covers():
+    assert covers("250d", "2d", "1d")
+    assert covers("6mo", "5d", "1d")
+    assert not covers("5d", "6mo", "1d")
+    assert covers("5d", "2d", "15m")
+    assert not covers("2d", "5d", "15m")
+    assert covers("max", "1y", "1d")
+
+
+def test_session_downloads_each_range_once(monkeypatch):
+    dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=200)
+    frame = pd.DataFrame({"Open": range(1, 201), "Close": range(1, 201)}, index=dates, dtype=float)
+    calls = []
+
+    def fake_download(tickers, *args, **kwargs):
+        calls.append((tickers, kwargs["period"], kwargs["interval"]))
+        df = window(frame, kwargs["period"], kwargs["interval"])
+        if isinstance(tickers, str):
+            return df
+        return pd.concat({t: df for t in tickers}, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    session = MarketDataSession()
+
+    assert filter_by_dma(["A", "B"], session=session) == ["A", "B"]
+    assert len(calls) == 1
+    res = backtest_strategy("A", period="6mo", mode="daily", session=session)
+    assert res == backtest_strategy("A", period="6mo", mode="daily")
+    assert len(calls) == 2  # only the call without a session downloaded again
+
+    calls.clear()
+    comp = compare_with_indices(["A", "B"], session=session)
+    assert comp["stocks"] == 200 / 199 - 1
+    assert calls == [(["^NSEI", "^NSEBANK"], "5d", "1d")]
+    assert session.get_many(["A"], period="5d", interval="1d")["A"].index[-1] == dates[-1]
+    assert len(calls) == 1
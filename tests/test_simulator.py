@@ -25,3 +25,27 @@ def test_plot_pnl(monkeypatch):
     df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=3), "cum_pnl": [0, 1, 2]})
     ax = plot_pnl(df)
     assert ax is not None
+
+
+def test_simulate_market_parallel_orders_by_date(monkeypatch):
+    import numpy as np
+    from nse_fno_scanner import executor
+
+    def session_bars(day):
+        index = pd.date_range(f"{day} 09:15", periods=60, freq="15min")
+        close = np.arange(1.0, 61.0)
+        return pd.DataFrame({"Open": close, "Close": close}, index=index)
+
+    data = {"AAA.NS": session_bars("2024-02-01"), "BBB.NS": session_bars("2024-01-01")}
+
+    def fake_download(ticker, *args, **kwargs):
+        return data[ticker]
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    serial_list, serial = simulate_market(["AAA", "BBB"], workers=1)
+    shortlist, df = simulate_market(["AAA", "BBB"], workers=2)
+    assert shortlist == serial_list == ["AAA", "BBB"]
+    assert df["symbol"].tolist() == ["BBB", "AAA"]
+    assert df["date"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(df, serial)
@@ -0,0 +1,102 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import executor, sources
+from nse_fno_scanner.backtester import backtest_strategy
+from nse_fno_scanner.dma_filter import filter_by_dma
+from nse_fno_scanner.market_predictor import compare_with_indices
+from nse_fno_scanner.sources import BhavcopySource
+
+
+def _write_days(root, days, trend, first=0):
+    for i, day in enumerate(days, start=first):
+        rows = []
+        for sym, slope in trend.items():
+            close = 100 + slope * i
+            rows.append(f"{sym},EQ,{close - 1},{close + 1},{close - 2},{close},{1000 + i}")
+        rows.append(f"{sym},BE,1,1,1,1,1")  # other series are ignored
+        text = "SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,TOTTRDQTY\n" + "\n".join(rows)
+        (root / f"cm{day:%d%b%Y}bhav.csv".upper()).write_text(text)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("network access")
+
+    monkeypatch.setattr(yf, "download", no_network)
+    monkeypatch.setattr(sources, "_source", None)
+
+
+def test_ingest_is_incremental_and_accepts_backfills(tmp_path, offline):
+    days = pd.bdate_range("2024-01-01", periods=12)
+    _write_days(tmp_path, days[4:8], {"AAA": 1.0}, first=4)
+    source = BhavcopySource(tmp_path)
+    assert source.ingest() == 4
+    assert source.ingest() == 0
+    _write_days(tmp_path, days[8:], {"AAA": 1.0}, first=8)
+    _write_days(tmp_path, days[:4], {"AAA": 1.0})
+    assert source.ingest() == 8
+
+    df = source.get("AAA", period="1y", interval="1d")
+    assert list(df.index) == list(days)
+    assert df["Close"].tolist() == [100.0 + i for i in range(12)]
+    assert df["Volume"].iloc[-1] == 1011
+    assert source.get_many(["AAA", "ZZZ"], period="5d", interval="1d")["AAA"].index[0] == days[-4]
+
+
+def test_daily_scan_and_backtest_run_from_local_files(tmp_path, offline):
+    days = pd.bdate_range("2024-01-01", periods=80)
+    _write_days(tmp_path, days, {"UP": 1.0, "DOWN": -1.0})
+    source = BhavcopySource(tmp_path)
+    source.ingest()
+    sources.set_source(source)
+
+    assert filter_by_dma(["UP", "DOWN", "MISSING"], fast_period=5, slow_period=20) == ["UP"]
+    count, win_rate, _ = backtest_strategy("UP", mode="daily", period="6mo", fast=5, slow=20)
+    assert count == 60
+    assert win_rate == 1.0
+
+
+def test_indices_come_from_fallback_when_offline(tmp_path, monkeypatch):
+    days = pd.bdate_range("2024-01-01", periods=10)
+    _write_days(tmp_path, days, {"UP": 1.0})
+    source = BhavcopySource(tmp_path)
+    source.ingest()
+    monkeypatch.setattr(sources, "_source", source)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+    requested = []
+
+    def fake_download(tickers, *args, **kwargs):
+        names = [tickers] if isinstance(tickers, str) else list(tickers)
+        requested.extend(names)
+        frames = {t: pd.DataFrame({"Close": [100.0, 102.0]}, index=days[-2:]) for t in names}
+        if isinstance(tickers, str):
+            return frames[tickers]
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    comp = compare_with_indices(["UP"])
+    assert sorted(requested) == ["^NSEBANK", "^NSEI"]
+    assert comp["stocks"] == pytest.approx(109 / 108 - 1)
+    assert comp["nifty"] == comp["banknifty"] == pytest.approx(0.02)
+
+
+def test_ingest_retries_files_that_failed_to_parse(tmp_path, offline):
+    days = pd.bdate_range("2024-01-01", periods=3)
+    _write_days(tmp_path, days[:2], {"AAA": 1.0})
+    broken = tmp_path / f"cm{days[2]:%d%b%Y}bhav.csv".upper()
+    broken.write_text("SERIES,CLOSE\nEQ,1\n")  # e.g. a truncated download
+    source = BhavcopySource(tmp_path)
+    assert source.ingest() == 2
+    assert source.ingest() == 0
+
+    _write_days(tmp_path, days[2:], {"AAA": 1.0}, first=2)
+    assert source.ingest() == 1
+    assert source.get("AAA", period="1y", interval="1d")["Close"].tolist() == [100.0, 101.0, 102.0]
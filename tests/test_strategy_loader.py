@@ -13,3 +13,53 @@ def test_load_strategy():
     func = load_strategy("mymod:my")
     assert func(["A", "B", "C"]) == ["A", "C"]
 
+
+
+class _Session:
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def get_many(self, symbols, *, period, interval, desc=None):
+        self.calls.append((list(symbols), period, interval))
+        return {s: self.frames[s] for s in symbols if s in self.frames}
+
+
+def _frames():
+    import numpy as np
+    import pandas as pd
+
+    index = pd.date_range("2024-01-01", periods=60)
+    up = pd.DataFrame({"Close": np.arange(1.0, 61.0)}, index=index)
+    down = pd.DataFrame({"Close": np.arange(60.0, 0.0, -1)}, index=index)
+    return {"UP": up, "DOWN": down, "SHORT": up.iloc[-30:]}
+
+
+def test_vectorized_strategy_mask_uses_session():
+    from nse_fno_scanner.strategy_loader import VectorizedStrategy, vectorized
+
+    @vectorized(lookback="90d", indicators=("sma10", "ema20"))
+    def trending(panel):
+        assert list(panel["Close"].columns) == panel.symbols
+        return panel["sma10"].iloc[-1] > panel["ema20"].iloc[-1]
+
+    mod = types.ModuleType("vecmod")
+    mod.trending = trending
+    sys.modules["vecmod"] = mod
+    strat = load_strategy("vecmod:trending")
+    assert isinstance(strat, VectorizedStrategy)
+    session = _Session(_frames())
+    assert strat(["UP", "DOWN", "SHORT", "MISSING"], session=session) == ["UP", "SHORT"]
+    assert session.calls == [(["UP", "DOWN", "SHORT", "MISSING"], "90d", "1d")]
+
+
+def test_vectorized_strategy_scores_keep_top():
+    from nse_fno_scanner.strategy_loader import vectorized
+
+    @vectorized(top=2)
+    def momentum(panel):
+        close = panel["Close"]
+        return (close.iloc[-1] / close.iloc[-20] - 1).to_numpy()
+
+    session = _Session(_frames())
+    assert momentum(["DOWN", "SHORT", "UP"], session=session) == ["SHORT", "UP"]
@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.indicators import rising
+from nse_fno_scanner.streaming import EMA, SMA, Crossover, Rising
+
+rng = np.random.default_rng(0)
+CLOSES = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 600)))
+
+
+@pytest.mark.parametrize("split", [0, 1, 19, 20, 21, 300, 600])
+def test_batches_and_single_values_match_pandas(split):
+    closes = pd.Series(CLOSES)
+    expected = {
+        "sma": closes.rolling(20).mean().to_numpy(),
+        "ema": closes.ewm(span=20, adjust=False).mean().to_numpy(),
+        "rising": rising(closes.to_frame(), 3)[0].to_numpy(),
+    }
+    for name, ind in {"sma": SMA(20), "ema": EMA(20), "rising": Rising(3)}.items():
+        head = ind.update(CLOSES[:split])
+        middle = [ind.push(v) for v in CLOSES[split : split + 30]]
+        tail = ind.update(CLOSES[split + 30 :])
+        got = np.concatenate([head, np.asarray(middle, dtype=head.dtype), tail])
+        np.testing.assert_allclose(got, expected[name], rtol=0, atol=1e-10)
+
+
+def test_seed_peek_and_crossover():
+    frame = pd.DataFrame({"Close": CLOSES})
+    sma = SMA(20).seed(frame.iloc[:-1])
+    assert sma.peek(CLOSES[-1]) == pytest.approx(CLOSES[-20:].mean(), abs=1e-10)
+    assert sma.count == len(CLOSES) - 1
+    ema = EMA(50).seed(frame)
+    assert ema.value == pytest.approx(frame["Close"].ewm(span=50, adjust=False).mean().iloc[-1], abs=1e-10)
+    assert Rising(3).seed([1.0, 2.0, 3.0]).peek(4.0)
+    assert not Rising(3).seed([1.0, 2.0, 3.0]).peek(2.0)
+
+    fast = frame["Close"].rolling(5).mean()
+    slow = frame["Close"].rolling(20).mean()
+    expected = (fast > slow).astype(int).diff().fillna(0).to_numpy()
+    cross = Crossover().seed(fast[:100], slow[:100])
+    got = [cross.push(f, s) for f, s in zip(fast[100:110], slow[100:110])]
+    got.extend(cross.update(fast[110:], slow[110:]))
+    np.testing.assert_array_equal(got, expected[100:])
+    assert set(np.unique(expected)) == {-1, 0, 1}
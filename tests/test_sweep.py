@@ -0,0 +1,44 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner import executor
+from nse_fno_scanner.backtester import backtest_strategy
+from nse_fno_scanner.sweep import sweep
+
+
+def _fake_download(monkeypatch):
+    rng = np.random.default_rng(4)
+    index = pd.date_range("2024-01-01 09:15", periods=400, freq="15min")
+    close = 100 + rng.normal(0.1, 1, size=len(index)).cumsum()
+    data = pd.DataFrame({"Open": close - 0.5, "Close": close}, index=index)
+
+    def fake_download(tickers, *args, **kwargs):
+        if isinstance(tickers, str):
+            return data
+        return pd.concat({t: data for t in tickers}, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(yf, "download", fake_download)
+    monkeypatch.setattr(executor, "_executor", executor.FetchExecutor(rate=0))
+
+
+def test_sweep_matches_backtest_strategy(monkeypatch):
+    _fake_download(monkeypatch)
+    table = sweep(["AAA", "BBB"], fast=[5, 10], slow=[20, 30], mode="both", workers=1)
+    assert len(table) == 8
+    row = table[(table.symbol == "AAA") & (table.fast == 10) & (table.slow == 30)].iloc[0]
+    trades, win_rate, avg_ret = backtest_strategy("AAA", mode="both", fast=10, slow=30)
+    assert (row.trades, row.win_rate) == (trades, win_rate)
+    assert np.isclose(row.avg_return, avg_ret)
+
+
+def test_sweep_process_pool_matches_serial(monkeypatch):
+    _fake_download(monkeypatch)
+    grid = dict(fast=[5, 10], slow=[20], start_hour=[None, 11])
+    serial = sweep(["AAA", "BBB"], workers=1, **grid)
+    parallel = sweep(["AAA", "BBB"], workers=2, **grid)
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,53 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nse_fno_scanner.backtester import backtest_strategy
+from nse_fno_scanner.tradelog import Trade, TradeLog
+
+
+def _log(symbol, days, start=100.0):
+    dates = pd.date_range(days[0], periods=days[1])
+    entry = np.arange(start, start + len(dates))
+    exit_price = entry * 1.01
+    return TradeLog.from_arrays(symbol, dates, entry, exit_price, (exit_price - entry) / entry)
+
+
+def test_concat_remaps_codes_and_sorts():
+    first = TradeLog.concat([_log("AAA", ("2024-01-03", 2)), _log("BBB", ("2024-01-01", 2))])
+    log = TradeLog.concat([_log("BBB", ("2024-01-05", 1)), first]).sorted()
+    assert log.symbols == ["BBB", "AAA"]
+    assert len(log) == 5
+    df = log.to_frame()
+    assert df["symbol"].tolist() == ["BBB", "BBB", "AAA", "AAA", "BBB"]
+    assert not isinstance(df["symbol"].dtype, pd.CategoricalDtype)
+    assert df["date"].is_monotonic_increasing
+    assert np.shares_memory(df["entry"].to_numpy(), log.entry)
+
+
+def test_iteration_yields_trades():
+    log = _log("AAA", ("2024-01-01", 3))
+    trades = list(log)
+    assert all(isinstance(t, Trade) for t in trades)
+    assert trades[0] == Trade(pd.Timestamp("2024-01-01"), 100.0, 101.0, log.ret[0])
+    assert [t.pct_return for t in trades] == log.ret.tolist()
+
+
+def test_backtest_returns_trade_log(monkeypatch):
+    import yfinance as yf
+
+    df = pd.DataFrame(
+        {"Open": np.arange(1.0, 31.0), "Close": np.arange(1.5, 31.5)},
+        index=pd.date_range("2024-01-01", periods=30),
+    )
+    monkeypatch.setattr(yf, "download", lambda *a, **k: df)
+    count, _, avg, trades = backtest_strategy(
+        "AAA", mode="daily", fast=3, slow=5, return_trades=True
+    )
+    assert isinstance(trades, TradeLog)
+    assert count == len(trades) == 25
+    assert trades.symbols == ["AAA"]
+    assert avg == trades.to_frame()["pct_return"].mean()